@@ -0,0 +1,18 @@
+"""
+01b_feature_extraction.py
+
+Purpose:
+    Aggregate the cleaned, long-format peer review data into
+    reviewer-level features for descriptive statistics and analysis.
+
+    The stage lives in visual_nudges/stages/features.py; this script is
+    equivalent to `python -m visual_nudges features`.
+
+Usage:
+    python 01b_feature_extraction.py [--format {csv,parquet}]
+"""
+
+from visual_nudges.stages.features import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+04_figures.py
+
+Purpose:
+    Render Figures 2-4 of the Visual Nudges study from the two cohort
+    workbooks, headlessly.
+
+    The stage lives in visual_nudges/stages/figures.py; this script is
+    equivalent to `python -m visual_nudges figures`.
+
+Usage:
+    python 04_figures.py [--only 2 3] [--jobs N] [--force]
+"""
+
+from visual_nudges.stages.figures import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+generate_synthetic_data.py
+
+Purpose:
+    Write synthetic dashboard exports of any size for stress tests
+    (see visual_nudges/synthetic.py). The data is random: it has the
+    layout and rough shape of the real exports, and no real reviews.
+
+Outputs:
+    long layout   one raw export, read by 01_data_cleaning.py
+    wide layout   <stem>_baseline / <stem>_nudge cohort workbooks, read
+                  by the figure scripts
+
+Usage:
+    python generate_synthetic_data.py data/synthetic/raw.xlsx --reviews 1e4
+    python generate_synthetic_data.py data/synthetic/raw.parquet --reviews 1e7
+    python generate_synthetic_data.py data/synthetic/cohort.xlsx --layout wide \\
+        --reviews 5e3 --comparative-rate 0.05 0.25
+
+    The long layout has one row per review and rubric criterion, so
+    --reviews 1e7 writes 4e7 rows with the four default criteria.
+    Excel sheets hold at most 1,048,576 rows; larger exports need
+    .csv or .parquet.
+"""
+
+import argparse
+from pathlib import Path
+
+from visual_nudges.constants import RANDOM_SEED
+from visual_nudges.synthetic import (
+    DEFAULT_CHUNK_REVIEWS, DEFAULT_CRITERIA, DEFAULT_SEMESTERS, LAYOUTS, write_synthetic
+)
+
+parser = argparse.ArgumentParser(description="Generate synthetic peer review exports.")
+parser.add_argument(
+    "output", type=Path,
+    help="output file (.xlsx, .csv or .parquet)"
+)
+parser.add_argument(
+    "--reviews", type=lambda s: int(float(s)), default=10_000,
+    help="number of reviews, e.g. 1e4 or 1e7 (default: 10000)"
+)
+parser.add_argument(
+    "--layout", choices=LAYOUTS, default="long",
+    help="long: raw export; wide: one cohort workbook per condition (default: long)"
+)
+parser.add_argument(
+    "--criteria", nargs="+", default=DEFAULT_CRITERIA,
+    help="rubric criteria (default: the four study criteria)"
+)
+parser.add_argument(
+    "--semesters", nargs="+", default=DEFAULT_SEMESTERS,
+    help="semesters (default: Spring 2025, Fall 2025)"
+)
+parser.add_argument(
+    "--length-median", type=float, default=20.0,
+    help="median comment length in words, baseline condition (default: 20)"
+)
+parser.add_argument(
+    "--length-sigma", type=float, default=0.8,
+    help="lognormal sigma of comment lengths (default: 0.8)"
+)
+parser.add_argument(
+    "--nudge-length-ratio", type=float, default=1.4,
+    help="nudge / baseline median comment length (default: 1.4)"
+)
+parser.add_argument(
+    "--placeholder-rate", type=float, default=0.05,
+    help="share of placeholder comments such as 'N/A' (default: 0.05)"
+)
+parser.add_argument(
+    "--empty-rate", type=float, default=0.02,
+    help="share of reviews without a comment (default: 0.02)"
+)
+parser.add_argument(
+    "--comparative-rate", nargs=2, type=float, default=[0.05, 0.15],
+    metavar=("BASELINE", "NUDGE"),
+    help="share of comments with a comparative cue (default: 0.05 0.15)"
+)
+parser.add_argument(
+    "--keyword-rate", type=float, default=0.3,
+    help="chance that a comment mentions each criterion (default: 0.3)"
+)
+parser.add_argument(
+    "--max-score", type=int, default=3,
+    help="highest rubric score; scores are 1..max (default: 3)"
+)
+parser.add_argument(
+    "--score-skew", nargs=2, type=float, default=[-0.5, -0.3],
+    metavar=("BASELINE", "NUDGE"),
+    help="score skew, < 0 favours low and > 0 high scores (default: -0.5 -0.3)"
+)
+parser.add_argument(
+    "--chunk-reviews", type=int, default=DEFAULT_CHUNK_REVIEWS,
+    help=f"reviews generated and written per chunk (default: {DEFAULT_CHUNK_REVIEWS})"
+)
+parser.add_argument(
+    "--seed", type=int, default=RANDOM_SEED,
+    help=f"random seed (default: {RANDOM_SEED})"
+)
+args = parser.parse_args()
+
+print(f"Generating {args.reviews:,} synthetic reviews ({args.layout} layout)")
+written = write_synthetic(
+    args.output,
+    n_reviews=args.reviews,
+    layout=args.layout,
+    criteria=args.criteria,
+    semesters=args.semesters,
+    chunk_reviews=args.chunk_reviews,
+    seed=args.seed,
+    length_median=args.length_median,
+    length_sigma=args.length_sigma,
+    nudge_length_ratio=args.nudge_length_ratio,
+    placeholder_rate=args.placeholder_rate,
+    empty_rate=args.empty_rate,
+    comparative_rate=tuple(args.comparative_rate),
+    keyword_rate=args.keyword_rate,
+    max_score=args.max_score,
+    score_skew=tuple(args.score_skew),
+)
+
+for path, n_rows in written.items():
+    print(f"✓ Saved: {path} ({n_rows:,} rows)")
@@ -0,0 +1,111 @@
+"""
+run_benchmarks.py
+
+Purpose:
+    Time and memory-profile the pipeline steps (cleaning, features,
+    descriptives, effect sizes, bootstrap, Wilcoxon, logit, figures)
+    on synthetic exports of increasing size (see
+    visual_nudges/benchmark.py). Runs offline.
+
+Outputs:
+    results/benchmarks/latest.json    (machine-readable results)
+
+Usage:
+    python run_benchmarks.py                           # 1e3, 1e4, 1e5 rows
+    python run_benchmarks.py --sizes 1e3 1e5 1e7       # any sizes
+    python run_benchmarks.py --only bootstrap wilcoxon
+    python run_benchmarks.py --save-baseline           # store as baseline
+    python run_benchmarks.py --baseline results/benchmarks/baseline.json
+
+    With a baseline, every benchmark is compared with the stored run;
+    the script exits with status 1 when one is more than --tolerance
+    times slower.
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+from visual_nudges.benchmark import (
+    BENCHMARKS, DEFAULT_SIZES, DEFAULT_TOLERANCE, compare_results, load_results,
+    run_benchmarks, save_results
+)
+
+BASELINE_FILE = Path("results/benchmarks/baseline.json")
+
+parser = argparse.ArgumentParser(description="Benchmark the Visual Nudges pipeline.")
+parser.add_argument(
+    "--sizes", nargs="+", type=lambda s: int(float(s)), default=list(DEFAULT_SIZES),
+    help="comment rows per synthetic export, e.g. 1e3 1e5 1e7 "
+         "(default: 1e3 1e4 1e5)"
+)
+parser.add_argument(
+    "--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS),
+    help="benchmarks to run (default: all)"
+)
+parser.add_argument(
+    "--repeats", type=int, default=3,
+    help="timed runs per benchmark; the fastest is reported (default: 3)"
+)
+parser.add_argument(
+    "--bootstrap-samples", type=int, default=1_000,
+    help="bootstrap replicates per metric (default: 1000)"
+)
+parser.add_argument(
+    "--output", type=Path, default=Path("results/benchmarks/latest.json"),
+    help="results file (default: results/benchmarks/latest.json)"
+)
+parser.add_argument(
+    "--baseline", type=Path, default=None,
+    help=f"compare against this stored run (default: {BASELINE_FILE} if it exists)"
+)
+parser.add_argument(
+    "--tolerance", type=float, default=DEFAULT_TOLERANCE,
+    help="wall-time ratio that counts as a regression "
+         f"(default: {DEFAULT_TOLERANCE})"
+)
+parser.add_argument(
+    "--save-baseline", action="store_true",
+    help=f"also store this run as {BASELINE_FILE}"
+)
+args = parser.parse_args()
+
+print(f"Benchmarking {len(args.only)} steps at {len(args.sizes)} sizes")
+report = run_benchmarks(
+    sizes=args.sizes,
+    benchmarks=args.only,
+    repeats=args.repeats,
+    bootstrap_samples=args.bootstrap_samples
+)
+
+save_results(report, args.output)
+print(f"✓ Saved: {args.output}")
+
+baseline_file = args.baseline or (BASELINE_FILE if BASELINE_FILE.exists() else None)
+regressions = []
+
+if baseline_file is not None:
+    if not baseline_file.exists():
+        print(f"ERROR: Baseline not found at {baseline_file}")
+        sys.exit(2)
+
+    print(f"\nComparison with {baseline_file}:")
+    for row in compare_results(report, load_results(baseline_file), args.tolerance):
+        if row["status"] == "new":
+            print(f"  {row['benchmark']:<13} {row['rows']:>10,} rows  (not in baseline)")
+            continue
+        print(f"  {row['benchmark']:<13} {row['rows']:>10,} rows  "
+              f"{row['baseline_wall_s']:9.3f} s -> {row['wall_s']:9.3f} s  "
+              f"x{row['ratio']:.2f}  {row['status']}")
+        if row["status"] == "regression":
+            regressions.append(row)
+
+if args.save_baseline:
+    BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(args.output, BASELINE_FILE)
+    print(f"✓ Saved: {BASELINE_FILE}")
+
+if regressions:
+    print(f"\n{len(regressions)} benchmark(s) slower than x{args.tolerance} of baseline")
+    sys.exit(1)
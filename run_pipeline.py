@@ -0,0 +1,70 @@
+"""
+run_pipeline.py
+
+Purpose:
+    Run the Visual Nudges pipeline incrementally.
+
+    Stages (see visual_nudges/pipeline.py):
+        clean     01_data_cleaning.py
+        features  01b_feature_extraction.py
+        describe  02_descriptive_statistics.py
+        analyze   03_analysis.py
+        figures   04_figures.py
+
+    Only stages whose code, arguments or input data changed since their
+    last successful run are executed; independent stages run in
+    parallel. Per-stage logs are written to data/cache/logs/.
+
+Usage:
+    python run_pipeline.py                  # bring everything up to date
+    python run_pipeline.py describe         # only describe (and upstream)
+    python run_pipeline.py --dry-run        # show what would run
+    python run_pipeline.py --force --jobs 4 # re-run all, 4 at a time
+"""
+
+import argparse
+import sys
+
+from visual_nudges.pipeline import default_stages, run_pipeline
+from visual_nudges.constants import STORAGE_FORMATS
+
+parser = argparse.ArgumentParser(description="Run the Visual Nudges pipeline incrementally.")
+parser.add_argument(
+    "stages", nargs="*",
+    help="stages to bring up to date (default: all)"
+)
+parser.add_argument(
+    "--jobs", type=int, default=3,
+    help="maximum number of stages running concurrently (default: 3)"
+)
+parser.add_argument(
+    "--format", choices=STORAGE_FORMATS, default="csv",
+    help="storage format for data/clean/ and data/features/"
+)
+parser.add_argument(
+    "--force", action="store_true",
+    help="re-run stages even when they are up to date"
+)
+parser.add_argument(
+    "--dry-run", action="store_true",
+    help="report which stages would run without running them"
+)
+args = parser.parse_args()
+
+try:
+    status = run_pipeline(
+        default_stages(args.format),
+        targets=args.stages,
+        jobs=args.jobs,
+        force=args.force,
+        dry_run=args.dry_run
+    )
+except ValueError as e:
+    print(e)
+    sys.exit(2)
+
+if any(result in ("failed", "blocked") for result in status.values()):
+    blocked = [name for name, result in status.items() if result == "blocked"]
+    if blocked:
+        print(f"Not run (upstream failure): {', '.join(sorted(blocked))}")
+    sys.exit(1)
@@ -15,6 +15,7 @@ def create_directory_structure():
         "data/raw",
         "data/clean",
         "data/features",
+        "data/cache",
         "results/tables",
         "results/models"
     ]
@@ -37,8 +38,9 @@ def create_directory_structure():
     print("\nNext steps:")
     print("1. Place your raw data in data/raw/peer_review_raw.xlsx")
     print("2. Run: python 01_data_cleaning.py")
-    print("3. Run: python 02_descriptive_statistics.py")
-    print("4. Run: python 03_analysis.py")
+    print("3. Run: python 01b_feature_extraction.py")
+    print("4. Run: python 02_descriptive_statistics.py")
+    print("5. Run: python 03_analysis.py")
 
 if __name__ == "__main__":
     create_directory_structure()
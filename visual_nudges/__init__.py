@@ -0,0 +1,13 @@
+"""
+visual_nudges
+
+Shared computational engines for the Visual Nudges analysis pipeline.
+
+The pipeline stages live in visual_nudges.stages and run through the
+command-line interface (python -m visual_nudges <command>) or the
+numbered scripts (01_data_cleaning.py, 02_descriptive_statistics.py,
+03_analysis.py), which are thin wrappers around them. Heavy
+computations live in importable, reusable modules next to them.
+
+Importing this package loads nothing beyond the standard library.
+"""
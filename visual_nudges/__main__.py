@@ -0,0 +1,6 @@
+"""Allow `python -m visual_nudges <command>`"""
+
+from visual_nudges.cli import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+benchmark.py
+
+Purpose:
+    Performance benchmarks for the analysis pipeline, run by
+    run_benchmarks.py.
+
+    Each benchmark times one pipeline step on a synthetic export of a
+    given number of comment rows (10^3 to 10^7):
+
+        clean         structural cleaning (clean_frame)
+        clean_compact cleaning into compact dtypes (--compact)
+        boilerplate   near-duplicate / boilerplate flags
+        features      reviewer-level features
+        descriptives  grouped descriptives by condition
+        effect_sizes  Hedges g for every metric and condition pair
+        bootstrap     bootstrap CIs of the mean differences
+        wilcoxon      batched Mann-Whitney U tests
+        logit         odds ratios for the binary outcomes by semester
+        figures       Figures 2-4 (Agg backend, temporary directory)
+
+    Inputs of later steps (cleaned rows, features, figure summary) are
+    prepared once per size and are not part of the timings.
+
+Measurements:
+    wall_s / cpu_s    best of `repeats` runs (time.perf_counter,
+                      time.process_time)
+    peak_alloc_mb     peak traced allocations (tracemalloc) in one
+                      separate run, so tracing does not slow the timings
+    peak_rss_mb       peak resident set size of the process during that
+                      run (Linux VmHWM, reset through
+                      /proc/self/clear_refs; otherwise the lifetime
+                      maximum from getrusage)
+    rss_growth_mb     peak RSS above the RSS at the start of the run
+                      (Linux only)
+
+Notes:
+    - Everything runs offline: the data is generated in memory with a
+      fixed seed, and no network or display is needed.
+    - Results are plain JSON (one record per benchmark and size), so a
+      run can be compared against a stored baseline (compare_results).
+"""
+
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from visual_nudges.constants import RANDOM_SEED
+from visual_nudges.profiling import peak_rss_mb, reset_peak_rss, status_mb
+
+BENCHMARKS = (
+    "clean", "clean_compact", "boilerplate", "features", "descriptives", "effect_sizes",
+    "bootstrap", "wilcoxon", "logit", "figures",
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# A benchmark is a regression when it is this much slower than baseline
+DEFAULT_TOLERANCE = 1.25
+
+# Semesters of the synthetic exports
+_SEMESTERS = ["Spring 2024", "Fall 2024", "Spring 2025", "Fall 2025"]
+
+
+def measure(func, repeats=3):
+    """
+    Time and memory-profile one workload.
+
+    Parameters:
+        func: callable without arguments
+        repeats: int, timed runs (the fastest is reported)
+
+    Returns:
+        dict: wall_s, wall_s_median, cpu_s, peak_alloc_mb, peak_rss_mb,
+        rss_growth_mb (peak RSS above the RSS at the start of the run)
+    """
+    walls, cpus = [], []
+    for _ in range(repeats):
+        gc.collect()
+        wall, cpu = time.perf_counter(), time.process_time()
+        func()
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+
+    # Separate traced run for memory
+    gc.collect()
+    reset_peak_rss()
+    start_rss = status_mb("VmRSS")
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    walls.sort()
+    peak_rss = peak_rss_mb()
+    return {
+        "wall_s": walls[0],
+        "wall_s_median": walls[len(walls) // 2],
+        "cpu_s": min(cpus),
+        "peak_alloc_mb": peak / 1024 ** 2,
+        "peak_rss_mb": peak_rss,
+        "rss_growth_mb": peak_rss - start_rss if start_rss is not None else None,
+    }
+
+
+def synthetic_export(n_rows, seed=RANDOM_SEED):
+    """
+    Synthetic raw export in the layout 01_data_cleaning.py reads.
+
+    Generated by visual_nudges/synthetic.py with its default
+    distributions over four semesters.
+
+    Parameters:
+        n_rows: int, number of comment rows
+        seed: int, random seed
+
+    Returns:
+        pd.DataFrame: raw export (original column names)
+    """
+    import pandas as pd
+
+    from visual_nudges.synthetic import DEFAULT_CRITERIA, generate_chunks, to_long
+
+    n_reviews = -(-n_rows // len(DEFAULT_CRITERIA))
+    chunks = generate_chunks(n_reviews, semesters=_SEMESTERS, seed=seed)
+    raw = pd.concat([to_long(frame, DEFAULT_CRITERIA) for frame in chunks], ignore_index=True)
+    return raw.iloc[:n_rows]
+
+
+def _cohort_rows(df_clean):
+    """Wide cohort rows (Comments, one column per criterion, Condition)"""
+    import pandas as pd
+
+    from visual_nudges.figure_data import COHORT_LABELS
+
+    wide = df_clean.pivot_table(
+        index=["semester", "condition", "submission_id"], columns="rubric_criterion",
+        values="rubric_score", aggfunc="first", observed=True
+    )
+    wide.columns = [str(c) for c in wide.columns]
+    comments = (df_clean.groupby(["semester", "condition", "submission_id"], observed=True)
+                ["written_comment"].first())
+    wide.insert(0, "Comments", comments.reindex(wide.index))
+
+    condition = wide.index.get_level_values("condition").astype(str)
+    wide = wide.reset_index(drop=True)
+    wide["Condition"] = pd.Categorical(
+        pd.Series(condition).map({"baseline": COHORT_LABELS[0], "nudge": COHORT_LABELS[1]}),
+        categories=list(COHORT_LABELS), ordered=True
+    )
+    return wide
+
+
+def workloads(n_rows, bootstrap_samples=1_000, seed=RANDOM_SEED):
+    """
+    Benchmark workloads on a synthetic export of `n_rows` rows.
+
+    Parameters:
+        n_rows: int, comment rows
+        bootstrap_samples: int, replicates per metric in `bootstrap`
+        seed: int, random seed of the synthetic data
+
+    Returns:
+        tuple: (dict benchmark name -> callable, dict of dataset sizes)
+    """
+    import numpy as np
+
+    from visual_nudges.bootstrap import bootstrap_mean_diffs
+    from visual_nudges.cleaning import boilerplate_flags, clean_frame
+    from visual_nudges.descriptives import grouped_descriptives
+    from visual_nudges.effects import group_moments, pairwise_effects
+    from visual_nudges.features import build_reviewer_features
+    from visual_nudges.figure_data import summarize_cohorts
+    from visual_nudges.logistic import binary_outcome_models
+    from visual_nudges.ranktests import mann_whitney_batch
+
+    raw = synthetic_export(n_rows, seed)
+    df_clean = clean_frame(raw)
+    features = build_reviewer_features(df_clean)
+    summary = summarize_cohorts(_cohort_rows(df_clean))
+
+    metrics = [
+        "total_words", "mean_words_per_comment", "rubric_criteria_addressed",
+        "rubric_coverage_ratio", "comparative_reference_rate", "score_mean",
+        "score_sd", "score_range",
+    ]
+    nudge = (features["condition"] == "nudge").to_numpy()
+    values = features[metrics].to_numpy(dtype=float)
+
+    binary = features[["semester", "condition"]].copy()
+    binary["any_comparative"] = (features["comparative_references"] > 0).astype(int)
+    binary["any_comment"] = (features["n_comments"] > 0).astype(int)
+    binary["full_rubric_coverage"] = (features["rubric_coverage_ratio"] >= 1).astype(int)
+
+    def figures():
+        import matplotlib
+
+        matplotlib.use("Agg")
+
+        from visual_nudges.stages.figures import FIGURE_SPECS, RENDERERS
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, render in RENDERERS.items():
+                spec = FIGURE_SPECS[name]
+                render(summary, Path(tmp) / spec["file"], spec["style"])
+
+    jobs = {
+        "clean": lambda: clean_frame(raw),
+        "clean_compact": lambda: clean_frame(raw, compact=True),
+        "boilerplate": lambda: boilerplate_flags(df_clean),
+        "features": lambda: build_reviewer_features(df_clean),
+        "descriptives": lambda: grouped_descriptives(features, "condition", metrics),
+        "effect_sizes": lambda: pairwise_effects(group_moments(features, "condition", metrics)),
+        "bootstrap": lambda: bootstrap_mean_diffs(
+            [(values[~nudge, m], values[nudge, m]) for m in range(len(metrics))],
+            B=bootstrap_samples, seed=seed
+        ),
+        "wilcoxon": lambda: mann_whitney_batch(values, nudge, cache_dir=None),
+        "logit": lambda: binary_outcome_models(
+            binary, ["any_comparative", "any_comment", "full_rubric_coverage"],
+            "condition", "baseline", by=["semester"], profile=True
+        ),
+        "figures": figures,
+    }
+    sizes = {"rows": len(raw), "reviewers": len(features), "figure_rows": len(summary)}
+    return jobs, sizes
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, benchmarks=BENCHMARKS, repeats=3,
+                   bootstrap_samples=1_000, verbose=True):
+    """
+    Run the benchmarks at every dataset size.
+
+    Parameters:
+        sizes: iterable of int, comment rows per synthetic export
+        benchmarks: iterable of str, names from BENCHMARKS
+        repeats: int, timed runs per benchmark
+        bootstrap_samples: int, replicates per metric in `bootstrap`
+        verbose: bool, print one line per measurement
+
+    Returns:
+        dict: {"meta": environment and settings, "results": [records]}
+    """
+    import numpy as np
+    import pandas as pd
+    import scipy
+
+    unknown = set(benchmarks) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"ERROR: Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = []
+    for n_rows in sizes:
+        jobs, counts = workloads(int(n_rows), bootstrap_samples)
+        for name in BENCHMARKS:
+            if name not in benchmarks:
+                continue
+            record = {"benchmark": name, **counts, **measure(jobs[name], repeats)}
+            results.append(record)
+            if verbose:
+                print(f"  {name:<13} {record['rows']:>10,} rows  "
+                      f"{record['wall_s']:9.3f} s  {record['peak_alloc_mb']:9.1f} MiB alloc  "
+                      f"{record['peak_rss_mb']:9.1f} MiB RSS")
+
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeats": repeats,
+        "bootstrap_samples": bootstrap_samples,
+    }
+    return {"meta": meta, "results": results}
+
+
+def save_results(report, path):
+    """Write a benchmark report as JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=1))
+
+
+def load_results(path):
+    """Read a benchmark report written by save_results()"""
+    return json.loads(Path(path).read_text())
+
+
+def compare_results(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare a benchmark report against a baseline report.
+
+    Parameters:
+        report: dict, current run (run_benchmarks)
+        baseline: dict, stored run
+        tolerance: float, wall-time ratio above which a benchmark counts
+            as a regression (below 1 / tolerance as an improvement)
+
+    Returns:
+        list of dict: benchmark, rows, wall_s, baseline_wall_s, ratio,
+        alloc_ratio and status ('regression', 'improvement', 'same' or
+        'new'), one per record of `report`
+    """
+    stored = {(r["benchmark"], r["rows"]): r for r in baseline["results"]}
+
+    rows = []
+    for record in report["results"]:
+        base = stored.get((record["benchmark"], record["rows"]))
+        if base is None:
+            rows.append({"benchmark": record["benchmark"], "rows": record["rows"],
+                         "wall_s": record["wall_s"], "baseline_wall_s": None,
+                         "ratio": None, "alloc_ratio": None, "status": "new"})
+            continue
+
+        ratio = record["wall_s"] / base["wall_s"] if base["wall_s"] > 0 else float("inf")
+        alloc = (record["peak_alloc_mb"] / base["peak_alloc_mb"]
+                 if base["peak_alloc_mb"] > 0 else None)
+        if ratio > tolerance:
+            status = "regression"
+        elif ratio < 1 / tolerance:
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append({"benchmark": record["benchmark"], "rows": record["rows"],
+                     "wall_s": record["wall_s"], "baseline_wall_s": base["wall_s"],
+                     "ratio": ratio, "alloc_ratio": alloc, "status": status})
+
+    return rows
@@ -0,0 +1,267 @@
+"""
+bootstrap.py
+
+Purpose:
+    Batched bootstrap engine for differences in group means.
+
+    Resample indices are drawn as integer matrices (one row per
+    bootstrap replicate) and replicate means are computed with
+    matrix reductions instead of a Python loop over replicates.
+
+Memory:
+    Replicates are processed in fixed-size chunks whose row count is
+    derived from `max_bytes`, so peak memory is capped regardless of
+    the number of reviewers or bootstrap samples.
+
+Reproducibility:
+    The B replicates are split into fixed-size blocks, and every block
+    (and every group within a block) draws from its own generator
+    spawned with SeedSequence.spawn. Results are therefore bit-for-bit
+    identical for a given seed, independent of the chunk size (and so
+    of `max_bytes`), and independent of how many worker processes the
+    blocks are spread across.
+"""
+
+import numpy as np
+
+from visual_nudges.parallel import run_tasks
+
+# Default cap on the working set of one chunk (indices + gathered values)
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+
+# Replicates per independently seeded block (the unit of parallel work)
+BLOCK_SIZE = 500
+
+# Bytes per resampled element: one int64 index + one float64 value
+_BYTES_PER_ELEMENT = 16
+
+
+def _finite(x):
+    """Return x as a float array with non-finite values removed"""
+    x = np.asarray(x, dtype=float)
+    return x[np.isfinite(x)]
+
+
+def chunk_rows(n, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Number of bootstrap replicates that fit in one chunk.
+
+    Parameters:
+        n: int, size of the group being resampled
+        max_bytes: int, memory cap for one chunk
+
+    Returns:
+        int: replicates per chunk (at least 1)
+    """
+    return max(1, int(max_bytes // (_BYTES_PER_ELEMENT * max(n, 1))))
+
+
+def bootstrap_means(x, B, rng, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Means of B bootstrap resamples of x.
+
+    Parameters:
+        x: 1-D float array (finite values only)
+        B: int, number of bootstrap samples
+        rng: numpy.random.Generator used for the resample indices
+        max_bytes: int, memory cap for one chunk
+
+    Returns:
+        np.ndarray: B replicate means
+    """
+    n = len(x)
+    step = chunk_rows(n, max_bytes)
+    means = np.empty(B)
+
+    for start in range(0, B, step):
+        stop = min(start + step, B)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = np.take(x, idx).mean(axis=1)
+
+    return means
+
+
+def as_seed_sequence(seed):
+    """Return seed as a np.random.SeedSequence"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def bootstrap_group_block(groups, B, seed_seq, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Replicate means of K groups for one block.
+
+    Parameters:
+        groups: list of 1-D float arrays (finite values only)
+        B: int, number of replicates in this block
+        seed_seq: np.random.SeedSequence for this block
+        max_bytes: int, memory cap for one chunk
+
+    Returns:
+        np.ndarray: (K, B) replicate means; NaN rows for groups with n < 2
+    """
+    # One independent stream per group
+    rngs = [np.random.default_rng(s) for s in seed_seq.spawn(len(groups))]
+
+    means = np.full((len(groups), B), np.nan)
+    for k, (x, rng) in enumerate(zip(groups, rngs)):
+        if len(x) >= 2:
+            means[k] = bootstrap_means(x, B, rng, max_bytes)
+
+    return means
+
+
+def bootstrap_block(x_base, x_nudge, B, seed_seq, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Replicate mean differences (nudge - baseline) for one block.
+
+    Parameters:
+        x_base: 1-D float array, baseline group (finite values only)
+        x_nudge: 1-D float array, nudge group (finite values only)
+        B: int, number of replicates in this block
+        seed_seq: np.random.SeedSequence for this block
+        max_bytes: int, memory cap for one chunk
+
+    Returns:
+        np.ndarray: B replicate differences
+    """
+    means = bootstrap_group_block([x_base, x_nudge], B, seed_seq, max_bytes)
+    return means[1] - means[0]
+
+
+def _block_sizes(B, block_size):
+    """Replicates per block"""
+    return [min(block_size, B - start) for start in range(0, B, block_size)]
+
+
+def _block_tasks(x_base, x_nudge, B, seed_seq, max_bytes, block_size):
+    """Split B replicates into seeded block tasks"""
+    sizes = _block_sizes(B, block_size)
+    return [(x_base, x_nudge, size, child, max_bytes)
+            for size, child in zip(sizes, seed_seq.spawn(len(sizes)))]
+
+
+def _summarize(x_base, x_nudge, diffs):
+    """Observed mean difference and percentile 95% CI"""
+    lo, hi = np.percentile(diffs, [2.5, 97.5])
+
+    return {
+        'diff': x_nudge.mean() - x_base.mean(),
+        'lo': lo,
+        'hi': hi
+    }
+
+
+def bootstrap_pairwise(samples, pairs=None, B=5000, seed=None,
+                       max_bytes=DEFAULT_MAX_BYTES, block_size=BLOCK_SIZE,
+                       pool=None):
+    """
+    Bootstrap CIs for pairwise mean differences among K groups.
+
+    Replicate means are drawn once per group (cost grows with K), and
+    every pairwise difference is taken from those shared replicates.
+    Each entry of `samples` (e.g. each metric) gets its own child of
+    `seed`, each block of replicates a grandchild, and each group within
+    a block a great-grandchild, so results do not depend on `pool`.
+
+    Parameters:
+        samples: list (one entry per metric) of lists of K array-likes
+        pairs: list of (a, b) group indices; default all a < b.
+            Differences are group b minus group a.
+        B: int, number of bootstrap samples
+        seed: int or np.random.SeedSequence, root seed
+        max_bytes: int, memory cap for one chunk of replicates
+        block_size: int, replicates per independently seeded block
+        pool: optional executor from visual_nudges.parallel.task_pool
+
+    Returns:
+        list (one per metric) of lists (one per pair) of dict:
+        a, b, mean difference and 95% CI bounds
+    """
+    samples = [[_finite(x) for x in groups] for groups in samples]
+    children = as_seed_sequence(seed).spawn(len(samples))
+    sizes = _block_sizes(B, block_size)
+
+    tasks = []
+    for groups, child in zip(samples, children):
+        tasks.extend((groups, size, block_seed, max_bytes)
+                     for size, block_seed in zip(sizes, child.spawn(len(sizes))))
+
+    block_means = run_tasks(bootstrap_group_block, tasks, pool)
+
+    results = []
+    for m, groups in enumerate(samples):
+        K = len(groups)
+        metric_pairs = pairs if pairs is not None else [
+            (a, b) for a in range(K) for b in range(a + 1, K)
+        ]
+        means = np.hstack(block_means[m * len(sizes):(m + 1) * len(sizes)])
+
+        rows = []
+        for a, b in metric_pairs:
+            if len(groups[a]) < 2 or len(groups[b]) < 2:
+                rows.append({'a': a, 'b': b, 'diff': np.nan, 'lo': np.nan, 'hi': np.nan})
+                continue
+            ci = _summarize(groups[a], groups[b], means[b] - means[a])
+            rows.append({'a': a, 'b': b, **ci})
+        results.append(rows)
+
+    return results
+
+
+def bootstrap_mean_diffs(pairs, B=5000, seed=None, max_bytes=DEFAULT_MAX_BYTES,
+                         block_size=BLOCK_SIZE, pool=None):
+    """
+    Bootstrap CIs for mean differences across many (baseline, nudge) pairs.
+
+    Two-group case of bootstrap_pairwise (same streams, same results).
+
+    Parameters:
+        pairs: list of (x_base, x_nudge) array-like tuples
+        B: int, number of bootstrap samples per pair
+        seed: int or np.random.SeedSequence, root seed
+        max_bytes: int, memory cap for one chunk of replicates
+        block_size: int, replicates per independently seeded block
+        pool: optional executor from visual_nudges.parallel.task_pool
+
+    Returns:
+        list of dict: mean difference and 95% CI bounds, one per pair
+    """
+    results = bootstrap_pairwise(
+        [[x_base, x_nudge] for x_base, x_nudge in pairs],
+        pairs=[(0, 1)], B=B, seed=seed, max_bytes=max_bytes,
+        block_size=block_size, pool=pool
+    )
+    return [{key: rows[0][key] for key in ('diff', 'lo', 'hi')} for rows in results]
+
+
+def bootstrap_mean_diff(x_base, x_nudge, B=5000, seed=None,
+                        max_bytes=DEFAULT_MAX_BYTES, block_size=BLOCK_SIZE,
+                        pool=None):
+    """
+    Calculate bootstrap confidence intervals for mean difference.
+
+    Parameters:
+        x_base: array-like, baseline group
+        x_nudge: array-like, nudge group
+        B: int, number of bootstrap samples
+        seed: int or np.random.SeedSequence, seed for the generators
+        max_bytes: int, memory cap for one chunk of replicates
+        block_size: int, replicates per independently seeded block
+        pool: optional executor from visual_nudges.parallel.task_pool
+
+    Returns:
+        dict: mean difference and 95% CI bounds
+    """
+    x_base = _finite(x_base)
+    x_nudge = _finite(x_nudge)
+
+    if len(x_base) < 2 or len(x_nudge) < 2:
+        return {'diff': np.nan, 'lo': np.nan, 'hi': np.nan}
+
+    tasks = _block_tasks(x_base, x_nudge, B, as_seed_sequence(seed),
+                         max_bytes, block_size)
+    diffs = np.concatenate(run_tasks(bootstrap_block, tasks, pool))
+
+    return _summarize(x_base, x_nudge, diffs)
@@ -0,0 +1,304 @@
+"""
+cleaning.py
+
+Purpose:
+    Structural cleaning steps for the peer review export, shared by the
+    in-memory and streaming modes of 01_data_cleaning.py:
+    - standardizes column names
+    - enforces data types
+    - removes empty or malformed records
+    - flags (or blanks) placeholder and boilerplate comments
+
+    Every structural step works on any row subset of the export, so the
+    same functions are applied to the whole table or to one chunk at a
+    time. Boilerplate detection compares comments across the whole
+    export (see visual_nudges/duplicates.py): its flags are computed
+    once and then applied to each chunk.
+
+Compact dtypes (--compact):
+    rubric_score      nullable Int8 (1 byte + mask instead of 8 bytes)
+    written_comment   categorical of Arrow-backed strings: each distinct
+                      comment is stored once, not once per criterion row
+    semester, submission_id, rubric_criterion
+                      categoricals whose categories are shared by every
+                      chunk of the export (SharedCategories): each label
+                      is stored once, keeps its code in every chunk, and
+                      chunks concatenate without falling back to object
+                      columns
+    Filtering is done in place, and with inplace=True clean_frame()
+    reuses the raw frame instead of copying it.
+"""
+
+import numpy as np
+import pandas as pd
+
+from visual_nudges.constants import DEFAULT_MIN_REVIEWS
+from visual_nudges.duplicates import flag_boilerplate
+from visual_nudges.features import reviewer_keys
+
+# Rubric scores in compact mode (small integers, missing allowed)
+COMPACT_SCORE_DTYPE = "Int8"
+
+# Expected minimal columns (adjust names to match your export)
+EXPECTED_COLUMNS = [
+    "semester",              # e.g., "Fall 2025", "Spring 2025"
+    "condition",             # "baseline" or "nudge"
+    "submission_id",         # identifier for visualization artifact
+    "rubric_criterion",      # name of rubric dimension
+    "rubric_score",          # numeric score
+    "written_comment"        # qualitative feedback
+]
+
+
+def standardize_columns(df):
+    """Lowercase column names and replace spaces with underscores (in place)"""
+    df.columns = (df.columns
+                  .astype(str)
+                  .str.lower()
+                  .str.replace(' ', '_')
+                  .str.replace('[^a-zA-Z0-9_]', '', regex=True))
+    return df
+
+
+def validate_columns(df):
+    """
+    Check that the export has the expected minimal columns.
+
+    Raises:
+        ValueError: if any of EXPECTED_COLUMNS is missing
+    """
+    missing_cols = set(EXPECTED_COLUMNS) - set(df.columns)
+
+    if missing_cols:
+        raise ValueError(
+            f"ERROR: Missing required columns: {', '.join(missing_cols)}"
+        )
+
+
+class SharedCategories:
+    """
+    Categorical dtypes shared by all chunks of one export.
+
+    The categories of a column are built from the first chunk and only
+    extended afterwards (new levels are appended in sorted order), so
+    every level keeps its code across chunks and semesters.
+    """
+
+    COLUMNS = ("semester", "submission_id", "rubric_criterion")
+
+    def __init__(self):
+        self.dtypes = {}
+
+    def encode(self, values, column):
+        """Categorical of `values` with the shared categories of `column`"""
+        dtype = self.dtypes.get(column)
+
+        # Only the distinct values are looked up in the categories
+        codes, levels = pd.factorize(values)
+        levels = pd.Index(levels)
+
+        new = levels if dtype is None else levels[~levels.isin(dtype.categories)]
+        if dtype is None or len(new):
+            try:
+                new = new.sort_values()
+            except TypeError:
+                pass  # mixed types: keep the order of appearance
+            dtype = pd.CategoricalDtype(new if dtype is None else dtype.categories.append(new))
+            self.dtypes[column] = dtype
+
+        level_codes = dtype.categories.get_indexer(levels)
+        return pd.Categorical.from_codes(np.where(codes >= 0, level_codes[codes], -1), dtype=dtype)
+
+    def align(self, df):
+        """Recast shared columns of an earlier chunk to the current categories (in place)"""
+        for column, dtype in self.dtypes.items():
+            if column in df.columns and df[column].dtype != dtype:
+                df[column] = df[column].astype(dtype)
+        return df
+
+
+def compact_comment_dtype():
+    """Arrow-backed string dtype (pandas' own string storage without pyarrow)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return pd.StringDtype()
+    return pd.StringDtype("pyarrow")
+
+
+def compact_scores(scores):
+    """
+    Rubric scores as nullable 8-bit integers.
+
+    Raises:
+        ValueError: if a score is not an integer in the Int8 range
+    """
+    values = pd.to_numeric(scores, errors='coerce')
+    observed = values.dropna()
+    info = np.iinfo(np.int8)
+
+    if ((observed % 1 != 0) | (observed < info.min) | (observed > info.max)).any():
+        raise ValueError(
+            "ERROR: Compact dtypes store rubric scores as 8-bit integers, "
+            "but the export has non-integer or out-of-range scores "
+            "(run without --compact)"
+        )
+    return values.astype(COMPACT_SCORE_DTYPE)
+
+
+def coerce_types(df, compact=False, categories=None):
+    """
+    Enforce the analysis dtypes (in place).
+
+    Parameters:
+        df: pd.DataFrame, export rows with standardized column names
+        compact: bool, use the compact dtypes (see module docstring)
+        categories: SharedCategories of the export (compact mode;
+            default: categories of this frame only)
+
+    Returns:
+        pd.DataFrame: df
+    """
+    df['condition'] = pd.Categorical(
+        df['condition'],
+        categories=['baseline', 'nudge'],
+        ordered=True
+    )
+
+    if compact:
+        categories = categories if categories is not None else SharedCategories()
+        for column in SharedCategories.COLUMNS:
+            df[column] = categories.encode(df[column], column)
+        df['rubric_score'] = compact_scores(df['rubric_score'])
+        df['written_comment'] = df['written_comment'].astype(compact_comment_dtype())
+        return df
+
+    df['semester'] = df['semester'].astype('category')
+    df['submission_id'] = df['submission_id'].astype('category')
+    df['rubric_criterion'] = df['rubric_criterion'].astype('category')
+    df['rubric_score'] = pd.to_numeric(df['rubric_score'], errors='coerce')
+    df['written_comment'] = df['written_comment'].astype(str)
+    return df
+
+
+def drop_invalid(df):
+    """Remove records without a score, criterion or valid condition (in place)"""
+    invalid = ~(
+        df['rubric_score'].notna() &
+        df['rubric_criterion'].notna() &
+        df['condition'].notna()
+    ).to_numpy()
+
+    if invalid.any():
+        # Rows are dropped by label
+        if not df.index.is_unique:
+            df.reset_index(drop=True, inplace=True)
+        df.drop(index=df.index[invalid], inplace=True)
+    return df
+
+
+def tidy_comments(df):
+    """Trim comments and make empty comments explicit NaN (in place)"""
+    # Trim whitespace in comments
+    comments = df['written_comment'].str.strip()
+
+    # Ensure empty comments are explicit NaN ('nan' comes from astype(str);
+    # isin() never yields missing values, also for nullable strings)
+    df['written_comment'] = comments.mask(comments.isin(['', 'nan']))
+    return df
+
+
+def clean_frame(df_raw, compact=False, categories=None, inplace=False):
+    """
+    Apply all structural cleaning steps to (a chunk of) the raw export.
+
+    Parameters:
+        df_raw: pd.DataFrame, raw export rows
+        compact: bool, use the compact dtypes (see module docstring)
+        categories: SharedCategories shared by the chunks of the export
+            (compact mode)
+        inplace: bool, clean df_raw itself instead of a copy (the caller
+            must not use the raw rows afterwards)
+
+    Returns:
+        pd.DataFrame: cleaned rows (df_raw itself when inplace=True)
+    """
+    df = standardize_columns(df_raw if inplace else df_raw.copy())
+    validate_columns(df)
+    coerce_types(df, compact=compact, categories=categories)
+    tidy_comments(drop_invalid(df))
+
+    if compact:
+        # Exports repeat a review's comment on every criterion row: as a
+        # categorical each distinct text is stored once (in order of
+        # appearance; sorting the texts is not needed)
+        codes, texts = pd.factorize(df['written_comment'])
+        df['written_comment'] = pd.Categorical.from_codes(codes, dtype=pd.CategoricalDtype(texts))
+    return df
+
+
+def concat_chunks(frames, categories=None):
+    """
+    Concatenate cleaned chunks without widening their categoricals.
+
+    Parameters:
+        frames: list of pd.DataFrame, cleaned chunks with the same columns
+        categories: SharedCategories of the export (compact mode); its
+            columns are aligned to the final categories first
+
+    Returns:
+        pd.DataFrame: all rows (RangeIndex); categoricals whose
+        categories differ between chunks are merged with
+        union_categoricals instead of becoming object columns
+    """
+    from pandas.api.types import union_categoricals
+
+    if categories is not None:
+        for frame in frames:
+            categories.align(frame)
+
+    columns = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        dtype = parts[0].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and any(p.dtype != dtype for p in parts):
+            columns[column] = union_categoricals(parts, ignore_order=True)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def boilerplate_flags(df, min_reviews=DEFAULT_MIN_REVIEWS):
+    """
+    Near-duplicate clusters and boilerplate flags of the cleaned comments.
+
+    Parameters:
+        df: pd.DataFrame, cleaned rows of the whole export
+        min_reviews: int, distinct reviews that make a cluster boilerplate
+
+    Returns:
+        pd.DataFrame: comment_cluster, is_boilerplate (index of df)
+    """
+    keys = reviewer_keys(df)
+    return flag_boilerplate(df["written_comment"], [df[k] for k in keys], min_reviews)
+
+
+def apply_boilerplate(df, flags, mode):
+    """
+    Record boilerplate flags on cleaned rows (in place).
+
+    Parameters:
+        df: pd.DataFrame, cleaned rows
+        flags: pd.DataFrame from boilerplate_flags(), aligned row by row
+        mode: 'flag' adds comment_cluster and is_boilerplate;
+              'drop' also blanks the boilerplate comments (NaN), so they
+              count as no comment downstream (rows and scores are kept)
+
+    Returns:
+        pd.DataFrame: df
+    """
+    df["comment_cluster"] = flags["comment_cluster"].to_numpy()
+    df["is_boilerplate"] = flags["is_boilerplate"].to_numpy()
+    if mode == "drop":
+        df.loc[df["is_boilerplate"], "written_comment"] = np.nan
+    return df
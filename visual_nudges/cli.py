@@ -0,0 +1,65 @@
+"""
+cli.py
+
+Purpose:
+    Command-line entry point: python -m visual_nudges <command> [options]
+
+Commands:
+    clean      01_data_cleaning.py
+    features   01b_feature_extraction.py
+    describe   02_descriptive_statistics.py
+    analyze    03_analysis.py
+    figures    Figures 2-4
+
+Notes:
+    Only the selected stage module is imported, and stage modules load
+    pandas, scipy, statsmodels and the plotting stack inside run(), so
+    `--help` and lightweight commands such as `describe` do not pay for
+    dependencies they never use.
+"""
+
+import argparse
+import importlib
+
+from visual_nudges.stages import STAGES
+
+
+def build_parser(command=None):
+    """
+    Argument parser with one subcommand per stage.
+
+    Parameters:
+        command: str, the requested subcommand; only its stage module is
+            imported (None = import all, e.g. for --help)
+
+    Returns:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m visual_nudges",
+        description="Visual Nudges analysis pipeline."
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command", required=True)
+
+    for name, module_name in STAGES.items():
+        if command in STAGES and name != command:
+            # Listed for argparse, but its module is never imported
+            subparsers.add_parser(name)
+            continue
+        module = importlib.import_module(module_name)
+        subparser = subparsers.add_parser(name, help=module.SUMMARY, description=module.SUMMARY)
+        module.add_arguments(subparser)
+        subparser.set_defaults(run=module.run)
+
+    return parser
+
+
+def main(argv=None):
+    """Parse the command line and run the selected stage"""
+    import sys
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    command = next((a for a in argv if not a.startswith("-")), None)
+
+    args = build_parser(command).parse_args(argv)
+    args.run(args)
@@ -0,0 +1,41 @@
+"""
+constants.py
+
+Purpose:
+    Lightweight shared constants.
+
+    Kept free of third-party imports so the command-line interface can
+    build its options without loading pandas or numpy.
+"""
+
+# Storage formats for data/clean/ and data/features/
+STORAGE_FORMATS = ("csv", "parquet")
+
+# Ordered condition levels (Baseline first, Nudge second)
+CONDITION_CATEGORIES = ["baseline", "nudge"]
+
+# Handling of boilerplate/near-duplicate comments in the cleaning stage
+BOILERPLATE_MODES = ("keep", "flag", "drop")
+
+# A near-duplicate comment cluster found in at least this many distinct
+# reviews counts as boilerplate
+DEFAULT_MIN_REVIEWS = 3
+
+# Rows per chunk for streaming ingestion
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Cohort workbooks the figures are drawn from (Baseline, Visual Nudge)
+COHORT_WORKBOOKS = ("Baseline Spring 2025.xlsx", "Visual Nudges Fall 2025.xlsx")
+
+# Figure outputs: PNG file per figure and the digest manifest
+FIGURES_DIR = "results/figures"
+FIGURE_FILES = {
+    "2": "Effect_of_Visual_Nudges_Articulation.png",
+    "3": "rubric_dimension_VIS_clean.png",
+    "4": "Figure4_Comparative_References.png",
+}
+FIGURES_MANIFEST = "figures_manifest.json"
+
+# Random seed for reproducibility. Per-metric and per-block streams are
+# spawned from it with np.random.SeedSequence.spawn.
+RANDOM_SEED = 20260209
@@ -0,0 +1,162 @@
+"""
+descriptives.py
+
+Purpose:
+    Grouped descriptive statistics (n, mean, SD, median, IQR, min, max)
+    shared by 02_descriptive_statistics.py and 03_analysis.py.
+
+    Rows are put in group order once (a stable sort of the integer
+    group codes, shared by all metrics). For each metric, each group's
+    segment is then sorted once in place, and every quantile as well as
+    the min and max is read straight from that sort by index
+    arithmetic. Means and SDs come from vectorized bincount reductions.
+    This replaces groupby().agg() with Python lambdas, which sorted each
+    group again for every quantile.
+
+Quantiles use linear interpolation, matching pandas' default.
+"""
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ["n", "mean", "sd", "median", "iqr", "min", "max"]
+
+
+def group_codes(df, group_col):
+    """
+    Integer group codes for each row and the observed group labels.
+
+    Categorical columns keep their category order; other columns are
+    sorted. Rows with a missing group get code -1.
+
+    Returns:
+        tuple: (codes array, list of observed group labels)
+    """
+    col = df[group_col]
+
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        codes = col.cat.codes.to_numpy()
+        labels = list(col.cat.categories)
+    else:
+        codes, uniques = pd.factorize(col, sort=True)
+        labels = list(uniques)
+
+    # Keep only observed groups, in order
+    observed = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(labels)))
+    remap = np.full(len(labels) + 1, -1)
+    remap[observed] = np.arange(len(observed))
+    codes = remap[codes]  # code -1 maps to remap[-1] == -1
+
+    return codes, [labels[i] for i in observed]
+
+
+def _sorted_quantile(values, starts, n, q):
+    """Linear-interpolated quantile q of each sorted group segment"""
+    pos = starts + q * (n - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    frac = pos - lo
+    return values[lo] + (values[hi] - values[lo]) * frac
+
+
+def metric_descriptives(values, seg_codes, starts, sizes):
+    """
+    Descriptive statistics of one metric for every group.
+
+    Parameters:
+        values: 1-D float array in group order (modified in place:
+            each group's segment is sorted, non-finite values last)
+        seg_codes: 1-D int array, group code of each position
+        starts: (K,) int array, first position of each group
+        sizes: (K,) int array, rows per group
+
+    Returns:
+        dict: statistic name -> (K,) array
+    """
+    K = len(starts)
+    values[~np.isfinite(values)] = np.nan
+
+    # One in-place sort per group segment (NaN sorts last)
+    for s, k in zip(starts, sizes):
+        values[s:s + k].sort()
+
+    finite = ~np.isnan(values)
+    n = np.bincount(seg_codes[finite], minlength=K)
+
+    out = {name: np.full(K, np.nan) for name in STATISTICS}
+    out["n"] = n
+
+    has = n > 0
+    if not has.any():
+        return out
+
+    v = values[finite]
+    c = seg_codes[finite]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(c, weights=v, minlength=K) / n
+        ss = np.bincount(c, weights=(v - mean[c]) ** 2, minlength=K)
+        sd = np.sqrt(ss / (n - 1))
+
+    s, k = starts[has], n[has]
+    q25 = _sorted_quantile(values, s, k, 0.25)
+    q75 = _sorted_quantile(values, s, k, 0.75)
+
+    out["mean"][has] = mean[has]
+    out["sd"] = np.where(n >= 2, sd, np.nan)
+    out["median"][has] = _sorted_quantile(values, s, k, 0.5)
+    out["iqr"][has] = q75 - q25
+    out["min"][has] = values[s]
+    out["max"][has] = values[s + k - 1]
+
+    return out
+
+
+def grouped_descriptives(df, group_col, metrics):
+    """
+    Long-format descriptive statistics by group and metric.
+
+    Parameters:
+        df: pd.DataFrame
+        group_col: str, grouping column (e.g. 'condition')
+        metrics: list of str, numeric columns
+
+    Returns:
+        pd.DataFrame: columns group_col, metric, n, mean, sd, median,
+        iqr, min, max; one row per (group, metric)
+    """
+    codes, groups = group_codes(df, group_col)
+
+    # Group order, computed once for all metrics (rows without a group dropped)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    seg_codes = codes[order]
+    sizes = np.bincount(seg_codes, minlength=len(groups))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+    frames = []
+    for metric in metrics:
+        values = df[metric].to_numpy(dtype=float, na_value=np.nan)[order]
+        stats = metric_descriptives(values, seg_codes, starts, sizes)
+        frames.append(pd.DataFrame({
+            group_col: groups,
+            "metric": metric,
+            **stats
+        }))
+
+    result = pd.concat(frames, ignore_index=True)
+
+    if isinstance(df[group_col].dtype, pd.CategoricalDtype):
+        result[group_col] = pd.Categorical(
+            result[group_col], dtype=df[group_col].dtype
+        )
+
+    return result
+
+
+def group_sizes(df, group_col):
+    """Number of rows per observed group (including missing values)"""
+    codes, groups = group_codes(df, group_col)
+    return pd.Series(
+        np.bincount(codes[codes >= 0], minlength=len(groups)),
+        index=pd.Index(groups, name=group_col)
+    )
@@ -0,0 +1,284 @@
+"""
+duplicates.py
+
+Purpose:
+    Near-duplicate and boilerplate detection for written comments
+    (e.g. "I like it. I approved." pasted into many reviews, or
+    templated comments reused across semesters).
+
+    Comments are normalized (lowercase, punctuation removed, whitespace
+    collapsed) and exact duplicates are merged first. Each distinct
+    text is then summarized by a MinHash signature of its character
+    shingles, and locality-sensitive hashing (LSH) groups texts whose
+    signatures agree on a whole band. Only texts that share a band are
+    compared, so the cost grows with the number of comments instead of
+    the number of comment pairs.
+
+MinHash:
+    One-permutation hashing: every shingle hash is assigned to one of
+    `num_perm` bins by its top bits and each bin keeps its minimum;
+    empty bins (short texts) borrow the nearest non-empty bin to their
+    right (rotation densification). This gives `num_perm` MinHash
+    values from a single hash per shingle, computed as array operations
+    over one byte buffer of all texts.
+
+Clusters:
+    Candidate pairs from LSH are kept when their signatures agree on at
+    least `threshold` of the positions (estimated Jaccard similarity of
+    the shingle sets); clusters are the connected components of the
+    kept pairs. A comment is boilerplate when it is a placeholder (see
+    visual_nudges/text.py) or when its cluster appears in at least
+    `min_reviews` distinct reviews.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from visual_nudges.constants import DEFAULT_MIN_REVIEWS
+from visual_nudges.text import is_placeholder
+
+# Defaults: 64 MinHash values in 16 bands of 4 (LSH S-curve midpoint
+# around Jaccard 0.5), verified at an estimated Jaccard of 0.6
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_SHINGLE = 5
+
+# Distinct texts hashed per block (bounds the signature work arrays)
+_TEXT_BLOCK = 50_000
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+_SHINGLE_BASE = np.uint64(0x100000001B3)
+
+
+def normalize_comment(text):
+    """Lowercase words of a comment separated by single spaces ('' if none)"""
+    if text.__class__ is not str:
+        return ""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def _mix(x):
+    """splitmix64 finalizer (uint64 array -> well-spread uint64 hashes)"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _shingle_hashes(texts, shingle):
+    """
+    Hashes of the byte shingles of every text.
+
+    Texts shorter than `shingle` bytes form one shingle.
+
+    Returns:
+        tuple: (uint64 hashes, (n,) shingles per text); the hashes are
+        grouped text by text in input order
+    """
+    encoded = [t.encode("utf-8") for t in texts]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    buffer = np.frombuffer(b"\n".join(encoded), dtype=np.uint8)
+    starts = np.cumsum(lengths + 1) - lengths - 1
+
+    counts = np.where(lengths > 0, np.maximum(lengths - shingle + 1, 1), 0)
+    owner = np.repeat(np.arange(len(texts)), counts)
+    offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    position = starts[owner] + offset
+    width = np.minimum(lengths[owner], shingle)
+
+    # Polynomial hash of the (up to `shingle`) bytes at each position;
+    # bytes are offset by one so shorter shingles hash differently
+    hashes = np.zeros(len(position), dtype=np.uint64)
+    last = max(len(buffer) - 1, 0)
+    for k in range(shingle):
+        byte = buffer[np.minimum(position + k, last)].astype(np.uint64) + np.uint64(1)
+        hashes = hashes * _SHINGLE_BASE + np.where(k < width, byte, np.uint64(0))
+
+    return _mix(hashes), counts
+
+
+def minhash_signatures(texts, num_perm=DEFAULT_NUM_PERM, shingle=DEFAULT_SHINGLE):
+    """
+    MinHash signatures of texts (one-permutation hashing, densified).
+
+    Parameters:
+        texts: list of non-empty str
+        num_perm: int, signature length (power of two)
+        shingle: int, shingle size in bytes
+
+    Returns:
+        np.ndarray: (n, num_perm) uint32 signatures
+    """
+    bits = int(num_perm).bit_length() - 1
+    if num_perm < 2 or 1 << bits != num_perm:
+        raise ValueError(f"ERROR: num_perm must be a power of two >= 2 (got {num_perm})")
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    columns = np.arange(num_perm)
+
+    for block in range(0, len(texts), _TEXT_BLOCK):
+        chunk = texts[block:block + _TEXT_BLOCK]
+        hashes, counts = _shingle_hashes(chunk, shingle)
+        owner = np.repeat(np.arange(len(chunk)), counts)
+
+        # Top bits choose the bin, the next 32 bits are the value
+        bins = (hashes >> np.uint64(64 - bits)).astype(np.int64)
+        values = ((hashes << np.uint64(bits)) & _MASK64) >> np.uint64(32)
+
+        sig = np.full(len(chunk) * num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        np.minimum.at(sig, owner * num_perm + bins, values)
+        sig = sig.reshape(len(chunk), num_perm)
+
+        # Rotation densification: an empty bin takes the nearest
+        # non-empty bin to its right (circularly), offset by the distance
+        filled = sig != np.iinfo(np.uint64).max
+        index = np.where(filled, columns, 2 * num_perm)
+        index = np.concatenate([index, np.where(filled, columns + num_perm, 2 * num_perm)], axis=1)
+        nearest = np.minimum.accumulate(index[:, ::-1], axis=1)[:, ::-1][:, :num_perm]
+        source = np.take_along_axis(sig, nearest % num_perm, axis=1)
+        dense = source + (nearest - columns).astype(np.uint64) * np.uint64(1 << 32)
+
+        signatures[block:block + len(chunk)] = (_mix(dense) >> np.uint64(32)).astype(np.uint32)
+
+    return signatures
+
+
+def lsh_clusters(signatures, bands=DEFAULT_BANDS, threshold=DEFAULT_THRESHOLD):
+    """
+    Cluster signatures with banded LSH.
+
+    Parameters:
+        signatures: (n, num_perm) array from minhash_signatures()
+        bands: int, number of LSH bands (must divide num_perm)
+        threshold: float, minimum share of equal signature positions
+            for a candidate pair to be linked
+
+    Returns:
+        np.ndarray: (n,) int64 cluster labels (0..k-1, in order of first
+        appearance)
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"ERROR: bands ({bands}) must divide num_perm ({num_perm})")
+    rows = num_perm // bands
+
+    pairs = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = np.zeros(n, dtype=np.uint64)
+        for column in block.T:
+            keys = _mix(keys ^ column)
+
+        # Link every text to the first text with the same band key
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        first = np.ones(n, dtype=bool)
+        first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        leader = order[np.maximum.accumulate(np.where(first, np.arange(n), 0))]
+        pairs.append(np.stack([leader[~first], order[~first]], axis=1))
+
+    # Distinct pairs (a text pair can share several bands)
+    keys = np.unique(np.concatenate(pairs) @ np.array([n, 1]))
+    pairs = np.stack([keys // max(n, 1), keys % max(n, 1)], axis=1)
+
+    # Keep candidates whose estimated Jaccard similarity is high enough
+    agreement = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    pairs = pairs[agreement >= threshold]
+
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n)
+    )
+    _, labels = connected_components(graph, directed=False)
+
+    # Renumber in order of first appearance
+    _, first_seen, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first_seen))[inverse].astype(np.int64)
+
+
+def near_duplicate_clusters(comments, num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS,
+                            threshold=DEFAULT_THRESHOLD, shingle=DEFAULT_SHINGLE):
+    """
+    Near-duplicate cluster of every comment.
+
+    Parameters:
+        comments: pd.Series (or iterable) of comment texts; NaN allowed
+        num_perm, bands, threshold, shingle: see minhash_signatures()
+            and lsh_clusters()
+
+    Returns:
+        np.ndarray: (n,) int64 cluster ids, -1 for comments without words
+    """
+    normalized = [normalize_comment(text) for text in comments]
+    codes, texts = pd.factorize(pd.Series(normalized, dtype=object))
+
+    # Exact duplicates share one signature; '' has no cluster
+    texts = list(texts)
+    labels = np.full(len(texts) + 1, -1, dtype=np.int64)
+    nonempty = np.flatnonzero([len(t) > 0 for t in texts])
+    if len(nonempty):
+        signatures = minhash_signatures([texts[i] for i in nonempty], num_perm, shingle)
+        labels[nonempty] = lsh_clusters(signatures, bands, threshold)
+
+    return labels[codes]
+
+
+def flag_boilerplate(comments, reviews, min_reviews=DEFAULT_MIN_REVIEWS, **options):
+    """
+    Flag placeholder and boilerplate comments.
+
+    Parameters:
+        comments: pd.Series of comment texts (NaN allowed)
+        reviews: pd.Series (or list of Series) identifying the review each
+            row belongs to; exports repeat a review's comment on every
+            criterion row, so clusters are sized in distinct reviews
+        min_reviews: int, a cluster found in at least this many distinct
+            reviews is boilerplate
+        **options: passed to near_duplicate_clusters()
+
+    Returns:
+        pd.DataFrame (index of `comments`): comment_cluster (int64, -1
+        for no comment) and is_boilerplate (bool)
+    """
+    # No rows (e.g. every record was invalid): nothing to flag
+    if len(comments) == 0:
+        return pd.DataFrame({
+            "comment_cluster": np.zeros(0, dtype=np.int64),
+            "is_boilerplate": np.zeros(0, dtype=bool),
+        }, index=comments.index)
+
+    clusters = near_duplicate_clusters(comments, **options)
+
+    if isinstance(reviews, pd.Series):
+        reviews = [reviews]
+    review_codes = pd.MultiIndex.from_arrays(
+        [pd.Series(r).to_numpy() for r in reviews]
+    ).factorize()[0]
+
+    # Distinct reviews per cluster
+    has_cluster = clusters >= 0
+    pairs = np.unique(
+        np.stack([clusters[has_cluster], review_codes[has_cluster]], axis=1), axis=0
+    )
+    n_reviews = np.bincount(pairs[:, 0], minlength=clusters.max() + 1)
+
+    templated = np.zeros(len(clusters), dtype=bool)
+    templated[has_cluster] = n_reviews[clusters[has_cluster]] >= min_reviews
+
+    placeholder = np.fromiter(
+        (text.__class__ is str and is_placeholder(text) for text in comments),
+        dtype=bool, count=len(clusters)
+    )
+
+    return pd.DataFrame({
+        "comment_cluster": clusters,
+        "is_boilerplate": templated | placeholder,
+    }, index=comments.index)
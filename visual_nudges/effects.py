@@ -0,0 +1,161 @@
+"""
+effects.py
+
+Purpose:
+    Standardized effect sizes for between-condition comparisons.
+
+K cohorts:
+    group_moments() computes per-group n, sum and sum of squares for
+    every metric in a single grouped reduction; pairwise_effects()
+    derives every pairwise mean difference and Hedges' g from those
+    sufficient statistics, so comparing K conditions, semesters or
+    interface variants costs one pass over the data rather than one
+    full-data filter per pair and metric.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def group_moments(df, group_col, metrics):
+    """
+    Sufficient statistics per group and metric from one grouped reduction.
+
+    Values are centered on each metric's overall mean before summing,
+    which keeps the sum-of-squares variance numerically stable.
+
+    Parameters:
+        df: pd.DataFrame
+        group_col: str, column defining the K groups (category order,
+            or sorted order, is the group order)
+        metrics: list of str, numeric columns
+
+    Returns:
+        dict with
+            groups: list of K group labels
+            metrics: list of M metric names
+            n, sum, sumsq: (K, M) arrays over finite values (centered)
+            shift: (M,) centering constants
+    """
+    values = df[metrics].astype(float)
+    values = values.where(np.isfinite(values))
+
+    shift = values.mean()
+    centered = values - shift
+    filled = centered.fillna(0.0)
+
+    stacked = pd.concat(
+        {
+            'n': centered.notna().astype(np.int64),
+            'sum': filled,
+            'sumsq': filled ** 2,
+        },
+        axis=1
+    )
+    sums = stacked.groupby(df[group_col], observed=True, sort=True).sum()
+
+    return {
+        'groups': list(sums.index),
+        'metrics': list(metrics),
+        'n': sums['n'][metrics].to_numpy(),
+        'sum': sums['sum'][metrics].to_numpy(),
+        'sumsq': sums['sumsq'][metrics].to_numpy(),
+        'shift': shift[metrics].fillna(0.0).to_numpy(),
+    }
+
+
+def moment_summary(moments):
+    """
+    Means and sample variances from group_moments output.
+
+    Returns:
+        tuple of (K, M) arrays: n, mean, variance (ddof=1)
+    """
+    n = moments['n'].astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centered_mean = moments['sum'] / n
+        var = (moments['sumsq'] - moments['sum'] * centered_mean) / (n - 1)
+    mean = centered_mean + moments['shift']
+    var = np.where(n >= 2, np.maximum(var, 0.0), np.nan)
+    return n, mean, var
+
+
+def pairwise_effects(moments, pairs=None):
+    """
+    Mean differences and Hedges' g for every pair of groups.
+
+    Parameters:
+        moments: dict from group_moments
+        pairs: list of (a, b) group indices; default all a < b.
+            Differences are group b minus group a.
+
+    Returns:
+        pd.DataFrame: one row per (metric, pair) with group labels,
+        sizes, means, mean difference and Hedges' g
+    """
+    n, mean, var = moment_summary(moments)
+    K = len(moments['groups'])
+
+    if pairs is None:
+        pairs = [(a, b) for a in range(K) for b in range(a + 1, K)]
+    a_idx = np.array([a for a, _ in pairs], dtype=int)
+    b_idx = np.array([b for _, b in pairs], dtype=int)
+
+    # (P, M) arrays for all pairs and metrics at once
+    n1, n2 = n[a_idx], n[b_idx]
+    m1, m2 = mean[a_idx], mean[b_idx]
+    v1, v2 = var[a_idx], var[b_idx]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Pooled standard deviation
+        sp = np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+
+        # Cohen's d with correction factor J for Hedges' g
+        d = (m2 - m1) / sp
+        J = 1 - (3 / (4 * (n1 + n2) - 9))
+        g = J * d
+
+    valid = (n1 >= 2) & (n2 >= 2) & np.isfinite(sp) & (sp > 0)
+    g = np.where(valid, g, np.nan)
+    diff = np.where((n1 >= 1) & (n2 >= 1), m2 - m1, np.nan)
+
+    P, M = len(pairs), len(moments['metrics'])
+    groups = np.array(moments['groups'], dtype=object)
+
+    return pd.DataFrame({
+        'metric': np.tile(moments['metrics'], P),
+        'group_a': np.repeat(groups[a_idx], M),
+        'group_b': np.repeat(groups[b_idx], M),
+        'n_a': n1.ravel().astype(np.int64),
+        'n_b': n2.ravel().astype(np.int64),
+        'mean_a': m1.ravel(),
+        'mean_b': m2.ravel(),
+        'mean_diff_b_minus_a': diff.ravel(),
+        'hedges_g_b_minus_a': g.ravel(),
+    })
+
+
+def group_samples(df, group_col, metrics, groups=None):
+    """
+    Per-metric lists of per-group value arrays, from one group split.
+
+    Parameters:
+        df: pd.DataFrame
+        group_col: str, grouping column
+        metrics: list of str
+        groups: list of group labels (default: sorted/category order)
+
+    Returns:
+        tuple: (groups, list over metrics of lists over groups of arrays)
+    """
+    positions = df.groupby(group_col, observed=True, sort=True).indices
+    if groups is None:
+        groups = list(positions)
+
+    empty = np.array([], dtype=np.intp)
+    samples = []
+    for metric in metrics:
+        values = df[metric].to_numpy(dtype=float, na_value=np.nan)
+        samples.append([values[positions.get(g, empty)] for g in groups])
+
+    return groups, samples
@@ -0,0 +1,166 @@
+"""
+features.py
+
+Purpose:
+    Build reviewer-level features from the cleaned, long-format
+    peer review data (one row per rubric criterion per review).
+
+    All features are computed with batched text metrics, one compiled
+    lexicon scan and a single grouped reduction, so the cost is one pass
+    over the comment rows regardless of how many reviewers there are.
+
+Rubric coverage:
+    A criterion counts as addressed when any of the reviewer's comments
+    discusses it, judged from the comment text by keyword phrases (see
+    visual_nudges/rubric.py). The criterion label of the row a comment
+    sits on does not count by itself: exports repeat each review's
+    comment on every criterion row.
+
+Comment counts:
+    For the same reason, n_comments, total_words and the comparative
+    counts take each distinct comment of a review once: repeats of a
+    (reviewer, submission, comment) on further criterion rows are not
+    counted again. Scores are summarized over every criterion row.
+
+Reviewer key:
+    Exports that carry a `reviewer_id` column are grouped by it.
+    Otherwise each (semester, condition, submission_id) review is
+    treated as one reviewer record.
+"""
+
+import numpy as np
+import pandas as pd
+
+from visual_nudges.lexicon import LexiconMatcher
+from visual_nudges.rubric import CoverageIndex, group_coverage
+from visual_nudges.text import comment_metrics
+
+# Cues for cross-submission comparative language (case-insensitive,
+# whole words; matched with visual_nudges.lexicon.LexiconMatcher)
+COMPARATIVE_CUES = [
+    "compared to",
+    "compared with",
+    "in comparison",
+    "in contrast",
+    "than the other",
+    "than others",
+    "than most",
+    "unlike",
+    "similar to",
+    "better than",
+    "worse than",
+    "clearer than",
+    "other submissions",
+    "other projects",
+    "other visualizations",
+]
+
+# Columns written to reviewer_level_features.csv (after the key columns)
+FEATURE_COLUMNS = [
+    "n_comments",
+    "total_words",
+    "mean_words_per_comment",
+    "rubric_criteria_addressed",
+    "rubric_coverage_ratio",
+    "comparative_references",
+    "comparative_reference_rate",
+    "score_mean",
+    "score_sd",
+    "score_range",
+]
+
+
+def reviewer_keys(df):
+    """
+    Grouping keys that identify one reviewer record.
+
+    Parameters:
+        df: pd.DataFrame, cleaned long-format data
+
+    Returns:
+        list of str: key columns (always includes semester and condition)
+    """
+    if "reviewer_id" in df.columns:
+        return ["semester", "condition", "reviewer_id"]
+    return ["semester", "condition", "submission_id"]
+
+
+def build_reviewer_features(df, cues=COMPARATIVE_CUES):
+    """
+    Compute reviewer-level features.
+
+    Parameters:
+        df: pd.DataFrame with semester, condition, submission_id,
+            rubric_criterion, rubric_score, written_comment
+            (and optionally reviewer_id)
+        cues: list of str, comparative-language lexicon
+
+    Returns:
+        pd.DataFrame: one row per reviewer with the key columns
+        followed by FEATURE_COLUMNS
+    """
+    keys = reviewer_keys(df)
+    comments = df["written_comment"]
+
+    # Word counts from one batched scan (missing and placeholder
+    # comments count as no comment; see visual_nudges/text.py)
+    text = comment_metrics(comments)
+    has_comment = text["has_text"]
+
+    # Comparative cues from one automaton scan over all comments
+    comparative = LexiconMatcher(cues).count(comments)
+
+    # Criteria each comment discusses, as bitmasks over the rubric's
+    # criteria (see visual_nudges/rubric.py)
+    criteria = sorted(df["rubric_criterion"].dropna().astype(str).unique())
+    criterion_masks = np.where(has_comment, CoverageIndex(criteria).masks(comments), 0)
+
+    # Each comment counts once per review (exports repeat it on every
+    # criterion row)
+    review = list(dict.fromkeys(keys + ["submission_id"]))
+    first = ~df[review + ["written_comment"]].duplicated().to_numpy()
+
+    # Row-level quantities
+    rows = pd.DataFrame({
+        "has_comment": (has_comment & first).astype(np.int64),
+        "words": np.where(first, text["words"], 0),
+        "comparative": pd.Series(np.where(first, comparative, 0), index=df.index),
+        # float64 whatever the stored dtype (e.g. compact Int8 scores)
+        "score": df["rubric_score"].to_numpy(dtype=np.float64, na_value=np.nan),
+    })
+    for key in keys:
+        rows[key] = df[key]
+
+    # Single grouped reduction
+    groups = rows.groupby(keys, observed=True, sort=False)
+    features = groups.agg(
+        n_comments=("has_comment", "sum"),
+        total_words=("words", "sum"),
+        comparative_references=("comparative", "sum"),
+        score_mean=("score", "mean"),
+        score_sd=("score", "std"),
+        score_min=("score", "min"),
+        score_max=("score", "max"),
+    ).reset_index()
+
+    # Criteria addressed: popcount of the OR of each reviewer's bitmasks
+    # (groups are numbered in the same first-appearance order as above)
+    # (rows with a missing key belong to no group)
+    codes = groups.ngroup()
+    grouped = codes.notna().to_numpy()
+    _, features["rubric_criteria_addressed"] = group_coverage(
+        criterion_masks[grouped], codes[grouped].to_numpy(dtype=np.int64), groups.ngroups
+    )
+
+    # Derived ratios
+    n_comments = features["n_comments"].where(features["n_comments"] > 0)
+    features["mean_words_per_comment"] = features["total_words"] / n_comments
+    features["comparative_reference_rate"] = features["comparative_references"] / n_comments
+    features["score_range"] = features["score_max"] - features["score_min"]
+
+    # Coverage relative to the criteria used in each semester's rubric
+    n_criteria = df.groupby("semester", observed=True)["rubric_criterion"].nunique()
+    available = features["semester"].map(n_criteria).astype(float)
+    features["rubric_coverage_ratio"] = features["rubric_criteria_addressed"] / available
+
+    return features[keys + FEATURE_COLUMNS]
@@ -0,0 +1,253 @@
+"""
+ingest.py
+
+Purpose:
+    Ingestion layer for the Excel workbooks exported from the
+    Visual Peer Review Dashboard.
+
+    Parsing .xlsx (openpyxl XML) dominates wall time for anything past
+    a few thousand rows, so each (workbook, sheet) is converted once
+    into a columnar cache file under data/cache/. The cache key is the
+    SHA-256 of the workbook bytes plus the sheet name: later reads load
+    the cached file directly, and a workbook is re-ingested only when
+    its contents change.
+
+Cache layout:
+    data/cache/<workbook stem>-<sha256[:16]>-<sheet>.parquet
+    (.pkl when pyarrow is unavailable or a column is not Arrow-typable)
+
+    data/cache/digests.json remembers (size, mtime) -> digest for each
+    file so unchanged files are not re-hashed on every read. Stages run
+    concurrently by the pipeline update it under an exclusive lock on
+    data/cache/digests.json.lock (fcntl; unlocked where fcntl is
+    unavailable), so no process overwrites another's entries.
+
+Streaming:
+    iter_export_chunks() reads very large exports in bounded row chunks
+    (read-only row iteration for .xlsx, chunked readers for .csv)
+    without ever materializing the whole table.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from visual_nudges.constants import DEFAULT_CHUNK_ROWS
+
+CACHE_DIR = Path("data/cache")
+
+_DIGEST_INDEX = "digests.json"
+_HASH_BLOCK = 1024 ** 2
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's bytes, read in 1 MiB blocks.
+
+    Parameters:
+        path: str or Path
+
+    Returns:
+        str: hex digest
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_index(cache_dir):
+    """Read the digest index (empty if missing or unreadable)"""
+    try:
+        return json.loads((cache_dir / _DIGEST_INDEX).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+@contextlib.contextmanager
+def _index_lock(cache_dir):
+    """Exclusive lock around a read-modify-write of the digest index"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir / f"{_DIGEST_INDEX}.lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _atomic_write(path, write):
+    """Call write(tmp_path) and move the result into place"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def content_digest(path, cache_dir=CACHE_DIR):
+    """
+    Content digest of a file, re-hashing only when size or mtime change.
+
+    Parameters:
+        path: str or Path, file (workbook, intermediate table, ...)
+        cache_dir: Path, cache directory holding the digest index
+
+    Returns:
+        str: hex SHA-256 of the file bytes
+    """
+    path = Path(path).expanduser().resolve()
+    stat = path.stat()
+    key = str(path)
+
+    index = _load_index(cache_dir)
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    digest = file_digest(path)
+
+    # Re-read under the lock: other stages may have added entries since
+    with _index_lock(cache_dir):
+        index = _load_index(cache_dir)
+        index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        _atomic_write(cache_dir / _DIGEST_INDEX,
+                      lambda tmp: Path(tmp).write_text(json.dumps(index, indent=1)))
+
+    return digest
+
+
+def _sheet_tag(sheet_name):
+    """Filesystem-safe tag for a sheet name or index"""
+    if isinstance(sheet_name, int):
+        return f"sheet{sheet_name}"
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(sheet_name))
+
+
+def cache_stem(path, sheet_name=0, cache_dir=CACHE_DIR):
+    """
+    Cache file path (without extension) for a workbook sheet.
+
+    Parameters:
+        path: str or Path, workbook
+        sheet_name: int or str, as accepted by pd.read_excel
+        cache_dir: Path, cache directory
+
+    Returns:
+        Path: cache stem keyed by content hash and sheet name
+    """
+    digest = content_digest(path, cache_dir)
+    stem = re.sub(r"[^A-Za-z0-9_.-]+", "_", Path(path).stem)
+    return cache_dir / f"{stem}-{digest[:16]}-{_sheet_tag(sheet_name)}"
+
+
+def _write_cache(df, stem):
+    """Write df as Parquet, falling back to pickle when Arrow cannot type it"""
+    try:
+        _atomic_write(stem.with_suffix(".parquet"),
+                      lambda tmp: df.to_parquet(tmp, engine="pyarrow", index=False))
+    except (ImportError, TypeError, ValueError):
+        _atomic_write(stem.with_suffix(".pkl"), lambda tmp: df.to_pickle(tmp))
+
+
+def read_excel_cached(path, sheet_name=0, cache_dir=CACHE_DIR):
+    """
+    Read a workbook sheet through the content-hashed cache.
+
+    Parameters:
+        path: str or Path, workbook
+        sheet_name: int or str, as accepted by pd.read_excel
+        cache_dir: str or Path, cache directory
+
+    Returns:
+        pd.DataFrame: the sheet, as pd.read_excel would return it
+        (column names as strings)
+    """
+    cache_dir = Path(cache_dir)
+    stem = cache_stem(path, sheet_name, cache_dir)
+
+    parquet_file = stem.with_suffix(".parquet")
+    if parquet_file.exists():
+        return pd.read_parquet(parquet_file, engine="pyarrow")
+
+    pickle_file = stem.with_suffix(".pkl")
+    if pickle_file.exists():
+        return pd.read_pickle(pickle_file)
+
+    df = pd.read_excel(Path(path).expanduser(), sheet_name=sheet_name)
+    df.columns = [str(c) for c in df.columns]
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _write_cache(df, stem)
+
+    return df
+
+
+def _iter_xlsx_chunks(path, chunk_rows, sheet_name):
+    """Yield DataFrames from a workbook using openpyxl read-only mode"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"Unnamed: {i}"
+                   for i, c in enumerate(header)]
+
+        batch = []
+        for row in rows:
+            # Skip fully empty rows, as pd.read_excel does
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        wb.close()
+
+
+def iter_export_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, sheet_name=0):
+    """
+    Iterate over a dashboard export in row chunks.
+
+    Parameters:
+        path: str or Path, .xlsx or .csv export
+        chunk_rows: int, maximum rows per chunk
+        sheet_name: int or str, worksheet for .xlsx exports
+
+    Yields:
+        pd.DataFrame: consecutive row chunks with the export's columns
+    """
+    path = Path(path).expanduser()
+
+    if path.suffix.lower() == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+    elif path.suffix.lower() in (".xlsx", ".xlsm"):
+        yield from _iter_xlsx_chunks(path, chunk_rows, sheet_name)
+    else:
+        raise ValueError(f"ERROR: Unsupported export format: {path.suffix}")
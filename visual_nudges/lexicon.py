@@ -0,0 +1,391 @@
+"""
+lexicon.py
+
+Purpose:
+    Multi-pattern lexicon matching for comment text (e.g. the
+    comparative cues "compared to", "than the other", "unlike", ...).
+
+    The lexicon is compiled once into an Aho-Corasick automaton over
+    word tokens: a trie of the cue phrases with failure links, expanded
+    into a dense transition table (state x token -> state). Tokens
+    outside the lexicon vocabulary send the automaton back to its root.
+
+    Tokens are runs of word characters (\\w+) and single punctuation
+    marks, so a cue never spans punctuation. Comments are tokenized
+    without building per-token strings: ASCII comments are joined into
+    one lowercase byte buffer and token bounds come from character-class
+    flags. Only tokens whose length and first character occur in the
+    vocabulary are hashed (one vectorized step per byte) and looked up
+    among the sorted vocabulary hashes; hash hits are confirmed byte for
+    byte. Comments with non-ASCII characters are tokenized with the
+    equivalent regex instead.
+
+    Because no state is deeper than the longest cue (L tokens), the
+    state after any token depends only on the last L tokens. Every
+    token that belongs to the vocabulary is therefore advanced at once
+    from L - 1 tokens back: L vectorized table lookups replace a
+    per-character scan, and the cost stays linear in text length
+    however many cues the lexicon holds.
+
+Matching:
+    Cues match whole words, case-insensitively, with any whitespace
+    (but no punctuation) between their words. Counts use leftmost-
+    longest, non-overlapping matches (as a regex alternation of the
+    cues would); overlapping=True counts every occurrence of every cue.
+
+Lexicon files:
+    Plain text, one cue per line; blank lines and lines starting with
+    '#' are ignored (see load_lexicon()).
+"""
+
+import re
+import string
+from collections import deque
+from itertools import chain
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# ASCII character classes: 0 whitespace (\s), 1 word (\w), 2 punctuation
+_CLASS = np.full(256, 2, dtype=np.int8)
+_CLASS[[b for b in range(128) if chr(b).isspace()]] = 0
+_CLASS[list((string.ascii_letters + string.digits + "_").encode("ascii"))] = 1
+
+# Odd multiplier of the rolling token hash (arithmetic mod 2**64)
+_HASH_BASE = np.uint64(0x100000001B3)
+
+
+def _lower_texts(comments):
+    """Lowercase comment strings ('' for missing values)"""
+    return [value.lower() if value.__class__ is str else "" for value in comments]
+
+
+def _token_bytes(buffer, start, length):
+    """(tokens, length) byte matrix of equal-length tokens"""
+    return buffer[start[:, None] + np.arange(length)]
+
+
+def _token_hashes(chars):
+    """64-bit polynomial hashes of the rows of a token byte matrix"""
+    hashes = np.zeros(len(chars), dtype=np.uint64)
+    for k in range(chars.shape[1]):
+        hashes = hashes * _HASH_BASE + chars[:, k]
+    return hashes
+
+
+def load_lexicon(path):
+    """
+    Read a cue lexicon from a text file.
+
+    Parameters:
+        path: str or Path, one cue per line ('#' starts a comment line)
+
+    Returns:
+        list of str: cues in file order
+    """
+    with open(path, encoding="utf-8") as f:
+        cues = [line.strip() for line in f]
+    cues = [cue for cue in cues if cue and not cue.startswith("#")]
+    if not cues:
+        raise ValueError(f"ERROR: No cues found in lexicon file {path}")
+    return cues
+
+
+class LexiconMatcher:
+    """
+    Compiled multi-pattern matcher for a cue lexicon.
+
+    Usage:
+        matcher = LexiconMatcher(COMPARATIVE_CUES)
+        counts = matcher.count(df["written_comment"])
+        spans = matcher.spans(df["written_comment"])
+    """
+
+    def __init__(self, cues):
+        self.cues = list(dict.fromkeys(cues))
+        phrases = [_TOKEN.findall(cue.lower()) for cue in self.cues]
+        if not self.cues or not all(phrases):
+            raise ValueError("ERROR: Lexicon cues must each contain at least one word")
+
+        # Vocabulary ids start at 1; 0 is any token outside the lexicon
+        self.vocabulary = {}
+        for word in chain.from_iterable(phrases):
+            self.vocabulary.setdefault(word, len(self.vocabulary) + 1)
+
+        self._index_words()
+
+        self.lengths = np.array([len(p) for p in phrases], dtype=np.int64)
+        self.depth = int(self.lengths.max())
+        self._compile([[self.vocabulary[w] for w in p] for p in phrases])
+
+    def _index_words(self):
+        """Lookup tables for the ASCII vocabulary words"""
+        words = [w for w in self.vocabulary if w.isascii()]
+        self._max_word = max(map(len, words), default=0)
+
+        # Word lengths x first bytes that occur in the vocabulary
+        self._shapes = np.zeros((self._max_word + 2, 256), dtype=bool)
+
+        # Per word length: sorted hashes, byte matrix and vocabulary ids
+        self._words_by_length = {}
+        for length in sorted({len(w) for w in words}):
+            group = [w for w in words if len(w) == length]
+            chars = np.frombuffer("".join(group).encode("ascii"), dtype=np.uint8)
+            chars = chars.reshape(len(group), length)
+            hashes = _token_hashes(chars)
+            order = np.argsort(hashes)
+            ids = np.array([self.vocabulary[w] for w in group], dtype=np.int32)
+            self._words_by_length[length] = (hashes[order], chars[order], ids[order])
+            self._shapes[length, chars[:, 0]] = True
+
+    def _compile(self, patterns):
+        """Build the trie, failure links and the dense transition table"""
+        goto = [{}]
+        ends = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for token in pattern:
+                if token not in goto[state]:
+                    goto.append({})
+                    ends.append([])
+                    goto[state][token] = len(goto) - 1
+                state = goto[state][token]
+            ends[state].append(pattern_id)
+
+        n_states = len(goto)
+        delta = np.zeros((n_states, len(self.vocabulary) + 1), dtype=np.int32)
+        fail = [0] * n_states
+        outputs = [list(e) for e in ends]
+
+        # Breadth-first: failure targets are always shallower states
+        queue = deque()
+        for token, child in goto[0].items():
+            delta[0, token] = child
+            queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[fail[state]])
+            delta[state] = delta[fail[state]]
+            for token, child in goto[state].items():
+                fail[child] = delta[fail[state], token]
+                delta[state, token] = child
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = outputs
+        self._n_outputs = np.array([len(o) for o in outputs], dtype=np.int64)
+
+        # Flattened outputs: cues ending in state s are
+        # _flat_outputs[_output_start[s]:_output_start[s] + _n_outputs[s]]
+        self._output_start = np.cumsum(self._n_outputs) - self._n_outputs
+        self._flat_outputs = np.array(list(chain.from_iterable(outputs)), dtype=np.int64)
+
+    def _ascii_token_ids(self, texts):
+        """
+        Vocabulary ids of the tokens of lowercase ASCII comments.
+
+        Returns:
+            tuple: (token ids in text order, tokens per comment)
+        """
+        n = len(texts)
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+        starts = np.cumsum(lengths + 1) - lengths - 1
+
+        # Comments separated by a newline, so tokens never span two comments
+        buffer = np.frombuffer("\n".join(texts).encode("ascii"), dtype=np.uint8)
+        classes = _CLASS[buffer]
+        word = classes == 1
+
+        # First and last characters of word runs and punctuation marks
+        first_char = classes == 2
+        first_char[:1] |= word[:1]
+        first_char[1:] |= word[1:] & ~word[:-1]
+        last_char = classes == 2
+        last_char[-1:] |= word[-1:]
+        last_char[:-1] |= word[:-1] & ~word[1:]
+
+        token_start = np.flatnonzero(first_char)
+        token_end = np.flatnonzero(last_char) + 1
+        sizes = np.searchsorted(token_start, starts + lengths) - np.searchsorted(token_start, starts)
+
+        ids = np.zeros(len(token_start), dtype=np.int32)
+        if not self._words_by_length:
+            return ids, sizes
+
+        # Tokens whose length and first byte occur in the vocabulary
+        token_length = np.minimum(token_end - token_start, self._max_word + 1)
+        candidates = np.flatnonzero(self._shapes[token_length, buffer[token_start]])
+        candidate_length = token_length[candidates]
+
+        for length, (hashes, chars, word_ids) in self._words_by_length.items():
+            rows = candidates[candidate_length == length]
+            tokens = _token_bytes(buffer, token_start[rows], length)
+            found = np.minimum(np.searchsorted(hashes, _token_hashes(tokens)), len(hashes) - 1)
+
+            # Hash hits confirmed byte for byte
+            same = (tokens == chars[found]).all(axis=1)
+            ids[rows[same]] = word_ids[found[same]]
+
+        return ids, sizes
+
+    def _token_ids(self, texts):
+        """
+        Vocabulary ids (0 outside the lexicon) of every token of every comment.
+
+        Parameters:
+            texts: list of lowercase str
+
+        Returns:
+            tuple: (token ids, comment by comment, in text order;
+                    (n,) tokens per comment)
+        """
+        n = len(texts)
+        ascii_rows = np.fromiter(map(str.isascii, texts), dtype=bool, count=n)
+        sizes = np.zeros(n, dtype=np.int64)
+
+        rows = np.flatnonzero(ascii_rows)
+        ids, sizes[rows] = self._ascii_token_ids([texts[i] for i in rows])
+
+        other = np.flatnonzero(~ascii_rows)
+        if len(other) == 0:
+            return ids, sizes
+
+        # Comments with non-ASCII characters: regex tokens (same rules)
+        token_lists = [_TOKEN.findall(texts[i]) for i in other]
+        sizes[other] = [len(tokens) for tokens in token_lists]
+        vocabulary = self.vocabulary
+        other_ids = np.fromiter(
+            (vocabulary.get(t, 0) for t in chain.from_iterable(token_lists)),
+            dtype=np.int32, count=int(sizes[other].sum())
+        )
+
+        # Back into comment order
+        owner = np.concatenate([np.repeat(rows, sizes[rows]), np.repeat(other, sizes[other])])
+        order = np.argsort(owner, kind="stable")
+        return np.concatenate([ids, other_ids])[order], sizes
+
+    def _scan(self, texts):
+        """
+        Run the automaton over every token of every comment.
+
+        Parameters:
+            texts: list of lowercase str
+
+        Returns:
+            tuple: (comment index, token position within the comment,
+                    end state) for each token where a cue ends
+        """
+        ids, sizes = self._token_ids(texts)
+        ends = np.cumsum(sizes)
+
+        # Cues can only end on vocabulary tokens
+        position = np.flatnonzero(ids)
+        comment = np.searchsorted(ends, position, side="right")
+        first = ends[comment] - sizes[comment]
+
+        # Advance from `depth` tokens back (earlier tokens cannot affect
+        # the state); tokens before the comment start act as resets
+        states = np.zeros(len(position), dtype=np.int32)
+        for back in range(self.depth - 1, -1, -1):
+            source = position - back
+            tokens = np.where(source >= first, ids[np.maximum(source, 0)], 0)
+            states = self._delta[states, tokens]
+
+        hits = np.flatnonzero(self._n_outputs[states] > 0)
+        return comment[hits], (position - first)[hits], states[hits]
+
+    def _matches(self, comment, end, states, overlapping):
+        """
+        Expand end states into (comment, first token, last token, cue id).
+
+        Without overlapping, keeps leftmost-longest non-overlapping matches.
+        """
+        found = [
+            (c, e - self.lengths[p] + 1, e, p)
+            for c, e, s in zip(comment.tolist(), end.tolist(), states.tolist())
+            for p in self._outputs[s]
+        ]
+        if overlapping:
+            return found
+
+        kept = []
+        last_comment, last_end = -1, -1
+        for c, start, e, p in sorted(found, key=lambda m: (m[0], m[1], m[1] - m[2])):
+            if c != last_comment:
+                last_comment, last_end = c, -1
+            if start > last_end:
+                kept.append((c, start, e, p))
+                last_end = e
+        return kept
+
+    def occurrences(self, comments):
+        """
+        Every occurrence of every cue (overlapping matches included).
+
+        Parameters:
+            comments: iterable of comment texts (NaN allowed)
+
+        Returns:
+            tuple of int64 arrays: (comment index, cue index into self.cues)
+        """
+        comment, _, states = self._scan(_lower_texts(comments))
+
+        # Expand each end state into the cues that end there
+        per_state = self._n_outputs[states]
+        hit = np.repeat(np.arange(len(states)), per_state)
+        within = np.arange(len(hit)) - np.repeat(np.cumsum(per_state) - per_state, per_state)
+        cue = self._flat_outputs[self._output_start[states][hit] + within]
+
+        return comment[hit].astype(np.int64), cue
+
+    def count(self, comments, overlapping=False):
+        """
+        Cue matches per comment.
+
+        Parameters:
+            comments: iterable of comment texts (NaN allowed)
+            overlapping: bool, count every occurrence of every cue
+
+        Returns:
+            np.ndarray: int64 counts, one per comment
+        """
+        texts = _lower_texts(comments)
+        comment, end, states = self._scan(texts)
+        counts = np.zeros(len(texts), dtype=np.int64)
+
+        if overlapping:
+            np.add.at(counts, comment, self._n_outputs[states])
+        else:
+            matches = self._matches(comment, end, states, overlapping)
+            np.add.at(counts, np.array([m[0] for m in matches], dtype=np.int64), 1)
+
+        return counts
+
+    def spans(self, comments, overlapping=False):
+        """
+        Character spans of the cue matches in each comment.
+
+        Parameters:
+            comments: iterable of comment texts (NaN allowed)
+            overlapping: bool, report every occurrence of every cue
+
+        Returns:
+            list (one per comment) of lists of (start, end, cue) tuples,
+            with text[start:end] the matched phrase (offsets are taken
+            from the lowercased text, which has the same length except
+            for a few special-cased Unicode letters)
+        """
+        texts = _lower_texts(comments)
+        comment, end, states = self._scan(texts)
+
+        result = [[] for _ in texts]
+        offsets = {}
+        for c, first, last, p in self._matches(comment, end, states, overlapping):
+            if c not in offsets:
+                # Token offsets (matched comments only)
+                offsets[c] = [m.span() for m in _TOKEN.finditer(texts[c])]
+            result[c].append((offsets[c][first][0], offsets[c][last][1], self.cues[p]))
+
+        return result
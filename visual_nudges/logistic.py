@@ -0,0 +1,338 @@
+"""
+logistic.py
+
+Purpose:
+    Batched logistic models for binary outcomes (e.g. any_comparative
+    ~ condition), for many outcomes and subgroups at once.
+
+    With a single binary exposure the logit model is saturated, so its
+    maximum-likelihood fit has closed forms in the 2x2 counts
+    (a/b = events/non-events among the exposed, c/d = among the
+    reference group):
+
+        log OR    = log(a d / (b c)),   SE = sqrt(1/a + 1/b + 1/c + 1/d)
+        intercept = log(c / d),         SE = sqrt(1/c + 1/d)
+
+    These equal the coefficients and Wald standard errors of
+    statsmodels' Logit, but are evaluated as arrays over hundreds of
+    tables without formula parsing or design matrices. Profile-
+    likelihood CIs for the log OR are found by vectorized bisection on
+    the profile deviance (the intercept is profiled out by an inner
+    bisection on its score equation).
+
+    With covariates, logit_irls() fits every model with a shared design
+    matrix by iteratively reweighted least squares, batched over models
+    (one einsum and one stacked solve per iteration).
+
+Separation:
+    A zero cell (or an outcome that is constant in a group) means the
+    maximum-likelihood estimate does not exist. Such tables get NaN
+    Wald estimates and separation=True instead of the arbitrary
+    non-converged values an iterative fit reports. Profile CIs remain
+    defined there and may be one-sided (a bound of 0 or inf).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import special, stats
+
+# Log-odds beyond this are treated as infinite in profile searches
+_PROFILE_BOUND = 30.0
+
+# Bisection steps (the bracket shrinks by 2**-60)
+_BISECT_STEPS = 60
+
+# |linear predictor| above this marks fitted probabilities of 0 or 1
+_SEPARATION_ETA = 30.0
+
+
+def _log_likelihood(a, b, c, d, intercept, log_or):
+    """Binomial log-likelihood of the 2x2 logit model"""
+    eta = intercept + log_or
+    return -(a * np.logaddexp(0, -eta) + b * np.logaddexp(0, eta)
+             + c * np.logaddexp(0, -intercept) + d * np.logaddexp(0, intercept))
+
+
+def _profile_intercept(a, b, c, d, log_or):
+    """Intercept maximizing the likelihood for fixed log odds ratios"""
+    lo = np.full(np.shape(log_or), -_PROFILE_BOUND - 10)
+    hi = np.full(np.shape(log_or), _PROFILE_BOUND + 10)
+
+    # The score in the intercept decreases monotonically
+    for _ in range(_BISECT_STEPS):
+        mid = (lo + hi) / 2
+        score = a + c - (a + b) * special.expit(mid + log_or) - (c + d) * special.expit(mid)
+        lo = np.where(score > 0, mid, lo)
+        hi = np.where(score > 0, hi, mid)
+
+    return (lo + hi) / 2
+
+
+def profile_ci(a, b, c, d, alpha=0.05):
+    """
+    Profile-likelihood CIs for the log odds ratio of 2x2 tables.
+
+    Parameters:
+        a, b: array-like, events and non-events in the exposed group
+        c, d: array-like, events and non-events in the reference group
+        alpha: float, 1 - confidence level
+
+    Returns:
+        tuple of arrays: (lower, upper) log odds ratio bounds, +-inf when
+        the profile deviance stays below the critical value
+    """
+    a, b, c, d = (np.asarray(x, dtype=float) for x in (a, b, c, d))
+    critical = stats.chi2.ppf(1 - alpha, 1)
+
+    # Maximized log-likelihood (saturated model, 0 log 0 = 0)
+    l_max = (special.xlogy(a, a) + special.xlogy(b, b) - special.xlogy(a + b, a + b)
+             + special.xlogy(c, c) + special.xlogy(d, d) - special.xlogy(c + d, c + d))
+
+    def deviance(log_or):
+        intercept = _profile_intercept(a, b, c, d, log_or)
+        return 2 * (l_max - _log_likelihood(a, b, c, d, intercept, log_or))
+
+    # The profile deviance falls to 0 at the estimate and rises on both sides
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimate = np.log(a) + np.log(d) - np.log(b) - np.log(c)
+    center = np.clip(np.nan_to_num(estimate, nan=0.0), -_PROFILE_BOUND, _PROFILE_BOUND)
+
+    bounds = []
+    for edge in (-_PROFILE_BOUND, _PROFILE_BOUND):
+        outer = np.full(a.shape, edge)
+        unbounded = deviance(outer) < critical
+        inner = center.copy()
+        for _ in range(_BISECT_STEPS):
+            mid = (inner + outer) / 2
+            beyond = deviance(mid) >= critical
+            outer = np.where(beyond, mid, outer)
+            inner = np.where(beyond, inner, mid)
+        bounds.append(np.where(unbounded, np.sign(edge) * np.inf, (inner + outer) / 2))
+
+    empty = (a + b == 0) | (c + d == 0)
+    return np.where(empty, np.nan, bounds[0]), np.where(empty, np.nan, bounds[1])
+
+
+def odds_ratios(a, b, c, d, alpha=0.05, profile=False):
+    """
+    Logit model y ~ exposure for many 2x2 tables at once.
+
+    Parameters:
+        a, b: array-like, events and non-events in the exposed group
+        c, d: array-like, events and non-events in the reference group
+        alpha: float, 1 - confidence level
+        profile: bool, also compute profile-likelihood CIs
+
+    Returns:
+        dict of arrays:
+            intercept, intercept_se    log odds in the reference group
+            log_or, log_or_se          exposure coefficient (Wald SE)
+            odds_ratio, ci_lo, ci_hi   exp(log_or) with Wald CI
+            baseline_odds, baseline_ci_lo, baseline_ci_hi
+            p_value                    Wald test of log_or = 0
+            separation                 True where the MLE does not exist
+            profile_ci_lo, profile_ci_hi  (profile=True only; odds ratios)
+    """
+    a, b, c, d = (np.asarray(x, dtype=float) for x in (a, b, c, d))
+    z = special.ndtri(1 - alpha / 2)
+
+    separation = (np.minimum(np.minimum(a, b), np.minimum(c, d)) == 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intercept = np.log(c / d)
+        intercept_se = np.sqrt(1 / c + 1 / d)
+        log_or = np.log(a * d / (b * c))
+        log_or_se = np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+
+    # The intercept only needs both outcomes in the reference group
+    reference_empty = np.minimum(c, d) == 0
+    intercept = np.where(reference_empty, np.nan, intercept)
+    intercept_se = np.where(reference_empty, np.nan, intercept_se)
+    log_or = np.where(separation, np.nan, log_or)
+    log_or_se = np.where(separation, np.nan, log_or_se)
+
+    result = {
+        "intercept": intercept,
+        "intercept_se": intercept_se,
+        "log_or": log_or,
+        "log_or_se": log_or_se,
+        "odds_ratio": np.exp(log_or),
+        "ci_lo": np.exp(log_or - z * log_or_se),
+        "ci_hi": np.exp(log_or + z * log_or_se),
+        "baseline_odds": np.exp(intercept),
+        "baseline_ci_lo": np.exp(intercept - z * intercept_se),
+        "baseline_ci_hi": np.exp(intercept + z * intercept_se),
+        "p_value": 2 * special.ndtr(-np.abs(log_or / log_or_se)),
+        "separation": separation,
+    }
+
+    if profile:
+        lower, upper = profile_ci(a, b, c, d, alpha)
+        result["profile_ci_lo"] = np.exp(lower)
+        result["profile_ci_hi"] = np.exp(upper)
+
+    return result
+
+
+def logit_irls(X, successes, trials=None, max_iter=100, tol=1e-8):
+    """
+    Fit many logistic models that share a design matrix (batched IRLS).
+
+    Parameters:
+        X: (n, p) design matrix (include the intercept column)
+        successes: (n, K) events per row for each of K models; NaN
+            excludes a row from that model
+        trials: (n, K) or (n,) trials per row (default 1, i.e. binary
+            rows); grouped counts are fitted as binomial rows
+        max_iter: int, maximum IRLS iterations
+        tol: float, convergence threshold on the largest coefficient step
+
+    Returns:
+        dict with
+            params, bse: (K, p) coefficients and Wald standard errors
+            loglik: (K,) log-likelihood (without binomial constants)
+            converged: (K,) bool
+            separation: (K,) bool, not converged or fitted
+                probabilities of 0/1 (estimates are not identified)
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(successes, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    n, K = Y.shape
+
+    if trials is None:
+        T = np.ones_like(Y)
+    else:
+        T = np.broadcast_to(np.asarray(trials, dtype=float).reshape(n, -1), Y.shape).copy()
+    missing = np.isnan(Y)
+    T[missing] = 0.0
+    Y = np.where(missing, 0.0, Y)
+
+    beta = np.zeros((K, X.shape[1]))
+    converged = np.zeros(K, dtype=bool)
+
+    for _ in range(max_iter):
+        mu = special.expit(X @ beta.T)
+        weights = T * mu * (1 - mu)
+        information = np.einsum("nk,np,nq->kpq", weights, X, X)
+        score = (Y - T * mu).T @ X
+
+        step = (np.linalg.pinv(information) @ score[:, :, None])[:, :, 0]
+        beta = np.where(converged[:, None], beta, beta + step)
+        converged |= np.abs(step).max(axis=1) < tol
+        if converged.all():
+            break
+
+    eta = X @ beta.T
+    mu = special.expit(eta)
+    information = np.einsum("nk,np,nq->kpq", T * mu * (1 - mu), X, X)
+    covariance = np.linalg.pinv(information)
+    loglik = (Y * eta - T * np.logaddexp(0, eta)).sum(axis=0)
+    extreme = ((np.abs(eta) > _SEPARATION_ETA) & (T > 0)).any(axis=0)
+
+    return {
+        "params": beta,
+        "bse": np.sqrt(np.maximum(np.diagonal(covariance, axis1=1, axis2=2), 0.0)),
+        "loglik": loglik,
+        "converged": converged,
+        "separation": ~converged | extreme,
+    }
+
+
+def binary_outcome_models(df, outcomes, exposure, reference, by=None,
+                          covariates=None, alpha=0.05, profile=False):
+    """
+    outcome ~ exposure (+ covariates) for every outcome and subgroup.
+
+    Without covariates the 2x2 counts of each (subgroup, outcome) come
+    from one grouped sum and all models are evaluated in closed form;
+    with covariates all models are fitted together by logit_irls().
+
+    Parameters:
+        df: pd.DataFrame, one row per unit (e.g. reviewer)
+        outcomes: list of str, 0/1 outcome columns
+        exposure: str, two-level column (e.g. condition)
+        reference: reference level of `exposure` (e.g. 'baseline')
+        by: list of str or None, subgroup columns (None = all rows)
+        covariates: list of str or None, numeric or categorical columns
+        alpha: float, 1 - confidence level
+        profile: bool, profile-likelihood CIs (models without covariates)
+
+    Returns:
+        pd.DataFrame: one row per subgroup and outcome with the counts,
+        odds_ratio, ci_lo, ci_hi, p_value, separation (and
+        profile_ci_lo, profile_ci_hi)
+
+    Rows with a missing exposure are left out, as a formula fit drops
+    them.
+    """
+    by = list(by or [])
+    df = df[df[exposure].notna()]
+    exposed = (df[exposure] != reference).to_numpy()
+    if df[exposure].nunique() != 2:
+        raise ValueError(f"ERROR: '{exposure}' must have exactly two levels")
+
+    # Events and sizes per subgroup x exposure x outcome (one grouped sum)
+    Y = df[outcomes].astype(float)
+    flag = pd.Series(exposed, index=df.index, name="_exposed")
+    keys = [df[col] for col in by] or [pd.Series(0, index=df.index, name="_all")]
+    grouped = Y.groupby(keys + [flag], observed=True, sort=True)
+    events = grouped.sum().unstack("_exposed", fill_value=0)
+    sizes = grouped.count().unstack("_exposed", fill_value=0)
+
+    def column(frame, outcome, level):
+        if (outcome, level) not in frame.columns:
+            return np.zeros(len(frame), dtype=np.int64)
+        return frame[(outcome, level)].to_numpy(dtype=np.int64)
+
+    tables = pd.concat([
+        pd.DataFrame({
+            "outcome": outcome,
+            "n_reference": column(sizes, outcome, False),
+            "events_reference": column(events, outcome, False),
+            "n_exposed": column(sizes, outcome, True),
+            "events_exposed": column(events, outcome, True),
+        }, index=events.index).reset_index()
+        for outcome in outcomes
+    ], ignore_index=True)
+    if not by:
+        tables = tables.drop(columns="_all")
+
+    a = tables["events_exposed"].to_numpy(dtype=float)
+    b = tables["n_exposed"].to_numpy(dtype=float) - a
+    c = tables["events_reference"].to_numpy(dtype=float)
+    d = tables["n_reference"].to_numpy(dtype=float) - c
+
+    if not covariates:
+        fit = odds_ratios(a, b, c, d, alpha=alpha, profile=profile)
+        for name in ["odds_ratio", "ci_lo", "ci_hi", "p_value", "separation"]:
+            tables[name] = fit[name]
+        if profile:
+            tables["profile_ci_lo"] = fit["profile_ci_lo"]
+            tables["profile_ci_hi"] = fit["profile_ci_hi"]
+        return tables
+
+    # Covariate-adjusted: one column of successes per (subgroup, outcome)
+    design = pd.get_dummies(df[covariates], drop_first=True, dtype=float)
+    X = np.column_stack([np.ones(len(df)), exposed.astype(float), design.to_numpy(dtype=float)])
+
+    if by:
+        subgroup = pd.MultiIndex.from_frame(df[by]).to_flat_index()
+        wanted = pd.MultiIndex.from_frame(tables[by]).to_flat_index()
+        member = np.asarray(subgroup)[:, None] == np.asarray(wanted)[None, :]
+    else:
+        member = np.ones((len(df), len(tables)), dtype=bool)
+    values = Y[tables["outcome"]].to_numpy()
+    successes = np.where(member, values, np.nan)
+
+    fit = logit_irls(X, successes)
+    z = special.ndtri(1 - alpha / 2)
+    log_or = np.where(fit["separation"], np.nan, fit["params"][:, 1])
+    se = fit["bse"][:, 1]
+
+    tables["odds_ratio"] = np.exp(log_or)
+    tables["ci_lo"] = np.exp(log_or - z * se)
+    tables["ci_hi"] = np.exp(log_or + z * se)
+    tables["p_value"] = 2 * special.ndtr(-np.abs(log_or / se))
+    tables["separation"] = fit["separation"]
+    return tables
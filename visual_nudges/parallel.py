@@ -0,0 +1,69 @@
+"""
+parallel.py
+
+Purpose:
+    Minimal process-pool helpers shared by the analysis stages.
+
+    Work is expressed as a list of argument tuples for a module-level
+    function. With one job the tasks run in-process; with more, they
+    are submitted to a ProcessPoolExecutor. Results always come back in
+    task order, so callers get identical output for any number of jobs.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+
+def resolve_jobs(jobs):
+    """
+    Normalize a --jobs value.
+
+    Parameters:
+        jobs: int, requested workers; 0 or negative means all cores
+
+    Returns:
+        int: number of worker processes (at least 1)
+    """
+    if jobs is None:
+        return 1
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+@contextmanager
+def task_pool(jobs=1):
+    """
+    Context manager yielding a process pool, or None for serial runs.
+
+    Parameters:
+        jobs: int, number of worker processes (see resolve_jobs)
+    """
+    jobs = resolve_jobs(jobs)
+
+    if jobs == 1:
+        yield None
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield pool
+
+
+def run_tasks(func, tasks, pool=None):
+    """
+    Apply func to each argument tuple in tasks, preserving order.
+
+    Parameters:
+        func: module-level (picklable) callable
+        tasks: list of argument tuples
+        pool: executor from task_pool, or None to run in-process
+
+    Returns:
+        list: func(*args) for each task, in task order
+    """
+    if pool is None or len(tasks) <= 1:
+        return [func(*args) for args in tasks]
+
+    futures = [pool.submit(func, *args) for args in tasks]
+    return [future.result() for future in futures]
@@ -0,0 +1,348 @@
+"""
+permutation.py
+
+Purpose:
+    Batched two-group permutation tests for differences in means,
+    medians and Hedges' g, for all metrics at once.
+
+    The observed data form one reviewer x metric matrix X and one
+    label vector (True = group b). Permutations are evaluated as
+    label-shuffle matrices L (one row per permutation): group sums,
+    counts and sums of squares for every metric come from one matrix
+    product L @ [finite, X, X^2], so a chunk of permutations costs one
+    BLAS call instead of a Python loop over permutations and metrics.
+
+Medians:
+    Computed only when "median_diff" is requested. With the values of
+    a metric in ascending order, each group's median position follows
+    from running counts of its labels. Under relabeling a group median
+    stays within O(sqrt(n)) ranks of the pooled median, so the counts
+    are only accumulated over a window of ranks around it, starting
+    from the count below the window (one more column of the matrix
+    product). The few labelings whose median falls outside the window
+    (e.g. the observed one, given a strong effect) are counted over
+    all ranks, so the medians are exact.
+
+Exact vs Monte-Carlo:
+    When the number of distinct labelings C(n, n_b) is at most
+    `max_exact`, every labeling is enumerated and the p-values are
+    exact. Otherwise `n_permutations` random shuffles are drawn and
+    p = (1 + #{|T*| >= |T|}) / (1 + n_permutations).
+    A shuffle labels the n_b reviewers with the smallest of n uniform
+    random keys, which is a uniform draw of n_b of n reviewers.
+
+Memory:
+    Permutations are processed in chunks whose row count is derived
+    from `max_bytes`. Keys are drawn row by row from one generator,
+    so results do not depend on the chunk size.
+
+Missing values:
+    Non-finite values are excluded per metric; labels are still
+    permuted over all reviewers, which gives each metric the exact
+    permutation distribution of its own non-missing values.
+"""
+
+from itertools import combinations, islice
+from math import comb
+
+import numpy as np
+
+from visual_nudges.bootstrap import DEFAULT_MAX_BYTES, as_seed_sequence
+
+STATISTICS = ["mean_diff", "median_diff", "hedges_g"]
+
+# Largest number of labelings enumerated exactly
+DEFAULT_MAX_EXACT = 20_000
+
+# Bytes per (permutation, reviewer) cell: float64 keys/labels plus the
+# partitioned copy of the keys
+_BYTES_PER_CELL = 16
+
+# Half-width of the median rank window, in standard deviations of the
+# number of group-b labels below the pooled median
+_WINDOW_SD = 6
+
+# Relative tolerance when comparing permuted to observed statistics
+_TIE_TOLERANCE = 1e-9
+
+
+def _chunk_rows(n, max_bytes):
+    """Permutations per chunk"""
+    return max(1, int(max_bytes // (_BYTES_PER_CELL * max(n, 1))))
+
+
+def _prepare(X, share_b):
+    """
+    Column blocks of the matrix product, per-metric value orders and
+    median rank windows.
+
+    Parameters:
+        X: (n, M) values (NaN = missing)
+        share_b: float, share of reviewers in group b
+
+    Returns:
+        tuple: Z (n, 4M) = [finite, centered, centered^2, below window],
+        orders (list of M index arrays, finite rows in value order),
+        windows (list of M (start, stop) rank ranges)
+    """
+    X = np.asarray(X, dtype=float)
+    n, M = X.shape
+    finite = np.isfinite(X)
+    shift = np.array([X[finite[:, m], m].mean() if finite[:, m].any() else 0.0
+                      for m in range(M)])
+    centered = np.where(finite, X - shift, 0.0)
+
+    # Finite rows of each metric, in ascending value order
+    orders = [np.flatnonzero(finite[:, m])[np.argsort(X[finite[:, m], m], kind="stable")]
+              for m in range(M)]
+
+    # Rank windows around the pooled median, wide enough for the
+    # smaller group (its median moves most per label)
+    smaller = max(min(share_b, 1 - share_b), 1 / max(n, 1))
+    below = np.zeros((n, M))
+    windows = []
+    for m, order in enumerate(orders):
+        n_m = len(order)
+        half = int(np.ceil(_WINDOW_SD * np.sqrt(n_m * share_b * (1 - share_b)) / 2 / smaller)) + 1
+        start, stop = max(0, n_m // 2 - half), min(n_m, n_m // 2 + half + 1)
+        below[order[:start], m] = 1.0
+        windows.append((start, stop))
+
+    Z = np.hstack([finite.astype(float), centered, centered ** 2, below])
+    return Z, orders, windows
+
+
+def _medians(LT, values_sorted, order):
+    """
+    Median of the labelled (1) and unlabelled (0) values, per labeling.
+
+    Parameters:
+        LT: (n, P) integer array of 0/1 labels, one column per labeling
+        values_sorted: ascending finite values of one metric
+        order: reviewer index of each entry of values_sorted
+
+    Returns:
+        tuple of (P,) arrays: medians of group b and group a
+    """
+    P = LT.shape[1]
+    if len(values_sorted) == 0:
+        empty = np.full(P, np.nan)
+        return empty, empty
+
+    # Running group-b counts in value order (cumulative sums down the
+    # rows vectorize across labelings); group-a counts are the rest
+    counts_b = np.cumsum(LT[order], axis=0, dtype=LT.dtype)
+    counts_a = np.arange(1, len(order) + 1, dtype=LT.dtype)[:, None] - counts_b
+
+    out = []
+    last = len(values_sorted) - 1
+    for counts in (counts_b, counts_a):
+        k = counts[-1]
+
+        # Positions of the lower and upper middle element (1-based ranks)
+        lo = (counts < (k + 1) // 2).sum(axis=0)
+        hi = (counts < k // 2 + 1).sum(axis=0)
+
+        med = (values_sorted[np.minimum(lo, last)] + values_sorted[np.minimum(hi, last)]) / 2
+        out.append(np.where(k > 0, med, np.nan))
+
+    return out[0], out[1]
+
+
+def _window_medians(L, values_sorted, order, window, below_b, k_b):
+    """
+    Median of group b minus median of group a, per labeling, counting
+    labels over the rank window only (see module docstring).
+
+    Parameters:
+        L: (P, n) float array of 0/1 labels, one row per labeling
+        values_sorted: ascending finite values of one metric
+        order: reviewer index of each entry of values_sorted
+        window: (start, stop) rank range
+        below_b: (P,) group-b labels ranked below the window
+        k_b: (P,) group-b size (finite values)
+
+    Returns:
+        (P,) array
+    """
+    P, n_m = L.shape[0], len(order)
+    if n_m == 0:
+        return np.full(P, np.nan)
+
+    start, stop = window
+    run_b = below_b[:, None] + np.cumsum(L.take(order[start:stop], axis=1), axis=1)
+    run_a = np.arange(start + 1, stop + 1) - run_b
+
+    medians, inside = [], np.ones(P, dtype=bool)
+    for run, below, k in ((run_b, below_b, k_b), (run_a, start - below_b, n_m - k_b)):
+        lo_target, hi_target = (k + 1) // 2, k // 2 + 1
+
+        # Both middle ranks must fall inside the window
+        inside &= (k == 0) | ((below < lo_target) & (run[:, -1] >= hi_target))
+
+        lo = start + (run < lo_target[:, None]).sum(axis=1)
+        hi = start + (run < hi_target[:, None]).sum(axis=1)
+        med = (values_sorted[np.minimum(lo, n_m - 1)] + values_sorted[np.minimum(hi, n_m - 1)]) / 2
+        medians.append(np.where(k > 0, med, np.nan))
+
+    diff = medians[0] - medians[1]
+
+    # Labelings with a median outside the window: count over all ranks
+    outside = np.flatnonzero(~inside)
+    if len(outside):
+        LT = L[outside].T.astype(np.int16 if n_m < 2 ** 15 else np.int32)
+        med_b, med_a = _medians(LT, values_sorted, order)
+        diff[outside] = med_b - med_a
+
+    return diff
+
+
+def permutation_statistics(L, Z, orders, windows, values, statistics=STATISTICS):
+    """
+    Mean difference, median difference and Hedges' g (b minus a) for
+    every labeling in L and every metric.
+
+    Parameters:
+        L: (P, n) float array, 1 = group b
+        Z: (n, 4M) column blocks from _prepare
+        orders: list of M index arrays (finite rows in value order)
+        windows: list of M median rank windows
+        values: (n, M) raw values
+        statistics: iterable of names from STATISTICS
+
+    Returns:
+        dict: statistic name -> (P, M) array
+    """
+    M = values.shape[1]
+
+    # Group sizes, sums and sums of squares for all metrics at once
+    # (group a is the total minus group b)
+    sums_b = L @ Z
+    sums_a = Z.sum(axis=0) - sums_b
+    n_b, s_b, q_b, below_b = (sums_b[:, i * M:(i + 1) * M] for i in range(4))
+    n_a, s_a, q_a = (sums_a[:, i * M:(i + 1) * M] for i in range(3))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        m_b = s_b / n_b
+        m_a = s_a / n_a
+        ss = (q_b - s_b * m_b) + (q_a - s_a * m_a)
+        sp = np.sqrt(np.maximum(ss, 0.0) / (n_a + n_b - 2))
+        J = 1 - 3 / (4 * (n_a + n_b) - 9)
+        g = J * (m_b - m_a) / sp
+
+    valid = (n_a >= 2) & (n_b >= 2) & (sp > 0)
+
+    out = {
+        "mean_diff": np.where((n_a >= 1) & (n_b >= 1), m_b - m_a, np.nan),
+        "hedges_g": np.where(valid, g, np.nan),
+    }
+
+    if "median_diff" in statistics:
+        # Group sizes are exact integers in float64
+        k_b = np.rint(n_b).astype(np.int64)
+        below_b = np.rint(below_b)
+        medians = np.empty((L.shape[0], M))
+        for m, order in enumerate(orders):
+            medians[:, m] = _window_medians(L, values[order, m], order, windows[m],
+                                            below_b[:, m], k_b[:, m])
+        out["median_diff"] = medians
+
+    return {name: out[name] for name in STATISTICS if name in statistics}
+
+
+def _exact_chunks(n, k, rows):
+    """Label matrices enumerating every choice of k of n reviewers"""
+    labelings = combinations(range(n), k)
+    while True:
+        block = list(islice(labelings, rows))
+        if not block:
+            return
+        chosen = np.array(block, dtype=np.intp).reshape(len(block), k)
+        L = np.zeros((len(block), n))
+        L[np.arange(len(block))[:, None], chosen] = 1.0
+        yield L
+
+
+def _random_chunks(n, k, n_permutations, rows, rng):
+    """Label matrices of random shuffles (row by row from one generator)"""
+    for start in range(0, n_permutations, rows):
+        stop = min(start + rows, n_permutations)
+
+        # The k smallest of n uniform keys label group b (the keys
+        # buffer is reused for the labels)
+        L = rng.random((stop - start, n))
+        if 0 < k < n:
+            kth = np.partition(L, k - 1, axis=1)[:, k - 1:k]
+            np.less_equal(L, kth, out=L, casting="unsafe")
+        else:
+            L.fill(1.0 if k else 0.0)
+        yield L
+
+
+def permutation_test(X, labels, n_permutations=10_000, seed=None,
+                     max_exact=DEFAULT_MAX_EXACT, max_bytes=DEFAULT_MAX_BYTES,
+                     statistics=STATISTICS):
+    """
+    Two-sided permutation tests for all metrics at once.
+
+    Parameters:
+        X: (n, M) array-like, one row per reviewer, one column per metric
+        labels: (n,) bool array-like, True for group b (e.g. nudge)
+        n_permutations: int, Monte-Carlo shuffles when not exact
+        seed: int or np.random.SeedSequence
+        max_exact: int, enumerate every labeling when C(n, n_b) <= this
+        max_bytes: int, memory cap for one chunk of permutations
+        statistics: iterable of names from STATISTICS (medians cost the
+            most; leave out "median_diff" when it is not reported)
+
+    Returns:
+        dict with
+            method: 'exact' or 'monte-carlo'
+            n_permutations: int, labelings evaluated
+            observed: statistic name -> (M,) array (b minus a)
+            p_value: statistic name -> (M,) array
+    """
+    unknown = set(statistics) - set(STATISTICS)
+    if unknown:
+        raise ValueError(f"ERROR: Unknown permutation statistics: {', '.join(sorted(unknown))}")
+    statistics = [name for name in STATISTICS if name in statistics]
+
+    values = np.asarray(X, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    labels = np.asarray(labels, dtype=float)
+    n, k = len(labels), int(labels.sum())
+
+    Z, orders, windows = _prepare(values, k / n if n else 0.0)
+    observed = permutation_statistics(labels[None, :], Z, orders, windows, values, statistics)
+    observed = {name: stat[0] for name, stat in observed.items()}
+
+    rows = _chunk_rows(n, max_bytes)
+    exact = comb(n, k) <= max_exact
+    if exact:
+        chunks = _exact_chunks(n, k, rows)
+        total = comb(n, k)
+    else:
+        rng = np.random.default_rng(as_seed_sequence(seed))
+        chunks = _random_chunks(n, k, n_permutations, rows, rng)
+        total = n_permutations
+
+    extreme = {name: np.zeros(values.shape[1]) for name in statistics}
+    for L in chunks:
+        perm = permutation_statistics(L, Z, orders, windows, values, statistics)
+        for name in statistics:
+            obs = np.abs(observed[name])
+            tol = _TIE_TOLERANCE * np.maximum(obs, 1.0)
+            extreme[name] += (np.abs(perm[name]) >= obs - tol).sum(axis=0)
+
+    p_value = {}
+    for name in statistics:
+        p = extreme[name] / total if exact else (1 + extreme[name]) / (1 + total)
+        p_value[name] = np.where(np.isfinite(observed[name]), p, np.nan)
+
+    return {
+        "method": "exact" if exact else "monte-carlo",
+        "n_permutations": total,
+        "observed": observed,
+        "p_value": p_value,
+    }
@@ -0,0 +1,383 @@
+"""
+pipeline.py
+
+Purpose:
+    Incremental runner for the analysis pipeline.
+
+    Each stage declares the script it runs, its input files and its
+    output files. Stages are linked into a dependency graph through
+    those files (a stage depends on every stage that produces one of
+    its inputs); a stage can also be ordered after another without
+    reading its outputs (`after`). Before running a stage, the runner
+    fingerprints
+
+    - the stage's script and every visual_nudges module it imports,
+    - its command-line arguments,
+    - the contents of its input files,
+
+    and skips the stage when the fingerprint matches the last
+    successful run and all of its outputs still exist. Because inputs
+    are fingerprinted by content, a re-run upstream stage that produces
+    identical outputs does not invalidate anything downstream.
+
+    Independent stages (e.g. descriptives, analysis and figures once
+    the features exist) run concurrently, each in its own process.
+
+State:
+    data/cache/pipeline_state.json (stage name -> last fingerprint)
+"""
+
+import ast
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from visual_nudges.constants import COHORT_WORKBOOKS, FIGURE_FILES, FIGURES_DIR, FIGURES_MANIFEST
+from visual_nudges.ingest import CACHE_DIR, content_digest
+
+# Repository root (where the stage scripts live)
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+STATE_FILE = CACHE_DIR / "pipeline_state.json"
+
+
+def stage(name, script, inputs, outputs, args=(), after=()):
+    """
+    Declare a pipeline stage.
+
+    Parameters:
+        name: str, unique stage name
+        script: str, script path relative to the repository root
+        inputs: list of str, files the stage reads
+        outputs: list of str, files the stage writes
+        args: iterable of str, extra command-line arguments
+        after: iterable of str, stages to run first although no input
+            comes from them (ordering only: not part of the fingerprint)
+
+    Returns:
+        dict: stage declaration
+    """
+    return {
+        "name": name,
+        "script": script,
+        "args": list(args),
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "after": list(after),
+    }
+
+
+def default_stages(fmt="csv"):
+    """
+    The Visual Nudges pipeline.
+
+    Parameters:
+        fmt: str, storage format for data/clean and data/features
+
+    Returns:
+        list of dict: stage declarations
+    """
+    clean_file = f"data/clean/peer_review_clean.{fmt}"
+    features_file = f"data/features/reviewer_level_features.{fmt}"
+    tables = "results/tables"
+
+    return [
+        stage("clean", "01_data_cleaning.py",
+              inputs=["data/raw/peer_review_raw.xlsx"],
+              outputs=[clean_file],
+              args=["--format", fmt]),
+        stage("features", "01b_feature_extraction.py",
+              inputs=[clean_file],
+              outputs=[features_file],
+              args=["--format", fmt]),
+        stage("describe", "02_descriptive_statistics.py",
+              inputs=[features_file],
+              outputs=["results/descriptive_statistics_by_condition.csv"]),
+        stage("analyze", "03_analysis.py",
+              inputs=[features_file],
+              outputs=[
+                  f"{tables}/table_descriptives_by_condition.csv",
+                  f"{tables}/table_effect_sizes_by_condition.csv",
+                  f"{tables}/table_effect_sizes_pairwise.csv",
+                  f"{tables}/table_bootstrap_ci_by_condition.csv",
+                  f"{tables}/table_bootstrap_ci_pairwise.csv",
+                  f"{tables}/table_wilcoxon_sensitivity.csv",
+                  f"{tables}/table_permutation_tests.csv",
+                  f"{tables}/table_comparative_flag_by_condition.csv",
+                  f"{tables}/table_comparative_association_or.csv",
+                  f"{tables}/table_binary_outcomes_or.csv",
+                  "results/models/model_summaries.txt",
+              ]),
+        # Drawn from the cohort workbooks alone; runs after the features
+        # (without depending on their contents) so the figures render
+        # alongside describe and analyze
+        stage("figures", "04_figures.py",
+              inputs=list(COHORT_WORKBOOKS),
+              outputs=[f"{FIGURES_DIR}/{name}" for name in FIGURE_FILES.values()]
+                      + [f"{FIGURES_DIR}/{FIGURES_MANIFEST}"],
+              after=["features"]),
+    ]
+
+
+def dependencies(stages):
+    """
+    Map each stage name to the names of the stages it depends on.
+
+    Only file dependencies are returned; ordering-only `after` stages
+    are checked here (known names, no cycles) and applied by
+    run_pipeline().
+
+    Raises:
+        ValueError: if two stages write the same file, a stage runs
+            after an unknown stage or the graph has a cycle
+    """
+    producer = {}
+    for s in stages:
+        for output in s["outputs"]:
+            if output in producer:
+                raise ValueError(
+                    f"ERROR: {output} is written by both "
+                    f"'{producer[output]}' and '{s['name']}'"
+                )
+            producer[output] = s["name"]
+
+    deps = {
+        s["name"]: sorted({producer[i] for i in s["inputs"] if i in producer})
+        for s in stages
+    }
+
+    for s in stages:
+        for name in s.get("after", []):
+            if name not in deps:
+                raise ValueError(f"ERROR: Stage '{s['name']}' runs after unknown stage '{name}'")
+    order = {s["name"]: deps[s["name"]] + s.get("after", []) for s in stages}
+
+    # Cycle check (depth-first)
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"ERROR: Dependency cycle through stage '{name}'")
+        visiting.add(name)
+        for dep in order[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in deps:
+        visit(name)
+
+    return deps
+
+
+def code_files(script, root=PROJECT_ROOT):
+    """
+    A script plus every visual_nudges module it (transitively) imports.
+
+    Parameters:
+        script: str or Path, script path relative to root
+        root: Path, repository root
+
+    Returns:
+        list of Path: sorted source files
+    """
+    pending = [root / script]
+    seen = set()
+
+    while pending:
+        path = pending.pop()
+        if path in seen or not path.exists():
+            continue
+        seen.add(path)
+
+        for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+            if isinstance(node, ast.ImportFrom) and node.module:
+                modules = [node.module]
+            elif isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            else:
+                continue
+            for module in modules:
+                if module.split(".")[0] != "visual_nudges":
+                    continue
+                parts = module.split(".")
+                pending.append(root.joinpath(*parts).with_suffix(".py"))
+                pending.append(root.joinpath(*parts, "__init__.py"))
+
+    return sorted(seen)
+
+
+def fingerprint(s, root=PROJECT_ROOT):
+    """
+    Fingerprint of a stage's code, arguments and input contents.
+
+    Returns:
+        str: hex SHA-256, or None if an input file is missing
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps([s["script"], s["args"]]).encode())
+
+    for path in code_files(s["script"], root):
+        h.update(str(path.relative_to(root)).encode())
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+
+    for name in s["inputs"]:
+        path = Path(name)
+        if not path.exists():
+            return None
+        h.update(name.encode())
+        h.update(content_digest(path).encode())
+
+    return h.hexdigest()
+
+
+def _load_state():
+    """Last successful fingerprint per stage"""
+    try:
+        return json.loads(STATE_FILE.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    """Persist fingerprints"""
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    STATE_FILE.write_text(json.dumps(state, indent=1, sort_keys=True))
+
+
+def is_current(s, state, root=PROJECT_ROOT):
+    """True when a stage's fingerprint is unchanged and its outputs exist"""
+    fp = fingerprint(s, root)
+    return (fp is not None
+            and state.get(s["name"]) == fp
+            and all(Path(output).exists() for output in s["outputs"]))
+
+
+def _run_stage(s, root, log_dir):
+    """Run one stage script in a subprocess; returns (returncode, seconds)"""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_dir / f"{s['name']}.log"
+
+    start = time.perf_counter()
+    with open(log_file, "w") as log:
+        proc = subprocess.run(
+            [sys.executable, str(root / s["script"])] + s["args"],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    return proc.returncode, time.perf_counter() - start
+
+
+def _downstream(name, deps):
+    """All stages that (transitively) depend on `name`"""
+    found = set()
+    frontier = [name]
+    while frontier:
+        current = frontier.pop()
+        for other, other_deps in deps.items():
+            if current in other_deps and other not in found:
+                found.add(other)
+                frontier.append(other)
+    return found
+
+
+def run_pipeline(stages, targets=None, jobs=1, force=False, dry_run=False,
+                 root=PROJECT_ROOT, log_dir=CACHE_DIR / "logs"):
+    """
+    Run the stages whose code, arguments or inputs changed.
+
+    Parameters:
+        stages: list of dict, stage declarations
+        targets: list of str, stage names to bring up to date
+            (with their upstream stages); None = all
+        jobs: int, maximum number of stages running concurrently
+        force: bool, re-run stages even when up to date
+        dry_run: bool, only report what would run
+        root: Path, directory holding the stage scripts
+        log_dir: Path, per-stage stdout/stderr logs
+
+    Returns:
+        dict: stage name -> 'ran', 'skipped', 'failed', 'blocked'
+            or 'pending' (dry run)
+    """
+    by_name = {s["name"]: s for s in stages}
+    deps = dependencies(stages)
+
+    # Restrict to the targets and everything upstream of them
+    selected = set(by_name) if not targets else set()
+    frontier = list(targets or [])
+    while frontier:
+        name = frontier.pop()
+        if name not in by_name:
+            raise ValueError(f"ERROR: Unknown stage '{name}'")
+        if name not in selected:
+            selected.add(name)
+            frontier.extend(deps[name])
+
+    # Ordering-only constraints apply between selected stages; they wait
+    # for the earlier stage to finish, whatever its outcome
+    after = {name: [a for a in by_name[name].get("after", []) if a in selected]
+             for name in selected}
+
+    state = _load_state()
+    status = {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while len(status) < len(selected):
+            ready = [
+                name for name in selected
+                if name not in status and name not in running
+                and all(status.get(dep) in ("ran", "skipped", "pending") for dep in deps[name])
+                and all(dep in status for dep in after[name])
+            ]
+
+            for name in sorted(ready):
+                s = by_name[name]
+                upstream_changed = any(status.get(dep) == "pending" for dep in deps[name])
+
+                if not force and not upstream_changed and is_current(s, state, root):
+                    status[name] = "skipped"
+                    print(f"- {name}: up to date")
+                elif dry_run:
+                    status[name] = "pending"
+                    print(f"* {name}: would run")
+                else:
+                    print(f"> {name}: running {s['script']}")
+                    running[name] = pool.submit(_run_stage, s, root, log_dir)
+
+            if not running:
+                if ready:
+                    # Skipped stages may have unblocked their dependents
+                    continue
+                # Anything left is blocked by a failed upstream stage
+                for name in selected - set(status):
+                    status[name] = "blocked"
+                break
+
+            finished, _ = wait(running.values(), return_when=FIRST_COMPLETED)
+            for name in [n for n, f in running.items() if f in finished]:
+                returncode, seconds = running.pop(name).result()
+                if returncode == 0:
+                    status[name] = "ran"
+                    fp = fingerprint(by_name[name], root)
+                    if fp is not None:
+                        state[name] = fp
+                        _save_state(state)
+                    print(f"✓ {name}: done in {seconds:.1f}s")
+                else:
+                    status[name] = "failed"
+                    state.pop(name, None)
+                    _save_state(state)
+                    print(f"✗ {name}: failed (exit {returncode}); "
+                          f"see {log_dir / (name + '.log')}")
+                    for blocked in _downstream(name, deps) & selected:
+                        status.setdefault(blocked, "blocked")
+
+    return status
@@ -0,0 +1,318 @@
+"""
+profiling.py
+
+Purpose:
+    Opt-in instrumentation of the pipeline stages (--profile).
+
+    Stage code marks named sections:
+
+        with section("bootstrap"):
+            ...
+
+    While a profile is active (profile_run()), every section records
+    its wall time, CPU time, peak RSS, traced allocations and top
+    allocating source lines, and the stage writes them as a JSON report
+    to results/models/profile_<stage>.json, next to model_summaries.txt.
+
+    Without --profile, section() returns one shared no-op context
+    manager: a global lookup per section, no timers and no tracing.
+
+Report:
+    "total" holds the wall time, CPU time and peak RSS of the whole
+    stage. "sections" has one record per section path (e.g. "bootstrap"
+    or "render/figure 3/rubric_summary"), in the order sections were
+    first entered; a section entered repeatedly (once per chunk) is
+    aggregated:
+
+        calls             number of times the section ran
+        wall_s, cpu_s     total time (time.perf_counter, process_time)
+        peak_rss_mb       peak resident set size during the section
+                          (Linux VmHWM, reset through
+                          /proc/self/clear_refs; otherwise the lifetime
+                          maximum from getrusage)
+        peak_alloc_mb     peak traced allocations (tracemalloc: Python
+                          objects and NumPy buffers)
+        alloc_growth_mb   traced memory allocated in the section and
+                          still held at its exit
+        top_allocators    source lines holding the most of that memory
+                          (file:line, size, blocks)
+
+Notes:
+    - Times and peaks include nested sections.
+    - Allocations are traced inside sections only; imports and code
+      between sections are not slowed down by tracing.
+    - Tracing slows allocation-heavy code, so compare profiled runs
+      with profiled runs (run_benchmarks.py measures untraced timings).
+    - Work done in worker processes (--jobs) counts towards the wall
+      time of the enclosing section only.
+"""
+
+import contextlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Reports are written next to results/models/model_summaries.txt
+PROFILE_DIR = Path("results/models")
+
+# Source lines listed per section
+TOP_ALLOCATORS = 10
+
+# Profiler of the running stage (None = profiling disabled)
+_active = None
+
+_DISABLED = contextlib.nullcontext()
+
+
+def status_mb(field):
+    """A memory field of /proc/self/status in MiB (None if unavailable)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB"""
+    peak = status_mb("VmHWM")
+    if peak is not None:
+        return peak
+
+    import resource
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 ** 2 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def reset_peak_rss():
+    """Reset the peak RSS counter where the kernel allows it (Linux)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def section(name):
+    """
+    Context manager that profiles a named section of the active run.
+
+    Parameters:
+        name: str, section name (unique among its siblings)
+
+    Returns:
+        context manager (a shared no-op when profiling is disabled)
+    """
+    if _active is None:
+        return _DISABLED
+    return _active.section(name)
+
+
+class Profiler:
+    """
+    Section timings and memory peaks of one run.
+
+    Allocations are traced inside sections only, so imports and the
+    code between sections run at full speed. Traces are cleared at
+    every section boundary: a snapshot then holds just the blocks the
+    current stretch of a section allocated and still holds, which keeps
+    snapshots cheap however much memory the process uses. Each stretch
+    is folded into its section (and a finished section into its
+    parent) before the next one starts, with peaks offset by the memory
+    the section already held.
+    """
+
+    def __init__(self, top=TOP_ALLOCATORS):
+        self.top = top
+        self.records = {}
+        self._stack = []
+        self._skip = {tracemalloc.__file__, __file__}
+
+    def _fold_stretch(self, frame):
+        """Fold the memory use since the last boundary into a frame"""
+        stats = tracemalloc.take_snapshot().statistics("lineno")
+        current, peak = tracemalloc.get_traced_memory()
+
+        frame["peak_alloc"] = max(frame["peak_alloc"], frame["held"] + peak)
+        frame["held"] += current
+        frame["peak_rss"] = max(frame["peak_rss"], peak_rss_mb())
+
+        kept = 0
+        for stat in stats:
+            where = stat.traceback[0]
+            if where.filename in self._skip:
+                continue
+            self._add_allocator(frame["allocators"], f"{where.filename}:{where.lineno}",
+                                stat.size, stat.count)
+            kept += 1
+            if kept == self.top:
+                break
+
+        tracemalloc.clear_traces()
+        reset_peak_rss()
+
+    @staticmethod
+    def _add_allocator(allocators, where, size, count):
+        total_size, total_count = allocators.get(where, (0, 0))
+        allocators[where] = (total_size + size, total_count + count)
+
+    @contextlib.contextmanager
+    def section(self, name):
+        """Profile the enclosed block as section `name`"""
+        if self._stack:
+            parent = self._stack[-1]
+            self._fold_stretch(parent)
+            path = f"{parent['path']}/{name}"
+        else:
+            tracemalloc.start()
+            reset_peak_rss()
+            path = name
+
+        # Records are listed in the order sections are first entered
+        self.records.setdefault(path, {
+            "section": path,
+            "calls": 0,
+            "wall_s": 0.0,
+            "cpu_s": 0.0,
+            "peak_rss_mb": 0.0,
+            "peak_alloc_mb": 0.0,
+            "alloc_growth_mb": 0.0,
+            "_allocators": {},
+        })
+        frame = {
+            "path": path,
+            "held": 0,
+            "peak_alloc": 0,
+            "peak_rss": 0.0,
+            "allocators": {},
+        }
+        self._stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self._fold_stretch(frame)
+            self._stack.pop()
+
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak_alloc"] = max(parent["peak_alloc"], parent["held"] + frame["peak_alloc"])
+                parent["held"] += frame["held"]
+                parent["peak_rss"] = max(parent["peak_rss"], frame["peak_rss"])
+                for where, (size, count) in frame["allocators"].items():
+                    self._add_allocator(parent["allocators"], where, size, count)
+            else:
+                tracemalloc.stop()
+
+            self._record(frame, wall, cpu)
+
+    def _record(self, frame, wall, cpu):
+        """Add one run of a section to its (aggregated) record"""
+        record = self.records[frame["path"]]
+        record["calls"] += 1
+        record["wall_s"] += wall
+        record["cpu_s"] += cpu
+        record["peak_rss_mb"] = max(record["peak_rss_mb"], frame["peak_rss"])
+        record["peak_alloc_mb"] = max(record["peak_alloc_mb"], frame["peak_alloc"] / 1024 ** 2)
+        record["alloc_growth_mb"] += frame["held"] / 1024 ** 2
+        for where, (size, count) in frame["allocators"].items():
+            self._add_allocator(record["_allocators"], where, size, count)
+
+    def report(self):
+        """
+        Section records of the run.
+
+        Returns:
+            list of dict, one per section path (see module docstring)
+        """
+        sections = []
+        for record in self.records.values():
+            allocators = sorted(record["_allocators"].items(), key=lambda kv: kv[1][0],
+                                reverse=True)[:self.top]
+            sections.append({
+                **{k: v for k, v in record.items() if not k.startswith("_")},
+                "top_allocators": [
+                    {"where": where, "size_mb": size / 1024 ** 2, "blocks": count}
+                    for where, (size, count) in allocators
+                ],
+            })
+        return sections
+
+
+def add_profile_argument(parser):
+    """Register the --profile option of a stage"""
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="record time and memory per section and write "
+             f"{PROFILE_DIR}/profile_<stage>.json"
+    )
+
+
+@contextlib.contextmanager
+def profile_run(stage, enabled, output_dir=PROFILE_DIR, top=TOP_ALLOCATORS):
+    """
+    Profile one stage run and write its JSON report.
+
+    The report is also written when the stage fails, with status
+    "failed".
+
+    Parameters:
+        stage: str, stage name (report file profile_<stage>.json)
+        enabled: bool, profile the run (False: no-op)
+        output_dir: Path, report directory
+        top: int, source lines listed per section
+
+    Yields:
+        Profiler, or None when disabled
+    """
+    global _active
+
+    if not enabled:
+        yield None
+        return
+
+    profiler = Profiler(top)
+    started = datetime.now(timezone.utc)
+    status = "failed"
+    reset_peak_rss()
+    wall, cpu = time.perf_counter(), time.process_time()
+    _active = profiler
+    try:
+        yield profiler
+        status = "ok"
+    finally:
+        _active = None
+        sections = profiler.report()
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = output_dir / f"profile_{stage}.json"
+        with open(output_file, "w") as f:
+            json.dump({
+                "stage": stage,
+                "status": status,
+                "started": started.isoformat(timespec="seconds"),
+                "argv": sys.argv,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "total": {
+                    "wall_s": time.perf_counter() - wall,
+                    "cpu_s": time.process_time() - cpu,
+                    # Sections reset the kernel's peak counter
+                    "peak_rss_mb": max([peak_rss_mb()] + [s["peak_rss_mb"] for s in sections]),
+                },
+                "sections": sections,
+            }, f, indent=2)
+
+        print(f"✓ Saved: {output_file}")
@@ -0,0 +1,78 @@
+"""
+proportions.py
+
+Purpose:
+    Confidence intervals for binomial proportions, evaluated for whole
+    arrays of (successes, totals) at once (e.g. comparison rates per
+    submission, rubric criterion or section).
+
+Methods:
+    clopper-pearson  exact interval from beta quantiles (matches
+                     scipy.stats.binomtest(...).proportion_ci("exact"))
+    wilson           score interval (closed form)
+    jeffreys         equal-tailed Beta(k + 1/2, n - k + 1/2) interval
+
+    Beta quantiles are computed with scipy.special.betaincinv, a ufunc,
+    so every group is handled in one array call instead of one binomial
+    test per group.
+
+Notes:
+    - Groups with totals == 0 get NaN bounds.
+    - Clopper-Pearson and Jeffreys bounds are 0 when successes == 0
+      and 1 when successes == totals.
+"""
+
+import numpy as np
+from scipy import special
+
+PROPORTION_CI_METHODS = ("clopper-pearson", "wilson", "jeffreys")
+
+
+def proportion_ci(successes, totals, method="clopper-pearson", confidence_level=0.95):
+    """
+    Two-sided confidence intervals for many binomial proportions.
+
+    Parameters:
+        successes: array-like of int, successes per group
+        totals: array-like of int, trials per group
+        method: str, one of PROPORTION_CI_METHODS
+        confidence_level: float
+
+    Returns:
+        tuple of np.ndarray: (low, high), shaped like the broadcast inputs
+    """
+    if method not in PROPORTION_CI_METHODS:
+        raise ValueError(
+            f"ERROR: Unknown proportion CI method '{method}' "
+            f"(choose from {', '.join(PROPORTION_CI_METHODS)})"
+        )
+
+    k, n = np.broadcast_arrays(
+        np.asarray(successes, dtype=float), np.asarray(totals, dtype=float)
+    )
+    if np.any((k < 0) | (k > n)):
+        raise ValueError("ERROR: successes must lie between 0 and totals")
+    alpha = 1 - confidence_level
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "wilson":
+            z = special.ndtri(1 - alpha / 2)
+            p = k / n
+            center = (k + z ** 2 / 2) / (n + z ** 2)
+            half = z * np.sqrt(n * p * (1 - p) + z ** 2 / 4) / (n + z ** 2)
+            low, high = center - half, center + half
+        else:
+            # Clopper-Pearson: Beta(k, n - k + 1) / Beta(k + 1, n - k);
+            # Jeffreys: Beta(k + 1/2, n - k + 1/2) for both bounds
+            shift = 0.5 if method == "jeffreys" else 0.0
+            low = special.betaincinv(
+                np.maximum(k + shift, 1e-300), n - k + 1 - shift, alpha / 2
+            )
+            high = special.betaincinv(
+                k + 1 - shift, np.maximum(n - k + shift, 1e-300), 1 - alpha / 2
+            )
+            low = np.where(k == 0, 0.0, low)
+            high = np.where(k == n, 1.0, high)
+
+    empty = n == 0
+    return np.where(empty, np.nan, low), np.where(empty, np.nan, high)
@@ -0,0 +1,217 @@
+"""
+ranktests.py
+
+Purpose:
+    Rank-based (nonparametric) sensitivity tests.
+
+    mann_whitney_batch() runs the Wilcoxon rank-sum (Mann-Whitney U)
+    test for every metric at once: all columns of the reviewer x metric
+    matrix are ranked in one 2-D pass (average ranks for ties, missing
+    values excluded per column), and U, the tie correction and the
+    p-values are computed as arrays.
+
+    P-values follow scipy.stats.mannwhitneyu(method='auto'): the exact
+    null distribution when either group has at most 8 values and there
+    are no ties, otherwise the normal approximation with tie and
+    continuity corrections.
+
+Exact null distributions:
+    The distribution of U under the null depends only on the group
+    sizes (n1, n2). It is built once per size pair, kept in memory for
+    the rest of the process, and stored under data/cache/mwu_null/ so
+    later runs (other semesters, subgroups, sensitivity sweeps) load it
+    instead of rebuilding it.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from scipy import special
+
+from visual_nudges.ingest import CACHE_DIR, _atomic_write
+
+NULL_CACHE_DIR = CACHE_DIR / "mwu_null"
+
+# scipy's 'auto' rule: exact only while one group is this small
+EXACT_MAX_N = 8
+
+# In-process cache: (n1, n2) with n1 <= n2 -> survival function of U
+_NULL_SF = {}
+
+
+def rank_columns(X):
+    """
+    Average ranks of every column, with tie information.
+
+    Parameters:
+        X: (n, M) array-like; non-finite values are excluded (rank NaN)
+
+    Returns:
+        tuple: (ranks (n, M) float array,
+                tie_term (M,) array of sum(t^3 - t) over tie groups,
+                has_ties (M,) bool array)
+    """
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    n, M = X.shape
+
+    # Metric-major copy so each column is contiguous for the sort
+    XT = np.ascontiguousarray(X.T)
+    XT[~np.isfinite(XT)] = np.nan
+
+    # One sort for all columns (NaN last)
+    order = np.argsort(XT, axis=1)
+    xs = np.take_along_axis(XT, order, axis=1)
+    finite = ~np.isnan(xs)
+
+    # Runs of equal values, numbered across all columns
+    starts = np.ones((M, n), dtype=bool)
+    starts[:, 1:] = xs[:, 1:] != xs[:, :-1]
+    starts = starts.ravel()
+    run_id = np.cumsum(starts) - 1
+    sizes = np.bincount(run_id)
+
+    # Average 1-based rank of each run
+    position = np.flatnonzero(starts) % max(n, 1)
+    run_rank = position + (sizes + 1) / 2
+
+    ranks_sorted = run_rank[run_id].reshape(M, n)
+    ranks_sorted[~finite] = np.nan
+
+    ranks = np.empty_like(ranks_sorted)
+    np.put_along_axis(ranks, order, ranks_sorted, axis=1)
+
+    # Tie groups among finite values (each NaN is its own run)
+    run_col = np.flatnonzero(starts) // max(n, 1)
+    run_finite = finite.ravel()[starts]
+    t = sizes[run_finite].astype(float)
+    tie_term = np.bincount(run_col[run_finite], weights=t ** 3 - t, minlength=M)
+    has_ties = np.bincount(run_col[run_finite], weights=t > 1, minlength=M) > 0
+
+    return ranks.T, tie_term, has_ties
+
+
+def _u_frequencies(n1, n2):
+    """
+    Number of group arrangements giving each U = 0..n1*n2.
+
+    The counts are the coefficients of the Gaussian binomial
+    prod_{m=1..n1} (1 - q^(n2+m)) / (1 - q^m), with n1 the smaller
+    group. It is built one factor at a time; dividing by (1 - q^m) is
+    a running sum within each residue class mod m, so the cost is
+    O(n1^2 * n2) rather than quadratic in the larger group. Only the
+    lower half is built (the distribution is symmetric), and every
+    intermediate is itself a Gaussian binomial (nonnegative counts of
+    the same magnitude), so floating-point cancellation stays small;
+    counts below n2 + 1 involve additions only.
+    """
+    n1, n2 = min(n1, n2), max(n1, n2)
+    half = n1 * n2 // 2
+
+    f = np.zeros(half + 1)
+    f[0] = 1.0
+    for m in range(1, n1 + 1):
+        k = n2 + m
+        if k <= half:
+            f[k:] -= f[:half + 1 - k].copy()
+
+        # Divide by (1 - q^m): cumulative sums down each residue class
+        pad = (-len(f)) % m
+        f = np.concatenate([f, np.zeros(pad)]).reshape(-1, m).cumsum(axis=0).ravel()[:half + 1]
+
+    return np.concatenate([f, f[:n1 * n2 - half][::-1]])
+
+
+def _save_array(path, values):
+    """np.save to an exact path (np.save appends .npy to bare names)"""
+    with open(path, "wb") as f:
+        np.save(f, values)
+
+
+def u_null_sf(n1, n2, cache_dir=NULL_CACHE_DIR):
+    """
+    Exact survival function P(U >= u) of the Mann-Whitney U statistic.
+
+    Built once per (n1, n2) and cached in memory and (when cache_dir is
+    not None) on disk.
+
+    Parameters:
+        n1, n2: int, group sizes (order does not matter)
+        cache_dir: Path or None, directory for persisted distributions
+
+    Returns:
+        np.ndarray: sf[u] for u = 0..n1*n2
+    """
+    key = (min(n1, n2), max(n1, n2))
+    if key in _NULL_SF:
+        return _NULL_SF[key]
+
+    path = None
+    if cache_dir is not None:
+        path = Path(cache_dir) / f"u_null_{key[0]}_{key[1]}.npy"
+        if path.exists():
+            _NULL_SF[key] = np.load(path)
+            return _NULL_SF[key]
+
+    freqs = _u_frequencies(*key)
+    pmf = freqs / special.binom(key[0] + key[1], key[0])
+    sf = np.cumsum(pmf[::-1])[::-1]
+
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(path, lambda tmp: _save_array(tmp, sf))
+
+    _NULL_SF[key] = sf
+    return sf
+
+
+def mann_whitney_batch(X, labels, use_continuity=True, cache_dir=NULL_CACHE_DIR):
+    """
+    Two-sided Mann-Whitney U tests of group 1 vs group 0 for every column.
+
+    Matches scipy.stats.mannwhitneyu(x1, x0, alternative='two-sided')
+    column by column, where x1 / x0 are the finite values with
+    labels True / False.
+
+    Parameters:
+        X: (n, M) array-like, one row per reviewer, one column per metric
+        labels: (n,) bool array-like, True for group 1 (e.g. nudge)
+        use_continuity: bool, continuity correction (normal approximation)
+        cache_dir: Path or None, where exact null distributions persist
+
+    Returns:
+        dict of (M,) arrays: U (statistic of group 1), p_value, n1, n0
+    """
+    ranks, tie_term, has_ties = rank_columns(X)
+    labels = np.asarray(labels, dtype=bool)
+    finite = ~np.isnan(ranks)
+
+    n1 = (finite & labels[:, None]).sum(axis=0).astype(float)
+    n0 = (finite & ~labels[:, None]).sum(axis=0).astype(float)
+    R1 = np.where(labels[:, None] & finite, ranks, 0.0).sum(axis=0)
+    U1 = R1 - n1 * (n1 + 1) / 2
+    U = np.maximum(U1, n1 * n0 - U1)
+
+    # Normal approximation with tie correction
+    n = n1 + n0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s = np.sqrt(n1 * n0 / 12 * ((n + 1) - tie_term / (n * (n - 1))))
+        z = (U - n1 * n0 / 2 - (0.5 if use_continuity else 0.0)) / s
+    p_value = 2 * special.ndtr(-z)
+
+    # Exact null distribution for small, tie-free samples
+    exact = ((n1 <= EXACT_MAX_N) | (n0 <= EXACT_MAX_N)) & ~has_ties & (n1 > 0) & (n0 > 0)
+    for m in np.flatnonzero(exact):
+        sf = u_null_sf(int(n1[m]), int(n0[m]), cache_dir)
+        p_value[m] = 2 * sf[int(U[m])]
+
+    p_value = np.clip(p_value, 0.0, 1.0)
+
+    empty = (n1 == 0) | (n0 == 0)
+    return {
+        "U": np.where(empty, np.nan, U1),
+        "p_value": np.where(empty, np.nan, p_value),
+        "n1": n1.astype(np.int64),
+        "n0": n0.astype(np.int64),
+    }
@@ -0,0 +1,159 @@
+"""
+rubric.py
+
+Purpose:
+    Detect which rubric criteria a written comment discusses, for the
+    rubric coverage features (rubric_criteria_addressed,
+    rubric_coverage_ratio).
+
+    Each criterion has a keyword/phrase set (its own name plus
+    RUBRIC_KEYWORDS). All phrases are compiled into one inverted index:
+    phrase -> bitmask of the criteria it signals. One lexicon-automaton
+    pass over the comments (see visual_nudges/lexicon.py) finds every
+    phrase occurrence, and OR-ing the bitmasks of the phrases found
+    tags each comment with a criterion bitmask (bit i = criteria[i]).
+
+    Coverage of a reviewer is the population count of the OR of the
+    bitmasks of all their comments, so no per-criterion scan of the
+    comments or of the reviewer groups is needed.
+
+Notes:
+    - Matching is case-insensitive on whole words (e.g. "label" does
+      not match "labelled"; inflections are listed explicitly).
+    - Criteria without an entry in RUBRIC_KEYWORDS are detected by
+      their name alone.
+    - Up to 64 criteria (one uint64 bitmask per comment).
+"""
+
+import numpy as np
+import pandas as pd
+
+from visual_nudges.lexicon import LexiconMatcher
+
+# Phrases that signal a criterion (in addition to the criterion name)
+RUBRIC_KEYWORDS = {
+    "Detailed label": [
+        "label", "labels", "labeled", "labelled", "labeling", "labelling",
+        "title", "titles", "subtitle", "axis", "axes", "axis title",
+        "legend", "legends", "caption", "captions", "annotation",
+        "annotations", "annotate", "units", "tick marks", "citation",
+    ],
+    "Lie factor": [
+        "lie factor", "misleading", "mislead", "misrepresent",
+        "misrepresents", "distort", "distorts", "distorted", "distortion",
+        "exaggerate", "exaggerated", "scale", "scales", "scaling",
+        "truncated", "proportion", "proportional", "proportions",
+        "start at zero", "starts at zero", "accurate", "accurately",
+        "accuracy",
+    ],
+    "Data/color ink ratio": [
+        "data ink", "data-ink", "ink ratio", "color", "colors", "colour",
+        "colours", "colored", "coloured", "color scheme", "palette",
+        "hue", "hues", "saturation", "gradient", "monochromatic",
+        "minimal", "minimalist", "white space", "whitespace",
+    ],
+    "Chart junk": [
+        "chart junk", "chartjunk", "junk", "clutter", "cluttered",
+        "busy", "distracting", "distraction", "distractions",
+        "decoration", "decorations", "decorative", "unnecessary", "3d",
+        "gridlines", "grid lines", "icons", "noise", "noisy",
+        "overwhelming",
+    ],
+}
+
+MAX_CRITERIA = 64
+
+# Set bits of every byte value (popcount fallback for NumPy < 2.0)
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def popcount(masks):
+    """
+    Number of set bits of each uint64 bitmask.
+
+    Uses np.bitwise_count (NumPy >= 2.0), otherwise a per-byte lookup.
+
+    Parameters:
+        masks: array-like of uint64
+
+    Returns:
+        np.ndarray: int64 bit counts, same shape as masks
+    """
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks).astype(np.int64)
+    counts = _BYTE_BITS[masks.view(np.uint8)].reshape(masks.shape + (8,))
+    return counts.sum(axis=-1, dtype=np.int64)
+
+
+class CoverageIndex:
+    """
+    Inverted index from keyword phrases to criterion bitmasks.
+
+    Usage:
+        index = CoverageIndex(["Detailed label", "Lie factor"])
+        masks = index.masks(df["written_comment"])
+        addressed = popcount(masks)
+    """
+
+    def __init__(self, criteria, keywords=RUBRIC_KEYWORDS):
+        self.criteria = list(dict.fromkeys(criteria))
+        if not self.criteria:
+            raise ValueError("ERROR: No rubric criteria given")
+        if len(self.criteria) > MAX_CRITERIA:
+            raise ValueError(
+                f"ERROR: At most {MAX_CRITERIA} rubric criteria are supported "
+                f"(got {len(self.criteria)})"
+            )
+
+        # phrase -> OR of the bits of every criterion it signals
+        index = {}
+        for bit, criterion in enumerate(self.criteria):
+            for phrase in [criterion, *keywords.get(criterion, [])]:
+                phrase = phrase.lower()
+                index[phrase] = index.get(phrase, 0) | (1 << bit)
+
+        self.matcher = LexiconMatcher(list(index))
+        self._phrase_bits = np.array(
+            [index[cue] for cue in self.matcher.cues], dtype=np.uint64
+        )
+
+    def masks(self, comments):
+        """
+        Criterion bitmask of every comment.
+
+        Each distinct comment text is scanned once (exports repeat a
+        review's comment on every criterion row).
+
+        Parameters:
+            comments: pd.Series (or iterable) of comment texts; NaN allowed
+
+        Returns:
+            np.ndarray: (n,) uint64, bit i set when criteria[i] is discussed
+        """
+        codes, texts = pd.factorize(pd.Series(comments, dtype=object))
+
+        comment, phrase = self.matcher.occurrences(texts)
+        text_masks = np.zeros(len(texts) + 1, dtype=np.uint64)
+        np.bitwise_or.at(text_masks, comment, self._phrase_bits[phrase])
+
+        # Missing comments (code -1) read the trailing zero mask
+        return text_masks[codes]
+
+
+def group_coverage(masks, group_codes, n_groups):
+    """
+    Criteria addressed per group: popcount of the OR of member bitmasks.
+
+    Parameters:
+        masks: (n,) uint64 array of criterion bitmasks
+        group_codes: (n,) int array of group numbers 0..n_groups-1
+        n_groups: int
+
+    Returns:
+        tuple: ((n_groups,) uint64 OR-ed bitmasks,
+                (n_groups,) int64 number of criteria addressed)
+    """
+    group_masks = np.zeros(n_groups, dtype=np.uint64)
+    np.bitwise_or.at(group_masks, np.asarray(group_codes), np.asarray(masks, dtype=np.uint64))
+    return group_masks, popcount(group_masks)
@@ -0,0 +1,25 @@
+"""
+stages
+
+Pipeline stages behind the command-line subcommands
+(python -m visual_nudges <stage>) and the numbered scripts.
+
+Stage modules import only the standard library at module level;
+pandas, scipy, statsmodels and the plotting stack are imported inside
+run(), so --help and lightweight stages start quickly.
+
+Every stage module provides:
+    SUMMARY          one-line description
+    add_arguments()  register the stage's command-line options
+    run(args)        execute the stage
+    main(argv)       parse options and run (used by the scripts)
+"""
+
+# Subcommand name -> stage module, in pipeline order
+STAGES = {
+    "clean": "visual_nudges.stages.clean",
+    "features": "visual_nudges.stages.features",
+    "describe": "visual_nudges.stages.describe",
+    "analyze": "visual_nudges.stages.analyze",
+    "figures": "visual_nudges.stages.figures",
+}
@@ -0,0 +1,500 @@
+"""
+analyze.py  (03_analysis.py, `python -m visual_nudges analyze`)
+
+Purpose:
+    Run the statistical analysis for the Visual Nudges study,
+    starting with descriptive statistics and moving to more
+    advanced (but still reviewer-defensible) inference.
+
+Inputs:
+    data/features/reviewer_level_features.{csv,parquet}
+
+Outputs:
+    results/tables/
+      - table_descriptives_by_condition.csv
+      - table_effect_sizes_by_condition.csv
+      - table_effect_sizes_pairwise.csv
+      - table_bootstrap_ci_by_condition.csv
+      - table_bootstrap_ci_pairwise.csv
+      - table_comparative_flag_by_condition.csv
+      - table_wilcoxon_sensitivity.csv
+      - table_permutation_tests.csv
+      - table_comparative_association_or.csv
+      - table_binary_outcomes_or.csv
+    results/models/
+      - model_summaries.txt
+      - profile_analyze.json   (with --profile; see visual_nudges/profiling.py)
+
+Notes:
+    - Quasi-experimental between-cohort: interpret as associative.
+    - Uses robust, transparent statistics:
+        (1) Descriptives
+        (2) Standardized mean differences (Hedges g)
+        (3) Bootstrap CIs for mean differences
+        (4) Nonparametric tests (Wilcoxon) and permutation tests
+          (means, medians, Hedges g) as sensitivity checks
+        (5) Logistic regression for comparative-reference rate
+          (optional but included, plainly interpreted); odds ratios
+          for all binary outcomes come from batched 2x2 fits
+"""
+
+############################################################
+# ANALYSIS INTENT
+#
+# This analysis characterizes associations between interface
+# conditions and evaluative analytic behavior using a
+# quasi-experimental, between-cohort design.
+#
+# All inferential statistics are reported as robustness and
+# sensitivity checks, not as evidence of causal effects.
+# No covariate adjustment or predictive modeling is performed
+# due to the presence of cohort-level confounds.
+#
+# Effect sizes and confidence intervals are used to describe
+# the magnitude and stability of observed differences.
+############################################################
+
+import argparse
+import sys
+from pathlib import Path
+
+from visual_nudges.constants import RANDOM_SEED
+from visual_nudges.profiling import add_profile_argument, profile_run, section
+
+SUMMARY = "Effect sizes, bootstrap CIs, rank tests and the logit model."
+
+
+def add_arguments(parser):
+    """Register command-line options"""
+    parser.add_argument(
+        '--jobs', type=int, default=1,
+        help="worker processes for per-metric and bootstrap work "
+             "(0 = all cores; results do not depend on this value)"
+    )
+    parser.add_argument(
+        '--cohorts', default='condition',
+        help="column whose levels (conditions, semesters, interface "
+             "variants) are compared pairwise (default: condition)"
+    )
+    parser.add_argument(
+        '--permutations', type=int, default=10_000,
+        help="Monte-Carlo permutations when exact enumeration is too "
+             "large (default: 10000)"
+    )
+    parser.add_argument(
+        '--profile-ci', action='store_true',
+        help="add profile-likelihood CIs to the odds-ratio tables"
+    )
+    parser.add_argument(
+        '--full-summary', action='store_true',
+        help="fit the statsmodels logit and write its full summary to "
+             "model_summaries.txt"
+    )
+    add_profile_argument(parser)
+
+
+def run(args):
+    """Run the full analysis"""
+    from visual_nudges.parallel import task_pool
+
+    with profile_run("analyze", args.profile), task_pool(args.jobs) as pool:
+        run_analysis(pool, args.cohorts, args.permutations,
+                     profile_ci=args.profile_ci, full_summary=args.full_summary)
+
+
+def run_analysis(pool=None, cohort_col='condition', n_permutations=10_000,
+                 profile_ci=False, full_summary=False):
+    """
+    Run sections 0-8; per-metric work is spread over `pool`.
+
+    Pairwise effect sizes and bootstrap CIs are computed among all
+    levels of `cohort_col`, in addition to the baseline/nudge tables.
+    `profile_ci` adds profile-likelihood CIs to the odds-ratio tables;
+    `full_summary` fits the statsmodels logit for model_summaries.txt.
+    """
+    import numpy as np
+    import pandas as pd
+    import scipy
+
+    from visual_nudges.bootstrap import bootstrap_mean_diffs, bootstrap_pairwise
+    from visual_nudges.descriptives import grouped_descriptives
+    from visual_nudges.effects import group_moments, group_samples, pairwise_effects
+    from visual_nudges.logistic import binary_outcome_models, odds_ratios
+    from visual_nudges.permutation import permutation_test
+    from visual_nudges.proportions import proportion_ci
+    from visual_nudges.ranktests import mann_whitney_batch
+    from visual_nudges.storage import read_table
+
+    # =========================
+    # 0) Setup
+    # =========================
+
+    feature_data_path = Path("data/features")
+    results_table_path = Path("results/tables")
+    results_model_path = Path("results/models")
+
+    # Create directories if they don't exist
+    results_table_path.mkdir(parents=True, exist_ok=True)
+    results_model_path.mkdir(parents=True, exist_ok=True)
+
+    # =========================
+    # 1) Load reviewer-level features
+    # =========================
+
+    metrics_continuous = [
+        "total_words",
+        "mean_words_per_comment",
+        "rubric_criteria_addressed",
+        "rubric_coverage_ratio",
+        "comparative_reference_rate",
+        "score_mean",
+        "score_sd",
+        "score_range"
+    ]
+
+    # Only the columns used below (column projection for Parquet).
+    # The reader restores condition as an ordered categorical
+    # (Baseline first, Nudge second) for stable reporting.
+    with section("load"):
+        df = read_table(
+            feature_data_path / "reviewer_level_features",
+            columns=list(dict.fromkeys(
+                ['condition', 'semester', cohort_col, 'n_comments', 'comparative_references']
+                + metrics_continuous
+            ))
+        )
+
+    print(f"Loaded reviewer-level features: {len(df)} reviewers")
+
+    # Basic validation
+    if not all(col in df.columns for col in ['condition', 'semester']):
+        raise ValueError("ERROR: Missing required columns 'condition' and/or 'semester'")
+
+    if df['condition'].nunique() < 2:
+        raise ValueError("ERROR: Need at least 2 conditions for comparison")
+
+    # =========================
+    # 2) Descriptive statistics (by condition)
+    # =========================
+
+    # Calculate descriptive statistics by condition and metric
+    # (one sort per metric; see visual_nudges/descriptives.py)
+    with section("descriptives"):
+        desc_by_condition = grouped_descriptives(
+            df, 'condition', metrics_continuous
+        ).sort_values(['metric', 'condition'])
+
+    with section("write table_descriptives_by_condition.csv"):
+        desc_by_condition.to_csv(
+            results_table_path / "table_descriptives_by_condition.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_descriptives_by_condition.csv")
+
+    # =========================
+    # 3) Effect sizes (Hedges g)
+    # =========================
+
+    # Sufficient statistics (n, sum, sum of squares) per condition and
+    # metric from one grouped reduction; every effect size below is
+    # derived from them (see visual_nudges/effects.py)
+    with section("hedges_g"):
+        moments = group_moments(df, 'condition', metrics_continuous)
+        base = moments['groups'].index('baseline')
+        nudge = moments['groups'].index('nudge')
+
+        df_effects = pairwise_effects(moments, pairs=[(base, nudge)]).rename(columns={
+            'hedges_g_b_minus_a': 'hedges_g_nudge_minus_baseline',
+            'mean_diff_b_minus_a': 'mean_diff_nudge_minus_baseline'
+        })[['metric', 'hedges_g_nudge_minus_baseline', 'mean_diff_nudge_minus_baseline']]
+
+    with section("write table_effect_sizes_by_condition.csv"):
+        df_effects.to_csv(
+            results_table_path / "table_effect_sizes_by_condition.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_effect_sizes_by_condition.csv")
+
+    # All pairwise comparisons among the K levels of the cohort column
+    with section("hedges_g"):
+        if cohort_col != 'condition':
+            moments = group_moments(df, cohort_col, metrics_continuous)
+
+        df_pairwise = pairwise_effects(moments)
+
+    with section("write table_effect_sizes_pairwise.csv"):
+        df_pairwise.to_csv(
+            results_table_path / "table_effect_sizes_pairwise.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_effect_sizes_pairwise.csv ({cohort_col})")
+
+    # =========================
+    # 4) Bootstrap CIs
+    # =========================
+
+    # Batched, memory-bounded engine (see visual_nudges/bootstrap.py).
+    # Replicate means are drawn once per group and metric; every pairwise
+    # difference reuses them. Each metric gets its own SeedSequence child
+    # and each block of replicates its own grandchild, so results do not
+    # depend on --jobs.
+    with section("bootstrap"):
+        cohort_levels, cohort_samples = group_samples(df, cohort_col, metrics_continuous)
+        cohort_cis = bootstrap_pairwise(cohort_samples, seed=RANDOM_SEED, pool=pool)
+
+        pairwise_results = []
+
+        for metric, rows in zip(metrics_continuous, cohort_cis):
+            for ci in rows:
+                pairwise_results.append({
+                    'metric': metric,
+                    'group_a': cohort_levels[ci['a']],
+                    'group_b': cohort_levels[ci['b']],
+                    'mean_diff_b_minus_a': ci['diff'],
+                    'ci95_lo': ci['lo'],
+                    'ci95_hi': ci['hi']
+                })
+
+        # Baseline vs nudge
+        _, condition_samples = group_samples(
+            df, 'condition', metrics_continuous, groups=['baseline', 'nudge']
+        )
+        samples = [
+            (metric, x_base[np.isfinite(x_base)], x_nudge[np.isfinite(x_nudge)])
+            for metric, (x_base, x_nudge) in zip(metrics_continuous, condition_samples)
+        ]
+
+        if cohort_col == 'condition':
+            cis = [rows[0] for rows in cohort_cis]
+        else:
+            cis = bootstrap_mean_diffs(
+                [(x_base, x_nudge) for _, x_base, x_nudge in samples],
+                seed=RANDOM_SEED,
+                pool=pool
+            )
+
+        bootstrap_results = []
+
+        for (metric, _, _), ci in zip(samples, cis):
+            bootstrap_results.append({
+                'metric': metric,
+                'mean_diff_nudge_minus_baseline': ci['diff'],
+                'ci95_lo': ci['lo'],
+                'ci95_hi': ci['hi']
+            })
+
+        df_bootstrap = pd.DataFrame(bootstrap_results)
+
+    with section("write table_bootstrap_ci_by_condition.csv"):
+        df_bootstrap.to_csv(
+            results_table_path / "table_bootstrap_ci_by_condition.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_bootstrap_ci_by_condition.csv")
+
+    with section("write table_bootstrap_ci_pairwise.csv"):
+        pd.DataFrame(pairwise_results).to_csv(
+            results_table_path / "table_bootstrap_ci_pairwise.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_bootstrap_ci_pairwise.csv ({cohort_col})")
+
+    # =========================
+    # 5) Wilcoxon sensitivity checks
+    # =========================
+
+    # All metrics ranked in one 2-D pass; exact null distributions are
+    # cached per (n1, n2) (see visual_nudges/ranktests.py)
+    with section("wilcoxon"):
+        in_pair = df['condition'].isin(['baseline', 'nudge']).to_numpy()
+        X_pair = df.loc[in_pair, metrics_continuous].to_numpy(dtype=float, na_value=np.nan)
+        is_nudge = (df.loc[in_pair, 'condition'] == 'nudge').to_numpy()
+
+        mwu = mann_whitney_batch(X_pair, is_nudge)
+
+        df_wilcoxon = pd.DataFrame({
+            'metric': metrics_continuous,
+            'W': mwu['U'],
+            'p_value': mwu['p_value']
+        })
+
+    with section("write table_wilcoxon_sensitivity.csv"):
+        df_wilcoxon.to_csv(
+            results_table_path / "table_wilcoxon_sensitivity.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_wilcoxon_sensitivity.csv")
+
+    # Permutation tests for mean, median and Hedges g differences, all
+    # metrics at once (exact enumeration for small cohorts, Monte-Carlo
+    # otherwise; see visual_nudges/permutation.py)
+    with section("permutation"):
+        perm = permutation_test(
+            X_pair,
+            is_nudge,
+            n_permutations=n_permutations,
+            seed=RANDOM_SEED
+        )
+
+        df_permutation = pd.DataFrame({
+            'metric': metrics_continuous,
+            'method': perm['method'],
+            'n_permutations': perm['n_permutations'],
+            'mean_diff_nudge_minus_baseline': perm['observed']['mean_diff'],
+            'p_mean_diff': perm['p_value']['mean_diff'],
+            'median_diff_nudge_minus_baseline': perm['observed']['median_diff'],
+            'p_median_diff': perm['p_value']['median_diff'],
+            'hedges_g_nudge_minus_baseline': perm['observed']['hedges_g'],
+            'p_hedges_g': perm['p_value']['hedges_g']
+        })
+
+    with section("write table_permutation_tests.csv"):
+        df_permutation.to_csv(
+            results_table_path / "table_permutation_tests.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_permutation_tests.csv ({perm['method']})")
+
+    # =========================
+    # 6) Binary comparative reference model
+    # =========================
+
+    with section("logit"):
+        # Create binary indicator for any comparative reference
+        df['any_comparative'] = (df['comparative_references'] > 0).astype(int)
+
+        # Tabulate by condition
+        tab_binary = df.groupby('condition').agg(
+            n=('any_comparative', 'size'),
+            n_any=('any_comparative', 'sum'),
+            prop_any=('any_comparative', 'mean')
+        ).reset_index()
+
+        # Exact (Clopper-Pearson) 95% CIs for the proportions
+        tab_binary['ci95_lo'], tab_binary['ci95_hi'] = proportion_ci(
+            tab_binary['n_any'], tab_binary['n']
+        )
+
+    with section("write table_comparative_flag_by_condition.csv"):
+        tab_binary.to_csv(
+            results_table_path / "table_comparative_flag_by_condition.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_comparative_flag_by_condition.csv")
+
+    # Logistic regression: with condition as the only predictor the
+    # model is saturated, so coefficients and Wald CIs have closed
+    # forms in the 2x2 counts (visual_nudges/logistic.py). Reviewers
+    # without a condition are left out, as the formula fit drops them.
+    with section("logit"):
+        nudge = df['condition'] == 'nudge'
+        baseline = df['condition'] == 'baseline'
+        a = int(df.loc[nudge, 'any_comparative'].sum())
+        c = int(df.loc[baseline, 'any_comparative'].sum())
+        fit = odds_ratios(
+            [a], [int(nudge.sum()) - a], [c], [int(baseline.sum()) - c],
+            profile=profile_ci
+        )
+
+        logit_summary = pd.DataFrame({
+            'term': ['Intercept', 'C(condition, Treatment("baseline"))[T.nudge]'],
+            'odds_ratio': [fit['baseline_odds'][0], fit['odds_ratio'][0]],
+            'ci95_lo': [fit['baseline_ci_lo'][0], fit['ci_lo'][0]],
+            'ci95_hi': [fit['baseline_ci_hi'][0], fit['ci_hi'][0]]
+        })
+        if profile_ci:
+            logit_summary['profile_ci95_lo'] = [np.nan, fit['profile_ci_lo'][0]]
+            logit_summary['profile_ci95_hi'] = [np.nan, fit['profile_ci_hi'][0]]
+
+    with section("write table_comparative_association_or.csv"):
+        logit_summary.to_csv(
+            results_table_path / "table_comparative_association_or.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_comparative_association_or.csv")
+
+    if fit['separation'][0]:
+        print("Warning: A condition has no (or only) comparative references; "
+              "the odds ratio is not estimable (separation)")
+
+    # Same model for every binary outcome, pooled over semesters (each
+    # semester ran a single condition, so per-semester condition odds
+    # ratios are not estimable)
+    with section("logit"):
+        df['any_comment'] = (df['n_comments'] > 0).astype(int)
+        df['full_rubric_coverage'] = (df['rubric_coverage_ratio'] >= 1).astype(int)
+        binary_outcomes = ['any_comparative', 'any_comment', 'full_rubric_coverage']
+
+        df_binary = binary_outcome_models(
+            df, binary_outcomes, 'condition', 'baseline', profile=profile_ci
+        )
+
+    with section("write table_binary_outcomes_or.csv"):
+        df_binary.to_csv(
+            results_table_path / "table_binary_outcomes_or.csv",
+            index=False
+        )
+
+    print(f"✓ Saved: table_binary_outcomes_or.csv ({len(df_binary)} models)")
+
+    # =========================
+    # 7) Save model summaries
+    # =========================
+
+    with section("write model_summaries.txt"), \
+            open(results_model_path / "model_summaries.txt", 'w') as f:
+        f.write("=== Logistic regression: any_comparative ~ condition ===\n\n")
+        if full_summary:
+            from statsmodels.formula.api import logit
+
+            try:
+                fit_logit = logit('any_comparative ~ C(condition, Treatment("baseline"))',
+                                  data=df).fit(disp=0)
+                f.write(str(fit_logit.summary()))
+            except Exception as e:
+                print(f"Warning: Logistic regression failed: {e}")
+                f.write(f"statsmodels fit failed: {e}")
+        else:
+            f.write(f"Counts (any / n): baseline {c} / {int(baseline.sum())}, "
+                    f"nudge {a} / {int(nudge.sum())}\n")
+            f.write(f"log OR = {fit['log_or'][0]:.4f} (SE {fit['log_or_se'][0]:.4f}), "
+                    f"Wald p = {fit['p_value'][0]:.4g}\n")
+            f.write("(closed-form 2x2 fit; use --full-summary for the statsmodels summary)")
+        f.write("\n\n=== Odds ratios (Wald 95% CI) ===\n\n")
+        f.write(str(logit_summary))
+        f.write("\n\n=== Binary outcomes ~ condition (pooled) ===\n\n")
+        f.write(df_binary.to_string(index=False))
+
+    print(f"✓ Saved: model_summaries.txt")
+
+    print("\n" + "="*50)
+    print("Analysis complete!")
+    print("="*50)
+
+    # =========================
+    # 8) Session info
+    # =========================
+
+    print("\nPython environment info:")
+    print(f"pandas version: {pd.__version__}")
+    print(f"numpy version: {np.__version__}")
+    print(f"scipy version: {scipy.__version__}")
+    print(f"Python version: {sys.version}")
+
+
+def main(argv=None):
+    """Parse command-line options and run the stage"""
+    parser = argparse.ArgumentParser(
+        description="Run the statistical analysis for the Visual Nudges study."
+    )
+    add_arguments(parser)
+    run(parser.parse_args(argv))
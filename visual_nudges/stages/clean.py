@@ -0,0 +1,251 @@
+"""
+clean.py  (01_data_cleaning.py, `python -m visual_nudges clean`)
+
+Purpose:
+    Load, validate, and minimally clean peer review datasets
+    used in the Visual Nudges study.
+
+Scope:
+    This stage performs structural cleaning only:
+    - standardizes column names
+    - enforces data types
+    - removes empty or malformed records
+    - flags placeholder and boilerplate comments (near-duplicates found
+      in many reviews; see visual_nudges/duplicates.py) in the
+      comment_cluster / is_boilerplate columns, or with
+      --boilerplate drop blanks their text so they count as no comment
+
+IMPORTANT:
+    The datasets contain NO personal identifiers.
+    No anonymization or de-identification is required.
+
+Modes:
+    By default the whole export is loaded (through the content-hashed
+    cache in data/cache/). With --stream, the export is read in row
+    chunks (read-only row iteration for .xlsx, chunked reader for .csv)
+    and each chunk is cleaned and appended to the output, so memory
+    stays flat no matter how many semesters the export holds.
+
+    Boilerplate detection compares comments across the whole export, so
+    it is off by default with --stream (--boilerplate keep). Asking for
+    it (--boilerplate flag or drop) adds a pass over the export that
+    holds every row's review keys and comment text in memory.
+
+Output:
+    A cleaned dataset saved to /data/clean/ for downstream analysis,
+    as peer_review_clean.csv or (with --format parquet)
+    peer_review_clean.parquet, which keeps the categorical dtypes.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from visual_nudges.constants import (
+    BOILERPLATE_MODES, DEFAULT_CHUNK_ROWS, DEFAULT_MIN_REVIEWS, STORAGE_FORMATS
+)
+from visual_nudges.profiling import add_profile_argument, profile_run, section
+
+SUMMARY = "Clean the peer review export."
+
+
+def add_arguments(parser):
+    """Register command-line options"""
+    parser.add_argument(
+        "--input", type=Path, default=Path("data/raw/peer_review_raw.xlsx"),
+        help="raw export (.xlsx or .csv) from the Visual Peer Review Dashboard"
+    )
+    parser.add_argument(
+        "--format", choices=STORAGE_FORMATS, default="csv",
+        help="storage format for data/clean/ (parquet requires pyarrow)"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="clean the export in row chunks with bounded memory"
+    )
+    parser.add_argument(
+        "--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+        help=f"rows per chunk in --stream mode (default: {DEFAULT_CHUNK_ROWS})"
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="compact in-memory dtypes: Int8 scores, comments as "
+             "categoricals of Arrow strings, categories shared across chunks"
+    )
+    parser.add_argument(
+        "--boilerplate", choices=BOILERPLATE_MODES, default=None,
+        help="placeholder/near-duplicate comments: keep as is, flag them "
+             "(comment_cluster, is_boilerplate columns) or drop their text "
+             "(default: flag; keep with --stream, since detection holds "
+             "every comment in memory)"
+    )
+    parser.add_argument(
+        "--min-reviews", type=int, default=DEFAULT_MIN_REVIEWS,
+        help="distinct reviews a near-duplicate comment must appear in to "
+             f"count as boilerplate (default: {DEFAULT_MIN_REVIEWS})"
+    )
+    add_profile_argument(parser)
+
+
+def run(args):
+    """Run the cleaning stage"""
+    with profile_run("clean", args.profile):
+        clean_export(args)
+
+
+def clean_export(args):
+    """Load, clean and save the raw export"""
+    import numpy as np
+    import pandas as pd
+
+    from visual_nudges.cleaning import (
+        SharedCategories, apply_boilerplate, boilerplate_flags, clean_frame, concat_chunks
+    )
+    from visual_nudges.ingest import iter_export_chunks, read_excel_cached
+    from visual_nudges.storage import TableWriter
+
+    # =========================
+    # 0) Setup
+    # =========================
+
+    # Set paths (adjust if needed)
+    clean_data_path = Path("data/clean")
+
+    # Create clean directory if it does not exist
+    clean_data_path.mkdir(parents=True, exist_ok=True)
+
+    # =========================
+    # 1) Load raw data
+    # =========================
+
+    # Example: Excel export from the Visual Peer Review Dashboard
+    # Assumes ONE file per condition or a merged export
+    raw_file = args.input
+
+    if not raw_file.exists():
+        print(f"ERROR: File not found at {raw_file}")
+        sys.exit(1)
+
+    # Raw rows (counted before cleaning: chunks are cleaned in place)
+    n_raw = 0
+
+    if args.stream:
+        # Bounded-memory row chunks; nothing is held beyond one chunk
+        raw_chunks = iter_export_chunks(raw_file, args.chunk_rows)
+        print(f"Streaming raw data in chunks of {args.chunk_rows} rows")
+    else:
+        # Whole export in memory, parsed once into data/cache/
+        # (keyed by the workbook's content hash)
+        with section("load"):
+            if raw_file.suffix.lower() == ".csv":
+                df_raw = pd.read_csv(raw_file)
+            else:
+                df_raw = read_excel_cached(raw_file)
+        print(f"Raw data loaded: {len(df_raw)} rows; {len(df_raw.columns)} columns")
+        n_raw = len(df_raw)
+        raw_chunks = [df_raw]
+
+    # =========================
+    # 2) Data scope and integrity
+    # =========================
+    # The exported datasets contain no direct or indirect personal identifiers.
+    # Records consist solely of rubric scores, interaction-derived measures,
+    # and written peer review comments.
+    #
+    # No anonymization or de-identification procedures were required.
+
+    # =========================
+    # 3-8) Clean and save
+    # =========================
+    # For each chunk (the whole export when not streaming):
+    #   3) standardize column names
+    #   4) validate the expected minimal columns
+    #   5) coerce types
+    #   6) remove empty or invalid records
+    #   7) trim comments and make empty comments explicit NaN
+    #   8) flag (or drop) placeholder and boilerplate comments
+    # (see visual_nudges/cleaning.py), then append to the cleaned output.
+
+    # Boilerplate detection needs every comment at once, which would
+    # undo the flat memory of --stream, so there it is opt-in
+    if args.boilerplate is None:
+        args.boilerplate = "keep" if args.stream else "flag"
+
+    # Compact dtypes: one set of categories for all chunks and semesters
+    compact = {"compact": args.compact,
+               "categories": SharedCategories() if args.compact else None}
+
+    flags = None
+    df_flagged = None
+
+    if args.boilerplate != "keep":
+        with section("boilerplate"):
+            # Near-duplicates are compared across the whole export
+            if args.stream:
+                # One extra pass that keeps only the comments and review
+                # keys (memory grows with the export)
+                print("Note: boilerplate detection holds every comment in memory")
+                from visual_nudges.features import reviewer_keys
+
+                parts = []
+                for chunk in iter_export_chunks(raw_file, args.chunk_rows):
+                    part = clean_frame(chunk, inplace=True, **compact)
+                    parts.append(part[reviewer_keys(part) + ["written_comment"]])
+                flags = boilerplate_flags(
+                    concat_chunks(parts, compact["categories"]), args.min_reviews
+                )
+                del parts
+            else:
+                # The raw rows are cleaned in place (no copy of the export)
+                df_flagged = clean_frame(df_raw, inplace=True, **compact)
+                flags = boilerplate_flags(df_flagged, args.min_reviews)
+
+        print(f"Boilerplate comments: {int(flags['is_boilerplate'].sum())} rows "
+              f"({args.boilerplate})")
+
+    n_flagged = 0
+
+    with TableWriter(clean_data_path / "peer_review_clean", args.format) as writer:
+        for chunk in raw_chunks:
+            if args.stream:
+                n_raw += len(chunk)
+
+            # (the in-memory export is already cleaned when it was flagged)
+            with section("clean"):
+                df_clean = (clean_frame(chunk, inplace=True, **compact)
+                            if df_flagged is None else df_flagged)
+
+                if flags is not None:
+                    rows = flags.iloc[n_flagged:n_flagged + len(df_clean)]
+                    apply_boilerplate(df_clean, rows, args.boilerplate)
+                    n_flagged += len(df_clean)
+
+            # Stable float dtype so chunks agree on the stored schema
+            # (compact scores are always Int8)
+            if args.stream and not args.compact:
+                df_clean['rubric_score'] = df_clean['rubric_score'].astype('float64')
+
+            with section("write peer_review_clean"):
+                writer.write(df_clean)
+
+    n_removed = n_raw - writer.n_rows
+    print(f"After cleaning: {writer.n_rows} rows retained ({n_removed} removed)")
+
+    clean_file = writer.path
+    print(f"Cleaned dataset saved to: {clean_file}")
+
+    # =========================
+    # 9) Session info (for reproducibility)
+    # =========================
+
+    print("\nPython environment info:")
+    print(f"pandas version: {pd.__version__}")
+    print(f"numpy version: {np.__version__}")
+    print(f"Python version: {sys.version}")
+
+
+def main(argv=None):
+    """Parse command-line options and run the stage"""
+    parser = argparse.ArgumentParser(description=SUMMARY)
+    add_arguments(parser)
+    run(parser.parse_args(argv))
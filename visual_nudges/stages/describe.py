@@ -0,0 +1,123 @@
+"""
+describe.py  (02_descriptive_statistics.py, `python -m visual_nudges describe`)
+
+Purpose:
+    Generate descriptive statistics for reviewer-level features
+    by experimental condition.
+
+Inputs:
+    data/features/reviewer_level_features.{csv,parquet}
+
+Outputs:
+    results/descriptive_statistics_by_condition.csv
+"""
+
+import argparse
+from pathlib import Path
+
+from visual_nudges.profiling import add_profile_argument, profile_run, section
+
+SUMMARY = "Descriptive statistics by condition."
+
+
+def add_arguments(parser):
+    """Register command-line options"""
+    add_profile_argument(parser)
+
+
+def run(args):
+    """Run the descriptive-statistics stage"""
+    with profile_run("describe", args.profile):
+        describe_features()
+
+
+def describe_features():
+    """Descriptive statistics of the reviewer-level features"""
+    import pandas as pd
+
+    from visual_nudges.descriptives import group_sizes, grouped_descriptives
+    from visual_nudges.storage import read_table
+
+    # =========================
+    # Setup
+    # =========================
+
+    # Create results directory if it doesn't exist
+    results_path = Path("results")
+    results_path.mkdir(parents=True, exist_ok=True)
+
+    # =========================
+    # Load features
+    # =========================
+
+    with section("load"):
+        df = read_table(
+            "data/features/reviewer_level_features",
+            columns=[
+                "condition",
+                "total_words",
+                "rubric_coverage_ratio",
+                "comparative_references",
+                "score_sd"
+            ]
+        )
+
+    print(f"Loaded {len(df)} reviewer records")
+
+    # Binary flag for any comparative reference
+    df['has_comparison'] = (df['comparative_references'] > 0).astype(int)
+
+    # =========================
+    # Compute stats by condition
+    # =========================
+
+    # One sort per metric (shared engine, see visual_nudges/descriptives.py)
+    with section("descriptives"):
+        desc_long = grouped_descriptives(
+            df,
+            'condition',
+            ['total_words', 'rubric_coverage_ratio', 'has_comparison', 'score_sd']
+        )
+        stats = desc_long.pivot(index='condition', columns='metric')
+
+        desc_table = pd.DataFrame({
+            'n': group_sizes(df, 'condition'),
+
+            # Written feedback
+            'total_words_mean': stats[('mean', 'total_words')],
+            'total_words_sd': stats[('sd', 'total_words')],
+            'total_words_median': stats[('median', 'total_words')],
+            'total_words_iqr': stats[('iqr', 'total_words')],
+
+            # Rubric coverage
+            'rubric_mean': stats[('mean', 'rubric_coverage_ratio')],
+            'rubric_sd': stats[('sd', 'rubric_coverage_ratio')],
+            'rubric_median': stats[('median', 'rubric_coverage_ratio')],
+            'rubric_iqr': stats[('iqr', 'rubric_coverage_ratio')],
+
+            # Comparative behavior
+            'comparison_rate': stats[('mean', 'has_comparison')],
+
+            # Score variability
+            'score_sd_mean': stats[('mean', 'score_sd')],
+            'score_sd_sd': stats[('sd', 'score_sd')]
+        }).rename_axis('condition').reset_index()
+
+    # =========================
+    # Save for LaTeX/reporting
+    # =========================
+
+    output_file = results_path / "descriptive_statistics_by_condition.csv"
+    with section("write descriptive_statistics_by_condition.csv"):
+        desc_table.to_csv(output_file, index=False)
+
+    print(f"\nDescriptive statistics saved to: {output_file}")
+    print("\nPreview:")
+    print(desc_table)
+
+
+def main(argv=None):
+    """Parse command-line options and run the stage"""
+    parser = argparse.ArgumentParser(description=SUMMARY)
+    add_arguments(parser)
+    run(parser.parse_args(argv))
@@ -0,0 +1,142 @@
+"""
+features.py  (01b_feature_extraction.py, `python -m visual_nudges features`)
+
+Purpose:
+    Aggregate the cleaned, long-format peer review data into
+    reviewer-level features for descriptive statistics and analysis.
+
+Inputs:
+    data/clean/peer_review_clean.{csv,parquet}
+
+Outputs:
+    data/features/reviewer_level_features.csv
+    (or .parquet with --format parquet)
+
+Features (per reviewer):
+    - total_words, mean_words_per_comment
+    - rubric_criteria_addressed, rubric_coverage_ratio
+    - comparative_references, comparative_reference_rate
+    - score_mean, score_sd, score_range
+
+Notes:
+    All features come from batched text scans and one grouped reduction
+    (see visual_nudges/features.py); no per-row apply is used, so the
+    stage scales to millions of comment rows.
+    --lexicon replaces the comparative cues with a file of cues (one
+    per line); matching cost does not grow with the lexicon size.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from visual_nudges.constants import STORAGE_FORMATS
+from visual_nudges.profiling import add_profile_argument, profile_run, section
+
+SUMMARY = "Build reviewer-level features."
+
+
+def add_arguments(parser):
+    """Register command-line options"""
+    parser.add_argument(
+        "--format", choices=STORAGE_FORMATS, default="csv",
+        help="storage format for data/features/ (parquet requires pyarrow)"
+    )
+    parser.add_argument(
+        "--lexicon", type=Path, default=None,
+        help="comparative-cue lexicon file, one cue per line "
+             "(default: the built-in COMPARATIVE_CUES)"
+    )
+    add_profile_argument(parser)
+
+
+def run(args):
+    """Run the feature-extraction stage"""
+    with profile_run("features", args.profile):
+        build_features(args)
+
+
+def build_features(args):
+    """Load the cleaned data, build and save the reviewer-level features"""
+    import numpy as np
+    import pandas as pd
+
+    from visual_nudges.features import COMPARATIVE_CUES, build_reviewer_features
+    from visual_nudges.lexicon import load_lexicon
+    from visual_nudges.storage import read_table, write_table
+
+    # =========================
+    # 0) Setup
+    # =========================
+
+    clean_data_path = Path("data/clean")
+    feature_data_path = Path("data/features")
+
+    # Create features directory if it does not exist
+    feature_data_path.mkdir(parents=True, exist_ok=True)
+
+    # =========================
+    # 1) Load cleaned data
+    # =========================
+
+    clean_stem = clean_data_path / "peer_review_clean"
+
+    # Only the columns the feature builder uses
+    clean_columns = [
+        "semester",
+        "condition",
+        "submission_id",
+        "reviewer_id",
+        "rubric_criterion",
+        "rubric_score",
+        "written_comment"
+    ]
+
+    try:
+        with section("load"):
+            df = read_table(clean_stem, columns=clean_columns, optional=["reviewer_id"])
+        print(f"Clean data loaded: {len(df)} rows")
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    # =========================
+    # 2) Build reviewer-level features
+    # =========================
+
+    cues = COMPARATIVE_CUES
+    if args.lexicon is not None:
+        cues = load_lexicon(args.lexicon)
+        print(f"Comparative lexicon: {len(cues)} cues from {args.lexicon}")
+
+    with section("features"):
+        df_features = build_reviewer_features(df, cues=cues)
+
+    print(f"Reviewer-level features: {len(df_features)} reviewers")
+
+    # =========================
+    # 3) Save features
+    # =========================
+
+    with section("write reviewer_level_features"):
+        features_file = write_table(
+            df_features, feature_data_path / "reviewer_level_features", args.format
+        )
+
+    print(f"✓ Saved: {features_file}")
+
+    # =========================
+    # 4) Session info (for reproducibility)
+    # =========================
+
+    print("\nPython environment info:")
+    print(f"pandas version: {pd.__version__}")
+    print(f"numpy version: {np.__version__}")
+    print(f"Python version: {sys.version}")
+
+
+def main(argv=None):
+    """Parse command-line options and run the stage"""
+    parser = argparse.ArgumentParser(description=SUMMARY)
+    add_arguments(parser)
+    run(parser.parse_args(argv))
@@ -0,0 +1,582 @@
+"""
+figures.py  (`python -m visual_nudges figures`)
+
+Purpose:
+    Render the paper figures from the two cohort workbooks.
+
+Inputs:
+    Baseline Spring 2025.xlsx      (Baseline interface)
+    Visual Nudges Fall 2025.xlsx   (Visual Nudge interface)
+    Sheet1: Comments, then one numeric column per rubric dimension
+
+Outputs:
+    results/figures/
+      - Effect_of_Visual_Nudges_Articulation.png   (Figure 2)
+      - rubric_dimension_VIS_clean.png             (Figure 3)
+      - Figure4_Comparative_References.png         (Figure 4)
+      - figures_manifest.json                      (digest per figure)
+
+Notes:
+    - Ports of Figure 2.py, Figure3.py and Figure4.py, rendered with the
+      non-interactive Agg backend (no plt.show()), so the command runs
+      unattended.
+    - The workbooks are read once (through the content-hashed cache in
+      data/cache/) into one shared summary (visual_nudges/figure_data.py),
+      stored in data/cache/figures/ for the rendering workers.
+    - Figures are rendered in parallel worker processes (--jobs).
+    - A figure is skipped when the digest of its summary columns, style
+      settings and drawing code matches figures_manifest.json and the
+      PNG exists (--force redraws everything).
+    - Figure 2 has a large-n mode (--large-n, automatic above
+      LARGE_N_COMMENTS comments): the violin comes from a binned FFT
+      KDE, the box from one quantile pass, and the points are a
+      density-aware subsample drawn rasterized (visual_nudges/density.py),
+      so render time and file size stay bounded.
+    - Figure 2 plots every non-empty comment (the original referenced an
+      undefined df_balanced).
+    - When the workbooks have no Comparative_Reference column, Figure 4
+      flags comments that contain a comparative cue
+      (see visual_nudges/features.py and visual_nudges/lexicon.py).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from visual_nudges.constants import (
+    COHORT_WORKBOOKS, FIGURE_FILES, FIGURES_DIR, FIGURES_MANIFEST, RANDOM_SEED
+)
+from visual_nudges.profiling import add_profile_argument, profile_run, section
+
+SUMMARY = "Render Figures 2-4 from the cohort workbooks."
+
+FIGURES = ("2", "3", "4")
+
+# IEEE palette
+IEEE_GRAY = "#75787B"  # IEEE Cool Gray (Baseline)
+IEEE_TEAL = "#007377"  # IEEE Teal (Visual Nudge)
+
+# Output file, plotted summary columns and style of each figure
+# ("rubric" stands for every rubric score column)
+FIGURE_SPECS = {
+    "2": {
+        "file": FIGURE_FILES["2"],
+        "columns": ["Condition", "Comment_Length"],
+        "style": {
+            "labels": ["Baseline", "Visual Nudge"],
+            "colors": [IEEE_GRAY, IEEE_TEAL],
+            "size": [8, 5],
+            "dpi": 300,
+            "large_n": "auto",
+            "max_points": 2_000,
+        },
+    },
+    "3": {
+        "file": FIGURE_FILES["3"],
+        "columns": ["Condition", "rubric"],
+        "style": {
+            "labels": ["Baseline Interface", "Visual Nudge Interface"],
+            "colors": [IEEE_GRAY, IEEE_TEAL],
+            "size": [10, 6],
+            "dpi": 300,
+        },
+    },
+    "4": {
+        "file": FIGURE_FILES["4"],
+        "columns": ["Condition", "Comparative_Reference"],
+        "style": {
+            "labels": ["Baseline", "Visual Nudge"],
+            "colors": [IEEE_GRAY, IEEE_TEAL],
+            "size": [10, 5],
+            "dpi": 300,
+        },
+    },
+}
+
+# Figure 2 switches to the large-n rendering above this many comments
+LARGE_N_COMMENTS = 5_000
+LARGE_N_MODES = ("auto", "on", "off")
+
+SUMMARY_DIR = Path("data/cache/figures")
+MANIFEST = FIGURES_MANIFEST
+
+
+def add_arguments(parser):
+    """Register command-line options"""
+    parser.add_argument(
+        "--baseline", type=Path, default=Path(COHORT_WORKBOOKS[0]),
+        help="Baseline cohort workbook"
+    )
+    parser.add_argument(
+        "--nudge", type=Path, default=Path(COHORT_WORKBOOKS[1]),
+        help="Visual Nudge cohort workbook"
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, default=Path(FIGURES_DIR),
+        help=f"directory for the PNG files (default: {FIGURES_DIR})"
+    )
+    parser.add_argument(
+        "--only", choices=FIGURES, nargs="+", default=list(FIGURES),
+        help="figures to render (default: all)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=0,
+        help="worker processes for rendering (default 0 = one per figure, "
+             "up to all cores)"
+    )
+    parser.add_argument(
+        "--large-n", choices=LARGE_N_MODES, default="auto",
+        help="Figure 2 large-n rendering (binned KDE, precomputed box "
+             "statistics, thinned rasterized points); auto = above "
+             f"{LARGE_N_COMMENTS:,} comments"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="redraw figures even when their inputs and style are unchanged"
+    )
+    add_profile_argument(parser)
+
+
+def with_labels(summary, labels):
+    """Summary with the Condition levels renamed to a figure's labels"""
+    summary = summary.copy(deep=False)
+    summary["Condition"] = summary["Condition"].cat.rename_categories(list(labels))
+    return summary
+
+
+def figure_2(summary, output_file, style):
+    """Figure 2: comment length (word count) by condition"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    # =========================
+    # PREPARE DATA
+    # =========================
+    # Word counts are precomputed in the summary (missing and
+    # placeholder comments stay missing; see visual_nudges/text.py)
+    df_clean = with_labels(summary, style["labels"]).dropna(subset=["Comment_Length"])
+
+    # =========================
+    # VISUAL SETTINGS
+    # =========================
+    ieee_colors = dict(zip(style["labels"], style["colors"]))
+
+    # Trim extreme outliers for display (98th percentile)
+    y_limit = np.quantile(df_clean["Comment_Length"], 0.98)
+
+    # =========================
+    # PLOT
+    # =========================
+    plt.figure(figsize=style["size"])
+
+    large_n = style["large_n"] == "on" or (
+        style["large_n"] == "auto" and len(df_clean) > LARGE_N_COMMENTS
+    )
+    if large_n:
+        draw_large_n_distribution(
+            plt.gca(), df_clean, "Condition", "Comment_Length", ieee_colors,
+            style["max_points"]
+        )
+    else:
+        draw_distribution(df_clean, "Condition", "Comment_Length", ieee_colors)
+
+    plt.ylim(0, y_limit)
+
+    plt.title(
+        "Effect of Visual Nudges on Feedback Articulation",
+        fontsize=14,
+        weight="bold"
+    )
+    plt.xlabel("")
+    plt.ylabel("Word Count")
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=style["dpi"])
+    plt.close()
+
+
+def draw_distribution(df_clean, x, y, colors):
+    """Violin, box and jittered points of every value (seaborn)"""
+    import seaborn as sns
+
+    # Violin (background distribution)
+    sns.violinplot(
+        data=df_clean,
+        x=x,
+        y=y,
+        hue=x,
+        palette=colors,
+        legend=False,
+        cut=0,
+        inner=None,
+        density_norm="width",
+        alpha=0.12
+    )
+
+    # Boxplot (summary)
+    sns.boxplot(
+        data=df_clean,
+        x=x,
+        y=y,
+        width=0.2,
+        showcaps=True,
+        boxprops={"facecolor": "white", "edgecolor": "black"},
+        whiskerprops={"color": "black"},
+        medianprops={"color": "black"},
+        showfliers=False
+    )
+
+    # Jittered points
+    sns.stripplot(
+        data=df_clean,
+        x=x,
+        y=y,
+        hue=x,
+        palette=colors,
+        legend=False,
+        jitter=0.15,
+        size=5,
+        alpha=0.65
+    )
+
+
+def draw_large_n_distribution(ax, df_clean, x, y, colors, max_points):
+    """
+    Violin, box and points drawn from precomputed summaries.
+
+    Per group: an FFT-binned KDE for the violin, one quantile pass for
+    the box, and a density-aware subsample of at most about
+    `max_points` points, jittered within the violin outline and
+    rasterized. Cost and output size do not grow with the group size.
+    """
+    import numpy as np
+
+    from visual_nudges.density import binned_kde, box_stats, thin_points
+
+    groups = [level for level in df_clean[x].cat.categories
+              if (df_clean[x] == level).any()]
+    values_by_group = df_clean.groupby(x, observed=True)[y]
+
+    stats = []
+    rng = np.random.default_rng(RANDOM_SEED)
+    for position, level in enumerate(groups):
+        values = values_by_group.get_group(level).to_numpy(dtype=float)
+        grid, density = binned_kde(values)
+        half_width = 0.4 * density / density.max()
+
+        # Violin (background distribution, width-normalized)
+        ax.fill_betweenx(grid, position - half_width, position + half_width,
+                         color=colors[level], alpha=0.12, linewidth=0)
+
+        stats.append(box_stats(values))
+
+        # Thinned points, jittered in proportion to the local density
+        kept = values[thin_points(values, max_points)]
+        spread = 0.15 * np.interp(kept, grid, density) / density.max()
+        ax.scatter(position + rng.uniform(-1, 1, len(kept)) * spread, kept,
+                   s=25, color=colors[level], alpha=0.65, linewidths=0,
+                   rasterized=True, zorder=3)
+
+    # Boxplot (summary) from the precomputed statistics
+    ax.bxp(
+        stats,
+        positions=range(len(groups)),
+        widths=0.2,
+        showfliers=False,
+        patch_artist=True,
+        boxprops={"facecolor": "white", "edgecolor": "black"},
+        whiskerprops={"color": "black"},
+        capprops={"color": "black"},
+        medianprops={"color": "black"}
+    )
+
+    ax.set_xticks(range(len(groups)), groups)
+    ax.set_xlim(-0.5, len(groups) - 0.5)
+
+
+def figure_3(summary, output_file, style):
+    """Figure 3: rubric-level mean scores (95% CI) by interface"""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import seaborn as sns
+    from matplotlib.patches import Patch
+
+    from visual_nudges.figure_data import rubric_columns, rubric_score_summary
+
+    df_all = with_labels(summary, style["labels"])
+
+    # =========================
+    # SUMMARY STATISTICS (from the wide score matrix)
+    # =========================
+    with section("rubric_summary"):
+        summary_df = rubric_score_summary(df_all, rubric_columns(df_all))
+
+    rubrics = summary_df["Rubric"].unique()
+    conditions = list(summary_df["Condition"].cat.categories)
+    shape = (len(rubrics), len(conditions))
+
+    # =========================
+    # IEEE COLORS (seaborn's bar saturation)
+    # =========================
+    ieee_colors = dict(zip(style["labels"], style["colors"]))
+    bar_colors = [sns.desaturate(ieee_colors[c], 0.75) for c in conditions]
+
+    # =========================
+    # BAR POSITIONS
+    # =========================
+    # Conditions share 0.8 of each rubric slot, centred on the tick
+    width = 0.8 / len(conditions)
+    offsets = (np.arange(len(conditions)) - (len(conditions) - 1) / 2) * width
+    x = (np.arange(len(rubrics))[:, None] + offsets[None, :]).ravel()
+
+    # =========================
+    # PLOT
+    # =========================
+    plt.figure(figsize=style["size"])
+    ax = plt.gca()
+
+    ax.bar(
+        x,
+        summary_df["mean_score"],
+        width=width,
+        color=np.tile(bar_colors, (shape[0], 1))
+    )
+
+    # All error bars in one call
+    ax.errorbar(
+        x=x,
+        y=summary_df["mean_score"],
+        yerr=summary_df["ci"],
+        fmt="none",
+        capsize=5,
+        color="black",
+        linewidth=1.2
+    )
+
+    ax.set_xticks(np.arange(len(rubrics)), rubrics)
+    plt.title("Rubric-Level Mean Scores by Interface", fontsize=16, fontweight="bold")
+    plt.xlabel("Rubric Dimension", fontweight="bold")
+    plt.ylabel("Mean Score", fontweight="bold")
+    plt.xticks(rotation=40)
+    plt.legend(
+        handles=[Patch(color=color, label=c) for c, color in zip(conditions, bar_colors)],
+        title="", loc="upper center"
+    )
+    plt.tight_layout()
+
+    plt.savefig(output_file, dpi=style["dpi"])
+    plt.close()
+
+
+def figure_4(summary, output_file, style):
+    """Figure 4: share of reviews with a cross-submission comparison"""
+    import numpy as np
+    from mizani.formatters import percent_format
+    from plotnine import (
+        aes, element_blank, element_text, geom_errorbarh, geom_point,
+        geom_segment, geom_text, ggplot, labs, scale_color_manual,
+        scale_x_continuous, theme, theme_minimal
+    )
+
+    from visual_nudges.proportions import proportion_ci
+
+    df_all = with_labels(summary, style["labels"])
+
+    # =========================
+    # COMPARISON COLUMN
+    # =========================
+    # Exported flag, or derived from the comment text when the
+    # workbooks have none (see visual_nudges/figure_data.py)
+    comparison_column = "Comparative_Reference"
+
+    # =========================
+    # COMPUTE PROPORTIONS
+    # =========================
+    df_comp = (
+        df_all
+        .groupby("Condition", observed=True)[comparison_column]
+        .agg(["sum", "count"])
+        .reset_index()
+    )
+
+    df_comp.columns = ["Condition", "Success", "Total"]
+    df_comp["Proportion"] = df_comp["Success"] / df_comp["Total"]
+
+    # =========================
+    # EXACT BINOMIAL CI (Clopper-Pearson, all conditions in one call)
+    # =========================
+    df_comp["CI_low"], df_comp["CI_high"] = proportion_ci(
+        df_comp["Success"], df_comp["Total"],
+        method="clopper-pearson", confidence_level=0.95
+    )
+
+    # =========================
+    # IEEE COLORS
+    # =========================
+    vis_colors = dict(zip(style["labels"], style["colors"]))
+
+    # =========================
+    # PLOT
+    # =========================
+    p = (
+        ggplot(df_comp, aes(x="Proportion", y="Condition", color="Condition"))
+
+        # Background rail
+        + geom_segment(aes(x=0, xend=1, y="Condition", yend="Condition"),
+                       color="#E5E5E5", size=5)  # grey90
+
+        # Filled rail
+        + geom_segment(aes(x=0, xend="Proportion", y="Condition", yend="Condition"),
+                       size=5)
+
+        # Error bars
+        + geom_errorbarh(aes(xmin="CI_low", xmax="CI_high"),
+                         height=0.25,
+                         size=1.2,
+                         color="black")
+
+        # Point
+        + geom_point(size=7, stroke=2, fill="white", shape="o")
+
+        # Percentage label
+        + geom_text(
+            aes(label=df_comp["Proportion"].map(lambda x: f"{x:.0%}")),
+            ha="left",
+            nudge_x=0.02,
+            size=12
+        )
+
+        + scale_x_continuous(
+            labels=percent_format(),
+            limits=(0, 1),
+            breaks=np.linspace(0, 1, 5)
+        )
+
+        + scale_color_manual(values=vis_colors)
+
+        + labs(
+            title="Effect of Visual Nudges on Cross-Submission Comparison",
+            x="Proportion of Reviews Containing Cross-Submission Comparison",
+            y=""
+        )
+
+        + theme_minimal(base_size=14)
+        + theme(
+            legend_position="none",
+            panel_grid_minor=element_blank(),
+            panel_grid_major_y=element_blank(),
+            axis_text_y=element_text(weight="bold")
+        )
+    )
+
+    # =========================
+    # SAVE FIGURE
+    # =========================
+    width, height = style["size"]
+    p.save(output_file, width=width, height=height, dpi=style["dpi"], verbose=False)
+
+
+RENDERERS = {"2": figure_2, "3": figure_3, "4": figure_4}
+
+
+def figure_fingerprint(name, summary, style):
+    """
+    Digest of one figure's inputs: its summary columns, its style
+    settings and the drawing code (this module, figure_data.py and
+    density.py).
+    """
+    from visual_nudges import density, figure_data
+
+    from visual_nudges.figure_data import figure_digest, rubric_columns
+
+    spec = FIGURE_SPECS[name]
+    columns = []
+    for col in spec["columns"]:
+        columns.extend(rubric_columns(summary) if col == "rubric" else [col])
+
+    code = "".join(Path(module.__file__).read_text()
+                   for module in (sys.modules[__name__], figure_data, density))
+    return figure_digest(summary, columns, dict(style, code=code))
+
+
+def render_figure(name, summary_file, output_file, style):
+    """Render one figure from the stored summary (worker entry point)"""
+    import matplotlib
+
+    # Headless rendering (no display, no plt.show())
+    matplotlib.use("Agg")
+
+    import pandas as pd
+
+    summary = pd.read_pickle(summary_file)
+    with section(f"figure {name}"):
+        RENDERERS[name](summary, output_file, style)
+    return output_file
+
+
+def run(args):
+    """Render the figures whose summary, style or code changed"""
+    with profile_run("figures", args.profile):
+        render_figures(args)
+
+
+def render_figures(args):
+    """Rebuild the summary and render the pending figures"""
+    from visual_nudges.figure_data import build_figure_summary
+    from visual_nudges.parallel import resolve_jobs, run_tasks, task_pool
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_file = args.output_dir / MANIFEST
+    try:
+        manifest = json.loads(manifest_file.read_text())
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    # =========================
+    # SHARED SUMMARY (workbooks read and comments scanned once)
+    # =========================
+    with section("load"):
+        summary = build_figure_summary(args.baseline, args.nudge)
+
+    SUMMARY_DIR.mkdir(parents=True, exist_ok=True)
+    summary_file = SUMMARY_DIR / "figure_summary.pkl"
+    summary.to_pickle(summary_file)
+
+    # =========================
+    # SKIP UNCHANGED FIGURES
+    # =========================
+    pending = []
+    digests = {}
+    for name in FIGURES:
+        if name not in args.only:
+            continue
+        output_file = args.output_dir / FIGURE_SPECS[name]["file"]
+        style = dict(FIGURE_SPECS[name]["style"])
+        if name == "2":
+            style["large_n"] = args.large_n
+        digests[name] = figure_fingerprint(name, summary, style)
+
+        if not args.force and manifest.get(name) == digests[name] and output_file.exists():
+            print(f"✓ Up to date: {output_file}")
+        else:
+            pending.append((name, summary_file, output_file, style))
+
+    # =========================
+    # RENDER (one worker process per figure)
+    # =========================
+    jobs = min(resolve_jobs(args.jobs), max(len(pending), 1))
+    with section("render"), task_pool(jobs) as pool:
+        for task, output_file in zip(pending, run_tasks(render_figure, pending, pool)):
+            name = task[0]
+            manifest[name] = digests[name]
+            print(f"✓ Saved: {output_file}")
+
+    manifest_file.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+
+
+def main(argv=None):
+    """Parse command-line options and run the stage"""
+    parser = argparse.ArgumentParser(description=SUMMARY)
+    add_arguments(parser)
+    run(parser.parse_args(argv))
@@ -0,0 +1,278 @@
+"""
+storage.py
+
+Purpose:
+    Read and write the pipeline's intermediate tables
+    (data/clean/ and data/features/) as CSV or Parquet.
+
+Formats:
+    csv      Plain text; dtypes are re-applied from CLEAN_DTYPES on read.
+    parquet  Columnar (Arrow). Keeps numeric dtypes and stores the
+             categoricals (semester, condition with its ordering,
+             submission_id, rubric_criterion) dictionary-encoded, and
+             lets each stage read only the columns it needs.
+             Requires pyarrow.
+
+    Tables are addressed by stem (e.g. data/clean/peer_review_clean);
+    the reader picks whichever of <stem>.parquet / <stem>.csv exists,
+    preferring the most recently written one.
+
+    Tables are written to a temporary sibling file and moved into place
+    only once complete, so a stage that fails midway never leaves a
+    truncated table behind.
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from visual_nudges.constants import CONDITION_CATEGORIES, STORAGE_FORMATS
+
+# dtypes re-applied when an intermediate table is read back from CSV
+CLEAN_DTYPES = {
+    "semester": "category",
+    "condition": pd.CategoricalDtype(CONDITION_CATEGORIES, ordered=True),
+    "submission_id": "category",
+    "rubric_criterion": "category",
+    "written_comment": "string",
+}
+
+
+def table_path(stem, fmt):
+    """Path of the `fmt` file for a table stem"""
+    if fmt not in STORAGE_FORMATS:
+        raise ValueError(
+            f"ERROR: Unknown storage format '{fmt}' "
+            f"(expected one of: {', '.join(STORAGE_FORMATS)})"
+        )
+    return Path(stem).with_suffix(f".{fmt}")
+
+
+def _partial_path(path):
+    """Temporary sibling a table is written to before it is moved into place"""
+    return path.with_name(f".{path.name}.{os.getpid()}.partial")
+
+
+def _require_pyarrow():
+    """Fail early with a clear message when Parquet is unavailable"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "ERROR: Parquet storage requires pyarrow (pip install pyarrow); "
+            "use --format csv instead"
+        ) from None
+
+
+def write_table(df, stem, fmt="csv"):
+    """
+    Write an intermediate table.
+
+    Parameters:
+        df: pd.DataFrame to save
+        stem: str or Path, file path without extension
+        fmt: str, 'csv' or 'parquet'
+
+    Returns:
+        Path: the file written
+    """
+    path = table_path(stem, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if fmt == "parquet":
+        _require_pyarrow()
+
+    tmp = _partial_path(path)
+    try:
+        if fmt == "parquet":
+            df.to_parquet(tmp, engine="pyarrow", index=False)
+        else:
+            df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    return path
+
+
+def find_table(stem):
+    """
+    Locate the stored file for a table stem.
+
+    Parameters:
+        stem: str or Path, file path without extension
+
+    Returns:
+        Path: the newest existing <stem>.parquet or <stem>.csv
+
+    Raises:
+        FileNotFoundError: if neither exists
+    """
+    candidates = [table_path(stem, fmt) for fmt in STORAGE_FORMATS]
+    existing = [path for path in candidates if path.exists()]
+
+    if not existing:
+        raise FileNotFoundError(
+            f"No table found for {stem} (looked for "
+            f"{', '.join(str(path) for path in candidates)})"
+        )
+
+    return max(existing, key=lambda path: path.stat().st_mtime)
+
+
+def table_columns(path):
+    """Column names stored in a table file, without reading its data"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(stem, columns=None, optional=()):
+    """
+    Read an intermediate table, optionally projecting columns.
+
+    Parameters:
+        stem: str or Path, file path without extension
+        columns: list of str, columns to read (None = all)
+        optional: iterable of str, columns in `columns` that may be
+            absent from the file
+
+    Returns:
+        pd.DataFrame: table with CLEAN_DTYPES applied where present
+    """
+    path = find_table(stem)
+
+    if columns is not None and optional:
+        stored = set(table_columns(path))
+        columns = [c for c in columns if c in stored or c not in set(optional)]
+
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        df = pd.read_parquet(path, engine="pyarrow", columns=columns)
+
+        # Dictionaries of streamed (--compact) tables list levels in the
+        # order the chunks met them; sort them as a CSV round trip would
+        for column in df.columns:
+            dtype = df[column].dtype
+            if isinstance(dtype, pd.CategoricalDtype) and not dtype.ordered:
+                try:
+                    df[column] = df[column].cat.reorder_categories(dtype.categories.sort_values())
+                except TypeError:
+                    pass  # mixed types: keep the stored order
+    else:
+        usecols = columns
+        dtypes = {c: t for c, t in CLEAN_DTYPES.items()
+                  if usecols is None or c in usecols}
+        df = pd.read_csv(path, usecols=usecols, dtype=dtypes)
+
+    # Parquet already round-trips the ordered categorical
+    if "condition" in df.columns and df["condition"].dtype != CLEAN_DTYPES["condition"]:
+        df["condition"] = df["condition"].astype(CLEAN_DTYPES["condition"])
+
+    return df
+
+
+def _stored_schema(schema):
+    """
+    Arrow schema of a table written chunk by chunk.
+
+    Every dictionary (categorical) field gets int32 indices. A column
+    that is all missing in the first chunk is inferred as Arrow's null
+    type; it is stored as CLEAN_DTYPES declares (text or categories),
+    and as text when the column is not listed there.
+    """
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        dictionary = pa.types.is_dictionary(field.type)
+        value_type = field.type.value_type if dictionary else field.type
+        ordered = field.type.ordered if dictionary else False
+
+        if pa.types.is_null(value_type):
+            value_type = pa.large_string()
+            dtype = CLEAN_DTYPES.get(field.name)
+            if isinstance(dtype, pd.CategoricalDtype) or dtype == "category":
+                dictionary = True
+                ordered = bool(getattr(dtype, "ordered", False))
+
+        if dictionary:
+            field = field.with_type(pa.dictionary(pa.int32(), value_type, ordered))
+        else:
+            field = field.with_type(value_type)
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+class TableWriter:
+    """
+    Append-only writer for building a table chunk by chunk.
+
+    CSV chunks are appended as text with a single header. Parquet
+    chunks become row groups of one file; the Arrow schema is fixed by
+    the first chunk and later chunks are cast to it, so per-chunk dtype
+    inference cannot break the file. Columns that are all missing in
+    the first chunk take their type from CLEAN_DTYPES (text otherwise)
+    instead of Arrow's null type. Categorical columns are stored
+    dictionary-encoded per row group, with int32 indices so chunks with
+    more categories still fit.
+
+    Chunks go to a temporary file next to the target, which replaces
+    the target only when the `with` block completes without an error.
+
+    Usage:
+        with TableWriter(stem, fmt) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, stem, fmt="csv"):
+        self.path = table_path(stem, fmt)
+        self.fmt = fmt
+        self.n_rows = 0
+        self._header = True
+        self._parquet = None
+        self._tmp = None
+
+        if fmt == "parquet":
+            _require_pyarrow()
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = _partial_path(self.path)
+        self._tmp.unlink(missing_ok=True)
+        return self
+
+    def write(self, df):
+        """Append a chunk"""
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self._tmp, _stored_schema(table.schema))
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        else:
+            df.to_csv(self._tmp, mode="a", header=self._header, index=False)
+            self._header = False
+
+        self.n_rows += len(df)
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._parquet is not None:
+                self._parquet.close()
+            if exc_type is None:
+                if self._tmp.exists():
+                    os.replace(self._tmp, self.path)
+                else:
+                    # Nothing was written: no table, as with no chunks
+                    self.path.unlink(missing_ok=True)
+        finally:
+            self._tmp.unlink(missing_ok=True)
+        return False
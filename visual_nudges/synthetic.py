@@ -0,0 +1,320 @@
+"""
+synthetic.py
+
+Purpose:
+    Synthetic dashboard exports at any scale, for stress tests and
+    benchmarks (the shareable workbooks hold about 65 rows each).
+
+Layouts:
+    long   the raw export 01_data_cleaning.py reads: one row per review
+           and rubric criterion, with the dashboard's column names
+           (Submission ID, Written Comment, Rubric Criterion,
+           Rubric Score, Semester, Condition); each review repeats its
+           comment on every criterion row, as real exports do
+    wide   the cohort workbooks the figures read: one row per review
+           with Comments and one score column per criterion; one file
+           per condition (<stem>_baseline / <stem>_nudge)
+
+Distributions (see generate_chunks()):
+    - comment length in words: lognormal, with a longer median for the
+      nudge condition (`nudge_length_ratio`)
+    - placeholder comments ("None response", "N/A", ...) and empty
+      comments at configurable rates
+    - comparative cues (COMPARATIVE_CUES) inserted into comments at a
+      configurable rate per condition
+    - rubric keywords (RUBRIC_KEYWORDS) mentioned per criterion at a
+      configurable rate
+    - scores 1..max_score from a discretized Beta distribution whose
+      skew moves mass to low (< 0) or high (> 0) scores
+
+Streaming:
+    Reviews are generated in chunks and written as they are produced
+    (CSV appends, Parquet row groups, openpyxl write-only sheets), so
+    memory stays flat for multi-GB outputs. Every chunk draws from its
+    own SeedSequence.spawn stream: output depends only on the seed and
+    the chunk size.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from visual_nudges.constants import RANDOM_SEED
+from visual_nudges.features import COMPARATIVE_CUES
+from visual_nudges.rubric import RUBRIC_KEYWORDS
+
+LAYOUTS = ("long", "wide")
+OUTPUT_FORMATS = (".xlsx", ".csv", ".parquet")
+
+DEFAULT_CRITERIA = ["Detailed label", "Lie factor", "Data/color ink ratio", "Chart junk"]
+DEFAULT_SEMESTERS = ["Spring 2025", "Fall 2025"]
+
+# Reviews generated per chunk
+DEFAULT_CHUNK_REVIEWS = 50_000
+
+# Excel sheet row limit (including the header)
+XLSX_MAX_ROWS = 1_048_576
+
+PLACEHOLDER_TEXTS = ["None response", "No Submission", "N/A", "None", "n/a"]
+
+# Filler vocabulary for comment bodies
+_FILLER = (
+    "the this visualization map chart design is clean clear simple busy "
+    "nice good great strong weak overall work data elements balance "
+    "readable information layout structure message easy hard to read "
+    "follow and with but also very quite too many few some a of in it "
+    "I like approve think would could more less use uses shows"
+).split()
+
+
+def _comment_texts(rng, n, condition, criteria, options):
+    """Comment texts of `n` reviews of one condition (NaN = no comment)"""
+    median = options["length_median"] * (
+        options["nudge_length_ratio"] if condition == "nudge" else 1.0
+    )
+    lengths = np.clip(
+        np.rint(rng.lognormal(np.log(median), options["length_sigma"], n)), 1, 400
+    ).astype(np.int64)
+
+    filler = np.asarray(_FILLER)[rng.integers(0, len(_FILLER), lengths.sum())]
+    starts = np.cumsum(lengths) - lengths
+
+    comparative_rate = options["comparative_rate"][condition]
+    has_cue = rng.random(n) < comparative_rate
+    cues = rng.integers(0, len(COMPARATIVE_CUES), n)
+    mentions = rng.random((n, len(criteria))) < options["keyword_rate"]
+    kinds = rng.random(n)
+
+    texts = np.empty(n, dtype=object)
+    for i in range(n):
+        words = list(filler[starts[i]:starts[i] + lengths[i]])
+
+        # Phrases are inserted at random word boundaries
+        for j in np.flatnonzero(mentions[i]):
+            keywords = RUBRIC_KEYWORDS.get(criteria[j], [criteria[j].lower()])
+            words.insert(rng.integers(0, len(words) + 1), keywords[rng.integers(0, len(keywords))])
+        if has_cue[i]:
+            words.insert(rng.integers(0, len(words) + 1),
+                         COMPARATIVE_CUES[cues[i]] + " the other submissions")
+
+        text = " ".join(words)
+        texts[i] = text[0].upper() + text[1:] + "."
+
+    # Placeholder and empty comments replace the generated text
+    placeholder = kinds < options["placeholder_rate"]
+    empty = ~placeholder & (kinds < options["placeholder_rate"] + options["empty_rate"])
+    texts[placeholder] = np.asarray(PLACEHOLDER_TEXTS, dtype=object)[
+        rng.integers(0, len(PLACEHOLDER_TEXTS), placeholder.sum())
+    ]
+    texts[empty] = np.nan
+    return texts
+
+
+def _scores(rng, shape, options):
+    """Scores 1..max_score from a Beta distribution discretized into levels"""
+    skew = options["score_skew"][options["_condition"]]
+    a, b = 2.0 * np.exp(skew), 2.0 * np.exp(-skew)
+    levels = options["max_score"]
+    return np.minimum((rng.beta(a, b, shape) * levels).astype(np.int64) + 1, levels)
+
+
+def generate_chunks(n_reviews, criteria=DEFAULT_CRITERIA, semesters=DEFAULT_SEMESTERS,
+                    chunk_reviews=DEFAULT_CHUNK_REVIEWS, seed=RANDOM_SEED,
+                    length_median=20.0, length_sigma=0.8, nudge_length_ratio=1.4,
+                    placeholder_rate=0.05, empty_rate=0.02,
+                    comparative_rate=(0.05, 0.15), keyword_rate=0.3,
+                    max_score=3, score_skew=(-0.5, -0.3)):
+    """
+    Yield synthetic reviews chunk by chunk (wide: one row per review).
+
+    Parameters:
+        n_reviews: int, total number of reviews
+        criteria: list of str, rubric criteria
+        semesters: list of str, semesters (reviews are spread evenly)
+        chunk_reviews: int, reviews per chunk
+        seed: int, root seed
+        length_median: float, median comment length in words (baseline)
+        length_sigma: float, lognormal sigma of comment lengths
+        nudge_length_ratio: float, nudge / baseline median length
+        placeholder_rate: float, share of placeholder comments
+        empty_rate: float, share of reviews without a comment
+        comparative_rate: (baseline, nudge) share of comments with a
+            comparative cue
+        keyword_rate: float, chance a comment mentions each criterion
+        max_score: int, highest rubric score (scores are 1..max_score)
+        score_skew: (baseline, nudge) Beta skew of the scores; 0 is
+            symmetric, negative favours low and positive high scores
+
+    Yields:
+        pd.DataFrame: semester, condition, submission_id, written_comment
+        and one score column per criterion
+    """
+    for name, rate in [("placeholder_rate", placeholder_rate), ("empty_rate", empty_rate),
+                       ("keyword_rate", keyword_rate)]:
+        if not 0 <= rate <= 1:
+            raise ValueError(f"ERROR: {name} must lie in [0, 1] (got {rate})")
+    if placeholder_rate + empty_rate > 1:
+        raise ValueError("ERROR: placeholder_rate + empty_rate must not exceed 1")
+    if max_score < 1:
+        raise ValueError(f"ERROR: max_score must be at least 1 (got {max_score})")
+
+    options = {
+        "length_median": length_median,
+        "length_sigma": length_sigma,
+        "nudge_length_ratio": nudge_length_ratio,
+        "placeholder_rate": placeholder_rate,
+        "empty_rate": empty_rate,
+        "comparative_rate": dict(zip(("baseline", "nudge"), comparative_rate)),
+        "keyword_rate": keyword_rate,
+        "max_score": max_score,
+        "score_skew": dict(zip(("baseline", "nudge"), score_skew)),
+    }
+
+    n_chunks = -(-n_reviews // chunk_reviews)
+    streams = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    for chunk, stream in enumerate(streams):
+        rng = np.random.default_rng(stream)
+        first = chunk * chunk_reviews
+        n = min(chunk_reviews, n_reviews - first)
+        review = np.arange(first, first + n)
+
+        semester = np.asarray(semesters)[review * len(semesters) // n_reviews]
+        condition = np.where(rng.random(n) < 0.5, "baseline", "nudge")
+
+        comments = np.empty(n, dtype=object)
+        scores = np.empty((n, len(criteria)), dtype=np.int64)
+        for level in ("baseline", "nudge"):
+            rows = condition == level
+            comments[rows] = _comment_texts(rng, rows.sum(), level, criteria, options)
+            scores[rows] = _scores(rng, (rows.sum(), len(criteria)),
+                                   dict(options, _condition=level))
+
+        frame = pd.DataFrame({
+            "semester": semester,
+            "condition": condition,
+            "submission_id": pd.Series(review).map("S{:07d}".format).to_numpy(),
+            "written_comment": comments,
+        })
+        for j, criterion in enumerate(criteria):
+            frame[criterion] = scores[:, j]
+        yield frame
+
+
+def to_long(frame, criteria):
+    """Dashboard long layout of a chunk (one row per review and criterion)"""
+    n = len(frame)
+    return pd.DataFrame({
+        "Submission ID": np.repeat(frame["submission_id"].to_numpy(), len(criteria)),
+        "Written Comment": np.repeat(frame["written_comment"].to_numpy(), len(criteria)),
+        "Rubric Criterion": np.tile(np.asarray(criteria, dtype=object), n),
+        "Rubric Score": frame[criteria].to_numpy().ravel(),
+        "Semester": np.repeat(frame["semester"].to_numpy(), len(criteria)),
+        "Condition": np.repeat(frame["condition"].to_numpy(), len(criteria)),
+    })
+
+
+def to_wide(frame, criteria):
+    """Cohort workbook layout of a chunk (Comments, then the scores)"""
+    wide = frame[["written_comment"] + list(criteria)].rename(
+        columns={"written_comment": "Comments"}
+    )
+    return wide.reset_index(drop=True)
+
+
+class _XlsxWriter:
+    """Streaming .xlsx writer (openpyxl write-only mode), one sheet"""
+
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self.path = Path(path)
+        self.n_rows = 0
+        self._book = Workbook(write_only=True)
+        self._sheet = self._book.create_sheet("Sheet1")
+        self._header = True
+
+    def __enter__(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def write(self, df):
+        """Append a chunk"""
+        if self.n_rows + len(df) + 1 > XLSX_MAX_ROWS:
+            raise ValueError(
+                f"ERROR: {self.path} would exceed the Excel limit of "
+                f"{XLSX_MAX_ROWS:,} rows; write .csv or .parquet instead"
+            )
+        if self._header:
+            self._sheet.append(list(df.columns))
+            self._header = False
+        for row in df.itertuples(index=False):
+            self._sheet.append([None if v is None or v != v else v for v in row])
+        self.n_rows += len(df)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._book.save(self.path)
+        return False
+
+
+def export_writer(path):
+    """Chunk writer for .xlsx, .csv or .parquet by file suffix"""
+    from visual_nudges.storage import TableWriter
+
+    path = Path(path)
+    if path.suffix not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"ERROR: Unsupported output format '{path.suffix}' "
+            f"(expected one of: {', '.join(OUTPUT_FORMATS)})"
+        )
+    if path.suffix == ".xlsx":
+        return _XlsxWriter(path)
+    return TableWriter(path.with_suffix(""), path.suffix[1:])
+
+
+def write_synthetic(path, n_reviews, layout="long", criteria=DEFAULT_CRITERIA, **options):
+    """
+    Generate a synthetic export and stream it to disk.
+
+    Parameters:
+        path: str or Path, output file (.xlsx, .csv or .parquet); with
+            layout='wide' two files <stem>_baseline / <stem>_nudge
+        n_reviews: int, number of reviews (long rows = reviews x criteria)
+        layout: 'long' (raw export) or 'wide' (cohort workbooks)
+        criteria: list of str, rubric criteria
+        **options: distributions and seed, see generate_chunks()
+
+    Returns:
+        dict: output path -> rows written
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"ERROR: Unknown layout '{layout}' (expected one of: {', '.join(LAYOUTS)})")
+
+    path = Path(path)
+    chunks = generate_chunks(n_reviews, criteria=criteria, **options)
+
+    if layout == "long":
+        with export_writer(path) as writer:
+            for frame in chunks:
+                writer.write(to_long(frame, criteria))
+        return {path: writer.n_rows}
+
+    paths = {level: path.with_name(f"{path.stem}_{level}{path.suffix}")
+             for level in ("baseline", "nudge")}
+    writers = {level: export_writer(p) for level, p in paths.items()}
+    for writer in writers.values():
+        writer.__enter__()
+    try:
+        for frame in chunks:
+            for level, writer in writers.items():
+                writer.write(to_wide(frame[frame["condition"] == level], criteria))
+    except BaseException as exc:
+        for writer in writers.values():
+            writer.__exit__(type(exc), exc, exc.__traceback__)
+        raise
+    for writer in writers.values():
+        writer.__exit__(None, None, None)
+
+    return {paths[level]: writers[level].n_rows for level in paths}
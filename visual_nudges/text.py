@@ -0,0 +1,195 @@
+"""
+text.py
+
+Purpose:
+    Batched text metrics for the written comments: word, sentence and
+    character counts for a whole comment column at once.
+
+    Comments are joined into one byte buffer and scanned with numpy:
+    a word starts at every non-whitespace byte that follows whitespace,
+    a sentence ends at every run of . ! ? followed by whitespace or the
+    end of the comment, and per-comment totals come from cumulative sums
+    at the comment boundaries. No per-comment regex or token list is
+    built, so millions of comments are processed in one pass.
+
+    Comments with non-ASCII characters (where a byte scan would
+    misjudge Unicode whitespace and multi-byte characters) are counted
+    with str methods instead; both paths give identical results.
+
+Definitions:
+    words      maximal runs of non-whitespace (same as re.findall(r"\S+"))
+    sentences  runs of . ! ? followed by whitespace or the end, plus a
+               final unterminated sentence; 0 for comments without words
+    chars      Unicode characters, including whitespace
+
+Missing comments:
+    NaN, empty strings and placeholder texts (PLACEHOLDER_COMMENTS,
+    compared case-insensitively without surrounding punctuation) have
+    has_text False and zero counts.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Texts that stand in for "no comment" in the dashboard exports
+PLACEHOLDER_COMMENTS = frozenset({
+    "nan",
+    "none",
+    "null",
+    "n/a",
+    "na",
+    "-",
+    "no comment",
+    "no comments",
+    "no submission",
+    "none response",
+})
+
+METRIC_COLUMNS = ["has_text", "words", "sentences", "chars"]
+
+# ASCII whitespace as understood by str.split() and regex \s
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+
+_TERMINATOR = np.zeros(256, dtype=bool)
+_TERMINATOR[[ord("."), ord("!"), ord("?")]] = True
+
+_SENTENCE_END = re.compile(r"[.!?]+(?=\s|$)")
+
+
+# Longer comments cannot be placeholders (allows for padding/punctuation)
+_PLACEHOLDER_MAX_LEN = max(map(len, PLACEHOLDER_COMMENTS)) + 8
+
+
+def is_placeholder(text):
+    """True for empty, whitespace-only or placeholder comment text"""
+    stripped = text.strip()
+    return (not stripped
+            or stripped.strip(".!?,;: ").lower() in PLACEHOLDER_COMMENTS)
+
+
+def _comment_texts(comments):
+    """Comment strings with missing and placeholder comments as ''"""
+    max_len = _PLACEHOLDER_MAX_LEN
+    return [
+        value if value.__class__ is str and (
+            len(value) > max_len or not is_placeholder(value)
+        ) else ""
+        for value in comments
+    ]
+
+
+def _text_counts(text):
+    """Word, sentence and character counts of one comment (str methods)"""
+    words = len(text.split())
+    if words == 0:
+        return 0, 0, len(text)
+    sentences = len(_SENTENCE_END.findall(text))
+    if text.rstrip()[-1] not in ".!?":
+        sentences += 1
+    return words, sentences, len(text)
+
+
+def _ascii_counts(texts):
+    """
+    Word and sentence counts of ASCII comments from one byte scan.
+
+    Parameters:
+        texts: list of str, ASCII only
+
+    Returns:
+        tuple of (n,) int64 arrays: words, sentences
+    """
+    n = len(texts)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Comments separated by one newline (whitespace closes every word)
+    buffer = np.frombuffer("\n".join(texts).encode("ascii"), dtype=np.uint8)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+    starts = np.concatenate([[0], np.cumsum(lengths + 1)[:-1]])
+    ends = starts + lengths
+
+    space = _WHITESPACE[buffer]
+
+    # Word starts: non-whitespace preceded by whitespace (or buffer start)
+    word_start = ~space
+    word_start[1:] &= space[:-1]
+
+    # Sentence ends: last terminator of a run, followed by whitespace
+    # (comment ends are followed by the newline separator or buffer end)
+    sentence_end = _TERMINATOR[buffer]
+    sentence_end[:-1] &= space[1:]
+
+    def per_comment(flags):
+        # Flagged positions are sorted, so counts per comment follow
+        # from binary searches at the comment boundaries
+        positions = np.flatnonzero(flags)
+        return np.searchsorted(positions, ends) - np.searchsorted(positions, starts)
+
+    words = per_comment(word_start)
+    sentences = per_comment(sentence_end)
+
+    # A comment whose last non-whitespace character is not a terminator
+    # ends with an unterminated sentence
+    last = np.maximum(ends - 1, 0)
+    last_char = np.array(buffer[last])
+    for i in np.flatnonzero(space[last] & (lengths > 0)):
+        last_char[i] = ord(texts[i].rstrip()[-1:] or " ")
+    sentences += ~_TERMINATOR[last_char] & (words > 0)
+    sentences[words == 0] = 0
+
+    return words, sentences
+
+
+def comment_metrics(comments):
+    """
+    Word, sentence and character counts for a column of comments.
+
+    Parameters:
+        comments: pd.Series (or iterable) of comment texts; NaN allowed
+
+    Returns:
+        pd.DataFrame: has_text (bool), words, sentences, chars (int64);
+        zero counts where has_text is False. Index matches `comments`.
+    """
+    index = comments.index if isinstance(comments, pd.Series) else None
+    texts = _comment_texts(comments)
+    n = len(texts)
+
+    chars = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+    ascii_rows = np.fromiter(map(str.isascii, texts), dtype=bool, count=n)
+
+    words = np.zeros(n, dtype=np.int64)
+    sentences = np.zeros(n, dtype=np.int64)
+
+    # Fast path: one byte scan over all ASCII comments
+    rows = np.flatnonzero(ascii_rows)
+    words[rows], sentences[rows] = _ascii_counts([texts[i] for i in rows])
+
+    # Comments with non-ASCII characters
+    for i in np.flatnonzero(~ascii_rows):
+        words[i], sentences[i], chars[i] = _text_counts(texts[i])
+
+    return pd.DataFrame({
+        "has_text": chars > 0,
+        "words": words,
+        "sentences": sentences,
+        "chars": chars,
+    }, index=index)
+
+
+def word_counts(comments):
+    """
+    Words per comment, NaN for missing or placeholder comments.
+
+    Parameters:
+        comments: pd.Series of comment texts
+
+    Returns:
+        pd.Series: float word counts aligned with `comments`
+    """
+    metrics = comment_metrics(comments)
+    return metrics["words"].where(metrics["has_text"])